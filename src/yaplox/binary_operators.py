@@ -0,0 +1,114 @@
+from typing import Any, Callable, Dict
+
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+# The implementation of every binary operator. Numbers in Lox are floats, so every
+# operator first tries the float/float (or str/str) case with a plain type check,
+# and only falls back to the checked conversion for other operands.
+BinaryOperator = Callable[[Token, Any, Any], Any]
+
+
+def check_number_operands(operator: Token, left: Any, right: Any):
+    if isinstance(left, (float, int)) and isinstance(right, (float, int)):
+        return
+    raise YaploxRuntimeError(operator, "Operands must be numbers.")
+
+
+def is_equal(a: Any, b: Any) -> bool:
+    if a is None and b is None:
+        return True
+
+    if a is None:
+        return False
+
+    return a == b
+
+
+def greater(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left > right
+    check_number_operands(operator, left, right)
+    return float(left) > float(right)
+
+
+def greater_equal(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left >= right
+    check_number_operands(operator, left, right)
+    return float(left) >= float(right)
+
+
+def less(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left < right
+    check_number_operands(operator, left, right)
+    return float(left) < float(right)
+
+
+def less_equal(operator: Token, left: Any, right: Any) -> bool:
+    if type(left) is float and type(right) is float:
+        return left <= right
+    check_number_operands(operator, left, right)
+    return float(left) <= float(right)
+
+
+def bang_equal(operator: Token, left: Any, right: Any) -> bool:
+    return not is_equal(left, right)
+
+
+def equal_equal(operator: Token, left: Any, right: Any) -> bool:
+    return is_equal(left, right)
+
+
+def minus(operator: Token, left: Any, right: Any) -> float:
+    if type(left) is float and type(right) is float:
+        return left - right
+    check_number_operands(operator, left, right)
+    return float(left) - float(right)
+
+
+def slash(operator: Token, left: Any, right: Any) -> float:
+    if type(left) is float and type(right) is float:
+        return left / right
+    check_number_operands(operator, left, right)
+    return float(left) / float(right)
+
+
+def star(operator: Token, left: Any, right: Any) -> float:
+    if type(left) is float and type(right) is float:
+        return left * right
+    check_number_operands(operator, left, right)
+    return float(left) * float(right)
+
+
+def plus(operator: Token, left: Any, right: Any) -> Any:
+    left_type = type(left)
+    if left_type is type(right) and (left_type is float or left_type is str):
+        return left + right
+
+    if isinstance(left, (float, int)) and isinstance(right, (float, int)):
+        return left + right
+
+    if isinstance(left, str) and isinstance(right, str):
+        return str(left + right)
+
+    raise YaploxRuntimeError(operator, "Operands must be two numbers or two strings")
+
+
+BINARY_OPERATORS: Dict[TokenType, BinaryOperator] = {
+    # Comparison operators
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: less_equal,
+    # Equality
+    TokenType.BANG_EQUAL: bang_equal,
+    TokenType.EQUAL_EQUAL: equal_equal,
+    # Arithmetic operators
+    TokenType.MINUS: minus,
+    TokenType.SLASH: slash,
+    TokenType.STAR: star,
+    TokenType.PLUS: plus,
+}
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+from yaplox.bytecode_function import BytecodeFunction
+from yaplox.cell import Cell
+from yaplox.stmt import Function
+from yaplox.yaplox_function import YaploxFunction
+from yaplox.yaplox_instance import YaploxInstance
+
+
+class BytecodeClosure(YaploxFunction):
+    """
+    A BytecodeFunction with the cells it captured when it was created. The
+    VirtualMachine calls it in its own loop, `call` is only used when it is called
+    from outside the VirtualMachine.
+    """
+
+    def __init__(
+        self,
+        function: BytecodeFunction,
+        upvalues: List[Cell],
+        instance: Optional[YaploxInstance] = None,
+    ):
+        declaration: Function = function.declaration  # type: ignore
+        super().__init__(declaration, upvalues, function.is_initializer, instance)
+        self.function = function
+
+    def bind(self, instance: YaploxInstance) -> BytecodeClosure:
+        return BytecodeClosure(self.function, self.upvalues, instance)
+
+    def call(self, interpreter, arguments):
+        return interpreter.vm.call(self, arguments)
+
+    def invoke(self, interpreter, instance: YaploxInstance, arguments: List[Any]):
+        # `this` is the first argument of a method that is not bound
+        return interpreter.vm.call(self, [instance, *arguments])
+
+    def arity(self) -> int:
+        return self.function.arity
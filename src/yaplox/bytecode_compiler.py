@@ -0,0 +1,422 @@
+from typing import Any, Dict, List, Optional, Union
+
+from yaplox.bytecode_function import BytecodeFunction
+from yaplox.chunk import Chunk
+from yaplox.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from yaplox.frame_type import FrameType
+from yaplox.op_code import OpCode
+from yaplox.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    StmtVisitor,
+    Var,
+    While,
+)
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.variable_access import VariableAccess
+
+BINARY_OP_CODES: Dict[TokenType, OpCode] = {
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.PLUS: OpCode.ADD,
+}
+
+# The access of a variable, and the instructions to read and to write it
+LOAD_OP_CODES = {
+    VariableAccess.LOCAL: (OpCode.GET_LOCAL, OpCode.SET_LOCAL),
+    VariableAccess.CELL: (OpCode.GET_CELL, OpCode.SET_CELL),
+    VariableAccess.UPVALUE: (OpCode.GET_UPVALUE, OpCode.SET_UPVALUE),
+    VariableAccess.GLOBAL: (OpCode.GET_GLOBAL, OpCode.SET_GLOBAL),
+}
+
+Declaration = Union[Class, Function, Var]
+
+
+class BytecodeCompiler(ExprVisitor, StmtVisitor):
+    """
+    Compile a resolved program into bytecode for the VirtualMachine.
+
+    The Resolver numbers the variables per scope, and the Interpreter creates an
+    environment for every scope. The compiler places all scopes of a function in
+    one frame instead: a scope starts at the first slot after the scope around it,
+    so a variable at a depth and slot becomes one slot in the frame.
+    """
+
+    def __init__(self):
+        self.chunk = Chunk()
+        # The first slot of the scopes of the current function, the innermost last
+        self.scope_bases: List[int] = []
+        # The first free slot, and the number of slots the frame needs
+        self.scope_end = 0
+        self.frame_size = 0
+        # The line of the last token, the first line until a token has been seen
+        self.line = 1
+
+    def compile(self, statements: List[Stmt]) -> BytecodeFunction:
+        """
+        Compile the statements into the top level function. It returns the value of
+        the last statement when that is an expression, like Interpreter.interpret.
+        """
+        for index, statement in enumerate(statements):
+            if index == len(statements) - 1 and isinstance(statement, Expression):
+                self._compile_expr(statement.expression)
+                self._emit(OpCode.RETURN)
+                break
+            self._compile_stmt(statement)
+        else:
+            self._emit(OpCode.NIL)
+            self._emit(OpCode.RETURN)
+
+        return BytecodeFunction(None, self.chunk, self.frame_size)
+
+    def _compile_expr(self, expr: Expr):
+        expr.accept(self)
+
+    def _compile_stmt(self, stmt: Stmt):
+        stmt.accept(self)
+
+    def _emit(self, op_code: OpCode, *operands: int):
+        self.chunk.write(op_code, self.line)
+        for operand in operands:
+            self.chunk.write(operand, self.line)
+
+    def _emit_constant_op(self, op_code: OpCode, value: Any):
+        self._emit(op_code, self.chunk.add_constant(value))
+
+    def _emit_jump(self, op_code: OpCode) -> int:
+        """
+        Emit a jump with an empty offset, and return the position of the offset
+        """
+        self._emit(op_code, 0)
+        return len(self.chunk.code) - 1
+
+    def _patch_jump(self, position: int):
+        """
+        Let the jump at `position` jump to the next instruction
+        """
+        self.chunk.code[position] = len(self.chunk.code) - position - 1
+
+    def _emit_loop(self, loop_start: int):
+        self._emit(OpCode.LOOP, 0)
+        position = len(self.chunk.code) - 1
+        self.chunk.code[position] = position + 1 - loop_start
+
+    # Scopes and variables
+    def _begin_scope(self, size: int) -> int:
+        base = self.scope_end
+        self.scope_bases.append(base)
+        self.scope_end += size
+        self.frame_size = max(self.frame_size, self.scope_end)
+        return base
+
+    def _end_scope(self):
+        self.scope_end = self.scope_bases.pop()
+
+    def _frame_slot(self, depth: int, slot: int) -> int:
+        return self.scope_bases[-1 - depth] + slot
+
+    def _emit_variable(
+        self, expr: Union[Assign, Super, This, Variable], name: Token, store: bool
+    ):
+        get, set_op = LOAD_OP_CODES[expr.access]
+        op_code = set_op if store else get
+
+        if expr.access is VariableAccess.GLOBAL:
+            self._emit(op_code, self.chunk.add_constant(name))
+        elif expr.access is VariableAccess.UPVALUE:
+            self._emit(op_code, expr.slot)
+        else:
+            self._emit(op_code, self._frame_slot(expr.depth, expr.slot))  # type: ignore
+
+    def _emit_define(self, declaration: Declaration):
+        """
+        Define the variable of a declaration with the value on top of the stack
+        """
+        if declaration.slot is None:
+            self._emit_constant_op(OpCode.DEFINE_GLOBAL, declaration.name.lexeme)
+        elif declaration.captured:
+            self._emit(OpCode.STORE_NEW_CELL, self._frame_slot(0, declaration.slot))
+        else:
+            self._emit(OpCode.STORE_LOCAL, self._frame_slot(0, declaration.slot))
+
+    def _emit_predefine(self, declaration: Union[Class, Function]):
+        """
+        Define the variable of a function or class before its value is created, so
+        the value can capture the cell of the variable
+        """
+        if declaration.slot is not None and declaration.captured:
+            self._emit(OpCode.MAKE_CELL, self._frame_slot(0, declaration.slot))
+
+    def _emit_initialize(self, declaration: Union[Class, Function]):
+        """
+        Set the variable of a function or class to the value on top of the stack
+        """
+        if declaration.slot is not None and declaration.captured:
+            self._emit(OpCode.SET_CELL, self._frame_slot(0, declaration.slot))
+            self._emit(OpCode.POP)
+        else:
+            self._emit_define(declaration)
+
+    # Expressions
+    def visit_literal_expr(self, expr: Literal):
+        if expr.value is None:
+            self._emit(OpCode.NIL)
+        elif expr.value is True:
+            self._emit(OpCode.TRUE)
+        elif expr.value is False:
+            self._emit(OpCode.FALSE)
+        else:
+            self._emit_constant_op(OpCode.CONSTANT, expr.value)
+
+    def visit_grouping_expr(self, expr: Grouping):
+        self._compile_expr(expr.expression)
+
+    def visit_variable_expr(self, expr: Variable):
+        self.line = expr.name.line
+        self._emit_variable(expr, expr.name, store=False)
+
+    def visit_this_expr(self, expr: This):
+        self.line = expr.keyword.line
+        self._emit_variable(expr, expr.keyword, store=False)
+
+    def visit_assign_expr(self, expr: Assign):
+        self._compile_expr(expr.value)
+        self.line = expr.name.line
+        self._emit_variable(expr, expr.name, store=True)
+
+    def visit_binary_expr(self, expr: Binary):
+        self._compile_expr(expr.left)
+        self._compile_expr(expr.right)
+        self.line = expr.operator.line
+
+        token_type = expr.operator.token_type
+        if token_type == TokenType.EQUAL_EQUAL:
+            self._emit(OpCode.EQUAL)
+        elif token_type == TokenType.BANG_EQUAL:
+            self._emit(OpCode.NOT_EQUAL)
+        else:
+            self._emit_constant_op(BINARY_OP_CODES[token_type], expr.operator)
+
+    def visit_logical_expr(self, expr: Logical):
+        self._compile_expr(expr.left)
+        self.line = expr.operator.line
+        if expr.operator.token_type == TokenType.OR:
+            end = self._emit_jump(OpCode.JUMP_IF_TRUE)
+        else:
+            end = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        self._emit(OpCode.POP)
+        self._compile_expr(expr.right)
+        self._patch_jump(end)
+
+    def visit_unary_expr(self, expr: Unary):
+        self._compile_expr(expr.right)
+        self.line = expr.operator.line
+        if expr.operator.token_type == TokenType.MINUS:
+            self._emit_constant_op(OpCode.NEGATE, expr.operator)
+        elif expr.operator.token_type == TokenType.BANG:
+            self._emit(OpCode.NOT)
+        else:
+            self._emit(OpCode.POP)
+            self._emit(OpCode.NIL)
+
+    def visit_call_expr(self, expr: Call):
+        self._compile_call(expr, OpCode.CALL)
+
+    def _compile_call(self, expr: Call, op_code: OpCode):
+        callee = expr.callee
+        if type(callee) is Get:
+            # A method call, without creating a bound method
+            self._compile_expr(callee.obj)
+            self.line = callee.name.line
+            self._emit_constant_op(OpCode.GET_METHOD, callee)
+            op_code = OpCode.INVOKE if op_code is OpCode.CALL else OpCode.TAIL_INVOKE
+        else:
+            self._compile_expr(callee)
+        for argument in expr.arguments:
+            self._compile_expr(argument)
+        self.line = expr.paren.line
+        self._emit(op_code, len(expr.arguments), self.chunk.add_constant(expr.paren))
+
+    def visit_get_expr(self, expr: Get):
+        self._compile_expr(expr.obj)
+        self.line = expr.name.line
+        # The constant is the expression, with the name and the inline cache
+        self._emit_constant_op(OpCode.GET_PROPERTY, expr)
+
+    def visit_set_expr(self, expr: Set):
+        self._compile_expr(expr.obj)
+        self.line = expr.name.line
+        # The object is checked before the value is evaluated
+        self._emit_constant_op(OpCode.CHECK_INSTANCE, expr.name)
+        self._compile_expr(expr.value)
+        self.line = expr.name.line
+        self._emit_constant_op(OpCode.SET_PROPERTY, expr.name)
+
+    def visit_super_expr(self, expr: Super):
+        self.line = expr.keyword.line
+        self._emit_variable(expr.this, expr.keyword, store=False)  # type: ignore
+        self._emit_variable(expr, expr.keyword, store=False)
+        self._emit_constant_op(OpCode.GET_SUPER, expr)
+
+    # Statements
+    def visit_expression_stmt(self, stmt: Expression):
+        self._compile_expr(stmt.expression)
+        self._emit(OpCode.POP)
+
+    def visit_print_stmt(self, stmt: Print):
+        self._compile_expr(stmt.expression)
+        self._emit(OpCode.PRINT)
+
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.initializer is None:
+            self._emit(OpCode.NIL)
+        else:
+            self._compile_expr(stmt.initializer)
+        self.line = stmt.name.line
+        self._emit_define(stmt)
+
+    def visit_block_stmt(self, stmt: Block):
+        # A block with declarations has a scope in the Resolver
+        has_scope = stmt.frame_type is not FrameType.NONE
+        if has_scope:
+            self._begin_scope(stmt.slot_count)
+        for statement in stmt.statements:
+            self._compile_stmt(statement)
+        if has_scope:
+            self._end_scope()
+
+    def visit_if_stmt(self, stmt: If):
+        self._compile_expr(stmt.condition)
+        else_jump = self._emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        self._compile_stmt(stmt.then_branch)
+
+        if stmt.else_branch is None:
+            self._patch_jump(else_jump)
+            return
+
+        end_jump = self._emit_jump(OpCode.JUMP)
+        self._patch_jump(else_jump)
+        self._compile_stmt(stmt.else_branch)
+        self._patch_jump(end_jump)
+
+    def visit_while_stmt(self, stmt: While):
+        loop_start = len(self.chunk.code)
+        self._compile_expr(stmt.condition)
+        exit_jump = self._emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        self._compile_stmt(stmt.body)
+        self._emit_loop(loop_start)
+        self._patch_jump(exit_jump)
+
+    def visit_return_stmt(self, stmt: Return):
+        if stmt.value is None:
+            self._emit(OpCode.NIL)
+        elif isinstance(stmt.value, Call):
+            # The RETURN only runs when the callee is not a Lox function
+            self._compile_call(stmt.value, OpCode.TAIL_CALL)
+        else:
+            self._compile_expr(stmt.value)
+        self.line = stmt.keyword.line
+        self._emit(OpCode.RETURN)
+
+    def _compile_function(
+        self, declaration: Function, is_method: bool = False
+    ) -> BytecodeFunction:
+        # The upvalues that are local are found in the scopes of this function
+        upvalues = tuple(
+            (True, self._frame_slot(depth, slot)) if is_local else (False, slot)
+            for is_local, depth, slot in declaration.upvalues
+        )
+
+        enclosing = (self.chunk, self.scope_bases, self.scope_end, self.frame_size)
+        self.chunk = Chunk()
+        self.scope_bases = []
+        self.scope_end = 0
+        self.frame_size = 0
+
+        self._begin_scope(declaration.slot_count)
+        for statement in declaration.body:
+            self._compile_stmt(statement)
+        self._emit(OpCode.NIL)
+        self._emit(OpCode.RETURN)
+
+        function = BytecodeFunction(
+            declaration,
+            self.chunk,
+            self.frame_size,
+            upvalues,
+            is_method=is_method,
+            is_initializer=is_method and declaration.name.lexeme == "init",
+        )
+        self.chunk, self.scope_bases, self.scope_end, self.frame_size = enclosing
+        return function
+
+    def visit_function_stmt(self, stmt: Function):
+        self.line = stmt.name.line
+        self._emit_predefine(stmt)
+        function = self._compile_function(stmt)
+        self.line = stmt.name.line
+        self._emit_constant_op(OpCode.CLOSURE, function)
+        self._emit_initialize(stmt)
+
+    def visit_class_stmt(self, stmt: Class):
+        superclass: Optional[Variable] = stmt.superclass
+        if superclass is not None:
+            self._compile_expr(superclass)
+            self._emit_constant_op(OpCode.CHECK_SUPERCLASS, superclass.name)
+
+        self.line = stmt.name.line
+        if stmt.slot is not None and stmt.captured:
+            self._emit_predefine(stmt)
+        else:
+            self._emit(OpCode.NIL)
+            self._emit_define(stmt)
+
+        if superclass is not None:
+            # The methods capture `super` from a scope around them
+            super_slot = self._begin_scope(1)
+            self._emit(OpCode.STORE_NEW_CELL, super_slot)
+
+        for method in stmt.methods:
+            function = self._compile_function(method, is_method=True)
+            self.line = method.name.line
+            self._emit_constant_op(OpCode.CLOSURE, function)
+
+        # CLASS finds the superclass on top of the methods
+        self.line = stmt.name.line
+        if superclass is not None:
+            self._emit(OpCode.GET_CELL, super_slot)
+            self._end_scope()
+        self._emit(
+            OpCode.CLASS,
+            self.chunk.add_constant(stmt.name.lexeme),
+            len(stmt.methods),
+            superclass is not None,
+        )
+        self._emit_initialize(stmt)
@@ -0,0 +1,40 @@
+from typing import Optional, Tuple
+
+from yaplox.chunk import Chunk
+from yaplox.stmt import Function
+
+
+class BytecodeFunction:
+    """
+    A function compiled by the BytecodeCompiler. The local variables of all scopes of
+    the function are stored in one frame of `frame_size` slots on the stack of the
+    VirtualMachine. A method has `this` in slot 0, followed by the parameters.
+
+    `upvalues` holds for every upvalue whether it is a slot in the frame that creates
+    the function, and the slot or the index in the upvalues of that frame.
+    """
+
+    def __init__(
+        self,
+        declaration: Optional[Function],
+        chunk: Chunk,
+        frame_size: int,
+        upvalues: Tuple[Tuple[bool, int], ...] = (),
+        is_method: bool = False,
+        is_initializer: bool = False,
+    ):
+        # The top level script has no declaration
+        self.declaration = declaration
+        self.name = "script" if declaration is None else declaration.name.lexeme
+        self.arity = 0 if declaration is None else len(declaration.params)
+        self.captured_params = (
+            () if declaration is None else declaration.captured_params
+        )
+        self.chunk = chunk
+        self.frame_size = frame_size
+        self.upvalues = upvalues
+        self.is_method = is_method
+        self.is_initializer = is_initializer
+
+    def __repr__(self):
+        return f"<bytecode {self.name}>"
@@ -0,0 +1,31 @@
+from typing import Any, List
+
+from structlog import get_logger
+
+from yaplox.bytecode_compiler import BytecodeCompiler
+from yaplox.interpreter import Interpreter
+from yaplox.stmt import Stmt
+from yaplox.virtual_machine import VirtualMachine
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+logger = get_logger()
+
+
+class BytecodeInterpreter(Interpreter):
+    """
+    Backend that compiles the resolved program to bytecode with the
+    BytecodeCompiler, and runs it on a VirtualMachine. It keeps the globals of the
+    Interpreter, so the REPL works the same.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.vm = VirtualMachine(self)
+
+    def interpret(self, statements: List[Stmt], on_error=None) -> Any:
+        script = BytecodeCompiler().compile(statements)
+        logger.debug("Compiled program", size=len(script.chunk.code))
+        try:
+            return self.vm.run(script)
+        except YaploxRuntimeError as excp:
+            on_error(excp)
@@ -0,0 +1,14 @@
+from typing import Any
+
+
+class Cell:
+    """
+    Holds a variable that is captured by a closure. The frame that declares the
+    variable and all closures that use it share the cell, so an assignment is seen
+    by all of them.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any = None):
+        self.value = value
@@ -0,0 +1,61 @@
+import math
+from typing import Any, Dict, List, Tuple
+
+from yaplox.op_code import OPERANDS, OpCode
+
+
+class Chunk:
+    """
+    The bytecode of a function. `code` holds the instructions and their operands as
+    plain ints, `lines` the source line of every entry of `code`, and `constants`
+    the values that are too big for an operand: numbers, strings, names, tokens for
+    errors and compiled functions.
+    """
+
+    def __init__(self):
+        self.code: List[int] = []
+        self.lines: List[int] = []
+        self.constants: List[Any] = []
+        # Index of the numbers, strings and names in constants
+        self._constant_index: Dict[Tuple[type, Any, float], int] = {}
+
+    def write(self, value: int, line: int) -> int:
+        """
+        Append an instruction or operand, and return its position
+        """
+        self.code.append(value)
+        self.lines.append(line)
+        return len(self.code) - 1
+
+    def add_constant(self, value: Any) -> int:
+        """
+        Add a constant and return its index. Numbers and strings are only added once,
+        other values are added every time.
+        """
+        if isinstance(value, (float, str)):
+            # -0.0 == 0.0, the sign keeps them apart
+            sign = math.copysign(1.0, value) if isinstance(value, float) else 1.0
+            key = (type(value), value, sign)
+            if key not in self._constant_index:
+                self._constant_index[key] = len(self.constants)
+                self.constants.append(value)
+            return self._constant_index[key]
+
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def disassemble(self) -> List[str]:
+        """
+        Return the instructions as text, one line per instruction
+        """
+        result = []
+        offset = 0
+        while offset < len(self.code):
+            op_code = OpCode(self.code[offset])
+            operands = self.code[offset + 1 : offset + 1 + OPERANDS[op_code]]
+            text = f"{offset:04} {self.lines[offset]:4} {op_code.name}"
+            if operands:
+                text += " " + " ".join(str(operand) for operand in operands)
+            result.append(text)
+            offset += 1 + len(operands)
+        return result
@@ -0,0 +1,623 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from yaplox.binary_operators import BINARY_OPERATORS
+from yaplox.cell import Cell
+from yaplox.compiled_function import CompiledFunction
+from yaplox.completion_type import CompletionType
+from yaplox.environment import Environment
+from yaplox.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from yaplox.frame_type import FrameType
+from yaplox.interpreter import Interpreter
+from yaplox.slot_environment import SlotEnvironment
+from yaplox.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    StmtVisitor,
+    Var,
+    While,
+)
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.variable_access import VariableAccess
+from yaplox.yaplox_callable import YaploxCallable
+from yaplox.yaplox_class import YaploxClass
+from yaplox.yaplox_instance import YaploxInstance
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+# A compiled expression or statement, it runs in the environment it is called with
+Compiled = Callable[[SlotEnvironment], Any]
+
+# The last frame of a reusable block, see Interpreter.visit_block_stmt
+Frame = List[Optional[SlotEnvironment]]
+
+# A compiled statement returns RETURN when a return statement has run
+RETURN = CompletionType.RETURN
+
+# The binary operators on two floats, the other operands are handled by
+# BINARY_OPERATORS
+FLOAT_OPERATORS: Dict[TokenType, Callable[[float, float], Any]] = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.BANG_EQUAL: operator.ne,
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.MINUS: operator.sub,
+    TokenType.SLASH: operator.truediv,
+    TokenType.STAR: operator.mul,
+    TokenType.PLUS: operator.add,
+}
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    """
+    Compile a resolved program into nested Python closures. Every node becomes one
+    closure that takes the current SlotEnvironment, with the closures of its children
+    and everything the Resolver found out about it bound in advance. Running the
+    program is calling the closures of its statements.
+
+    The compiled program uses the globals of `interpreter`, and passes it to the
+    callables it calls.
+    """
+
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.globals: Environment = interpreter.globals
+        # The last frames of the reusable blocks in the loop that is compiled, the
+        # loop drops them when it ends
+        self.loop_frames: Optional[List[Frame]] = None
+
+    def compile(self, statements: List[Stmt]) -> List[Compiled]:
+        return [self._compile_stmt(statement) for statement in statements]
+
+    def _compile_expr(self, expr: Expr) -> Compiled:
+        return expr.accept(self)
+
+    def _compile_stmt(self, stmt: Stmt) -> Compiled:
+        return stmt.accept(self)
+
+    def _compile_statements(self, statements: List[Stmt]) -> Compiled:
+        compiled = tuple(self._compile_stmt(statement) for statement in statements)
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run_statements(env):
+            for statement in compiled:
+                if statement(env) is RETURN:
+                    return RETURN
+            return None
+
+        return run_statements
+
+    # Variables
+    def _compile_look_up(
+        self, name: Token, expr: Union[Super, This, Variable]
+    ) -> Compiled:
+        access = expr.access
+        slot = expr.slot
+
+        if access is VariableAccess.GLOBAL:
+            values = self.globals.values
+            lexeme = name.lexeme
+            get = self.globals.get
+
+            def look_up_global(env):
+                try:
+                    return values[lexeme]
+                except KeyError:
+                    return get(name)
+
+            return look_up_global
+
+        if access is VariableAccess.UPVALUE:
+            return lambda env: env.upvalues[slot].value
+
+        depth: int = expr.depth  # type: ignore
+        if access is VariableAccess.CELL:
+            return lambda env: env.get_at(depth, slot).value
+        if depth == 0:
+            return lambda env: env.values[slot]
+        if depth == 1:
+            return lambda env: env.enclosing.values[slot]  # type: ignore
+        return lambda env: env.get_at(depth, slot)
+
+    def visit_variable_expr(self, expr: Variable) -> Compiled:
+        return self._compile_look_up(expr.name, expr)
+
+    def visit_this_expr(self, expr: This) -> Compiled:
+        return self._compile_look_up(expr.keyword, expr)
+
+    def visit_assign_expr(self, expr: Assign) -> Compiled:
+        value = self._compile_expr(expr.value)
+        access = expr.access
+        slot = expr.slot
+
+        if access is VariableAccess.GLOBAL:
+            assign = self.globals.assign
+            name = expr.name
+
+            def assign_global(env):
+                result = value(env)
+                assign(name, result)
+                return result
+
+            return assign_global
+
+        if access is VariableAccess.UPVALUE:
+
+            def assign_upvalue(env):
+                result = env.upvalues[slot].value = value(env)
+                return result
+
+            return assign_upvalue
+
+        depth: int = expr.depth  # type: ignore
+        if access is VariableAccess.CELL:
+
+            def assign_cell(env):
+                result = env.get_at(depth, slot).value = value(env)
+                return result
+
+            return assign_cell
+
+        if depth == 0:
+
+            def assign_local(env):
+                result = env.values[slot] = value(env)
+                return result
+
+            return assign_local
+
+        def assign_at(env):
+            result = value(env)
+            env.assign_at(depth, slot, result)
+            return result
+
+        return assign_at
+
+    def _compile_define(
+        self, declaration: Union[Class, Function, Var]
+    ) -> Callable[[SlotEnvironment, Any], None]:
+        """
+        Compile the definition of a variable, see Interpreter._define
+        """
+        slot = declaration.slot
+        if slot is None:
+            define = self.globals.define
+            lexeme = declaration.name.lexeme
+            return lambda env, value: define(lexeme, value)
+
+        if declaration.captured:
+
+            def define_cell(env, value):
+                env.values[slot] = Cell(value)
+
+            return define_cell
+
+        def define_local(env, value):
+            env.values[slot] = value
+
+        return define_local
+
+    def _compile_initialize(
+        self, declaration: Union[Class, Function]
+    ) -> Callable[[SlotEnvironment, Any], None]:
+        """
+        Compile setting the value of a variable that has been defined before, see
+        Interpreter._initialize
+        """
+        if declaration.slot is not None and declaration.captured:
+            slot = declaration.slot
+
+            def initialize_cell(env, value):
+                env.values[slot].value = value
+
+            return initialize_cell
+
+        return self._compile_define(declaration)
+
+    # Expressions
+    def visit_literal_expr(self, expr: Literal) -> Compiled:
+        value = expr.value
+        return lambda env: value
+
+    def visit_grouping_expr(self, expr: Grouping) -> Compiled:
+        return self._compile_expr(expr.expression)
+
+    def visit_binary_expr(self, expr: Binary) -> Compiled:
+        left = self._compile_expr(expr.left)
+        right = self._compile_expr(expr.right)
+        token = expr.operator
+        implementation = BINARY_OPERATORS.get(token.token_type)
+
+        if implementation is None:
+
+            def unknown_operator(env):
+                left(env)
+                right(env)
+                raise YaploxRuntimeError(token, f"Unknown operator {token.lexeme}")
+
+            return unknown_operator
+
+        fast = FLOAT_OPERATORS[token.token_type]
+
+        def binary(env):
+            left_value = left(env)
+            right_value = right(env)
+            if type(left_value) is float and type(right_value) is float:
+                return fast(left_value, right_value)
+            return implementation(token, left_value, right_value)  # type: ignore
+
+        return binary
+
+    def visit_logical_expr(self, expr: Logical) -> Compiled:
+        left = self._compile_expr(expr.left)
+        right = self._compile_expr(expr.right)
+        is_truthy = Interpreter._is_truthy
+
+        if expr.operator.token_type == TokenType.OR:
+
+            def logical_or(env):
+                value = left(env)
+                if is_truthy(value):
+                    return value
+                return right(env)
+
+            return logical_or
+
+        def logical_and(env):
+            value = left(env)
+            if not is_truthy(value):
+                return value
+            return right(env)
+
+        return logical_and
+
+    def visit_unary_expr(self, expr: Unary) -> Compiled:
+        right = self._compile_expr(expr.right)
+        token = expr.operator
+
+        if token.token_type == TokenType.MINUS:
+            check_number_operand = Interpreter._check_number_operand
+
+            def negate(env):
+                value = right(env)
+                if type(value) is float:
+                    return -value
+                check_number_operand(token, value)
+                return -float(value)
+
+            return negate
+
+        if token.token_type == TokenType.BANG:
+            is_truthy = Interpreter._is_truthy
+            return lambda env: not is_truthy(right(env))
+
+        def unknown_unary(env):
+            right(env)
+
+        return unknown_unary
+
+    def visit_call_expr(self, expr: Call) -> Compiled:
+        if type(expr.callee) is Get:
+            return self._compile_invoke(expr, expr.callee)
+
+        callee = self._compile_expr(expr.callee)
+        arguments = tuple(self._compile_expr(argument) for argument in expr.arguments)
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def call(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+
+            if not isinstance(function, YaploxCallable):
+                raise YaploxRuntimeError(paren, "Can only call functions and classes.")
+
+            if len(values) != function.arity():
+                raise YaploxRuntimeError(
+                    paren,
+                    f"Expected {function.arity()} arguments but got {len(values)}.",
+                )
+            try:
+                return function.call(interpreter, values)
+            except RecursionError:
+                raise YaploxRuntimeError(paren, "Stack overflow.")
+
+        return call
+
+    def _compile_invoke(self, expr: Call, get: Get) -> Compiled:
+        """
+        Call a property: a field like any other value, or else a method without
+        creating a bound method first, see Interpreter._invoke
+        """
+        obj = self._compile_expr(get.obj)
+        arguments = tuple(self._compile_expr(argument) for argument in expr.arguments)
+        paren = expr.paren
+        name = get.name
+        lexeme = name.lexeme
+        find_method = get.cache.find_method
+        call_value = self.interpreter.call_value
+        invoke_method = self.interpreter.invoke_method
+
+        def invoke(env):
+            instance = obj(env)
+            if not isinstance(instance, YaploxInstance):
+                raise YaploxRuntimeError(name, "Only instances have properties.")
+
+            index = instance.shape.slots.get(lexeme)
+            if index is not None:
+                # A field shadows the methods
+                function = instance.values[index]
+                return call_value(paren, function, [arg(env) for arg in arguments])
+
+            method = find_method(instance.klass, lexeme)
+            if method is None:
+                raise YaploxRuntimeError(name, f"Undefined property '{lexeme}'.")
+
+            values = [argument(env) for argument in arguments]
+            return invoke_method(paren, method, instance, values)
+
+        return invoke
+
+    def visit_get_expr(self, expr: Get) -> Compiled:
+        obj = self._compile_expr(expr.obj)
+        name = expr.name
+        cached_get = expr.cache.get
+
+        def get(env):
+            instance = obj(env)
+            if isinstance(instance, YaploxInstance):
+                return cached_get(instance, name)
+            raise YaploxRuntimeError(name, "Only instances have properties.")
+
+        return get
+
+    def visit_set_expr(self, expr: Set) -> Compiled:
+        obj = self._compile_expr(expr.obj)
+        value = self._compile_expr(expr.value)
+        name = expr.name
+
+        def set_property(env):
+            instance = obj(env)
+            if not isinstance(instance, YaploxInstance):
+                raise YaploxRuntimeError(name, "Only instances have fields.")
+            result = value(env)
+            instance.set(name, result)
+            return result
+
+        return set_property
+
+    def visit_super_expr(self, expr: Super) -> Compiled:
+        superclass = self._compile_look_up(expr.keyword, expr)
+        this = self._compile_look_up(expr.keyword, expr.this)  # type: ignore
+        method_name = expr.method
+        find_method = expr.cache.find_method
+
+        def super_method(env):
+            method = find_method(superclass(env), method_name.lexeme)
+            if method is None:
+                raise YaploxRuntimeError(
+                    method_name, f"Undefined property '{method_name.lexeme}'."
+                )
+            return method.bind(this(env))
+
+        return super_method
+
+    # Statements
+    def visit_expression_stmt(self, stmt: Expression) -> Compiled:
+        return self._compile_expr(stmt.expression)
+
+    def visit_print_stmt(self, stmt: Print) -> Compiled:
+        value = self._compile_expr(stmt.expression)
+        stringify = Interpreter._stringify
+
+        def print_stmt(env):
+            print(stringify(value(env)))
+
+        return print_stmt
+
+    def visit_var_stmt(self, stmt: Var) -> Compiled:
+        define = self._compile_define(stmt)
+        if stmt.initializer is None:
+            return lambda env: define(env, None)
+
+        initializer = self._compile_expr(stmt.initializer)
+        return lambda env: define(env, initializer(env))
+
+    def visit_if_stmt(self, stmt: If) -> Compiled:
+        condition = self._compile_expr(stmt.condition)
+        then_branch = self._compile_stmt(stmt.then_branch)
+        else_branch: Optional[Compiled] = None
+        if stmt.else_branch is not None:
+            else_branch = self._compile_stmt(stmt.else_branch)
+        is_truthy = Interpreter._is_truthy
+
+        def if_stmt(env):
+            if is_truthy(condition(env)):
+                completion = then_branch(env)
+            elif else_branch is not None:
+                completion = else_branch(env)
+            else:
+                return None
+            return completion if completion is RETURN else None
+
+        return if_stmt
+
+    def visit_while_stmt(self, stmt: While) -> Compiled:
+        condition = self._compile_expr(stmt.condition)
+        enclosing_frames = self.loop_frames
+        self.loop_frames = []
+        body = self._compile_stmt(stmt.body)
+        frames = tuple(self.loop_frames)
+        self.loop_frames = enclosing_frames
+        is_truthy = Interpreter._is_truthy
+
+        if not frames:
+
+            def while_stmt(env):
+                while is_truthy(condition(env)):
+                    if body(env) is RETURN:
+                        return RETURN
+                return None
+
+            return while_stmt
+
+        def reusing_while_stmt(env):
+            try:
+                while is_truthy(condition(env)):
+                    if body(env) is RETURN:
+                        return RETURN
+                return None
+            finally:
+                for frame in frames:
+                    frame[0] = None
+
+        return reusing_while_stmt
+
+    def visit_return_stmt(self, stmt: Return) -> Compiled:
+        interpreter = self.interpreter
+
+        if stmt.value is None:
+
+            def return_nil(env):
+                interpreter.return_value = None
+                return RETURN
+
+            return return_nil
+
+        value = self._compile_expr(stmt.value)
+
+        def return_stmt(env):
+            interpreter.return_value = value(env)
+            return RETURN
+
+        return return_stmt
+
+    def visit_block_stmt(self, stmt: Block) -> Compiled:
+        statements = self._compile_statements(stmt.statements)
+        frame_type = stmt.frame_type
+        slot_count = stmt.slot_count
+
+        if frame_type is FrameType.NONE:
+            return statements
+
+        if frame_type is FrameType.FRESH or self.loop_frames is None:
+
+            def fresh_block(env):
+                return statements(SlotEnvironment(slot_count, env))
+
+            return fresh_block
+
+        frame: Frame = [None]
+        self.loop_frames.append(frame)
+
+        def reusable_block(env):
+            environment = frame[0]
+            if environment is None or environment.enclosing is not env:
+                environment = frame[0] = SlotEnvironment(slot_count, env)
+            return statements(environment)
+
+        return reusable_block
+
+    def _compile_function(
+        self, declaration: Function, is_initializer: bool = False
+    ) -> Compiled:
+        """
+        Compile the body of a function once, and return the closure that creates the
+        function with the upvalues of the environment it is called with
+        """
+        # The body runs in a call, not in the loops around the declaration
+        enclosing_frames = self.loop_frames
+        self.loop_frames = None
+        body = self._compile_statements(declaration.body)
+        self.loop_frames = enclosing_frames
+        upvalues: Tuple[Tuple[bool, int, int], ...] = declaration.upvalues
+
+        def create_function(env):
+            captured = [
+                env.get_at(depth, slot) if is_local else env.upvalues[slot]
+                for is_local, depth, slot in upvalues
+            ]
+            return CompiledFunction(declaration, body, captured, is_initializer)
+
+        return create_function
+
+    def visit_function_stmt(self, stmt: Function) -> Compiled:
+        define = self._compile_define(stmt)
+        initialize = self._compile_initialize(stmt)
+        create_function = self._compile_function(stmt)
+
+        def function_stmt(env):
+            define(env, None)
+            initialize(env, create_function(env))
+
+        return function_stmt
+
+    def visit_class_stmt(self, stmt: Class) -> Compiled:
+        define = self._compile_define(stmt)
+        initialize = self._compile_initialize(stmt)
+        methods = [
+            (
+                method.name.lexeme,
+                self._compile_function(method, method.name.lexeme == "init"),
+            )
+            for method in stmt.methods
+        ]
+        name = stmt.name.lexeme
+
+        superclass: Optional[Compiled] = None
+        superclass_name: Optional[Token] = None
+        if stmt.superclass is not None:
+            superclass = self._compile_expr(stmt.superclass)
+            superclass_name = stmt.superclass.name
+
+        def class_stmt(env):
+            superclass_value = None
+            if superclass is not None:
+                superclass_value = superclass(env)
+                if not isinstance(superclass_value, YaploxClass):
+                    raise YaploxRuntimeError(
+                        superclass_name, "Superclass must be a class."
+                    )
+
+            define(env, None)
+
+            method_env = env
+            if superclass is not None:
+                method_env = SlotEnvironment(1, env)
+                method_env.values[0] = Cell(superclass_value)
+
+            klass = YaploxClass(
+                name=name,
+                superclass=superclass_value,
+                methods={
+                    method_name: create_method(method_env)
+                    for method_name, create_method in methods
+                },
+            )
+            initialize(env, klass)
+
+        return class_stmt
@@ -0,0 +1,29 @@
+from typing import Any, List
+
+from structlog import get_logger
+
+from yaplox.closure_compiler import ClosureCompiler
+from yaplox.interpreter import Interpreter
+from yaplox.stmt import Stmt
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+logger = get_logger()
+
+
+class ClosureInterpreter(Interpreter):
+    """
+    Backend that compiles the resolved program with the ClosureCompiler before it
+    runs it, instead of visiting every node on every evaluation. It keeps the globals
+    and the top level environment of the Interpreter, so the REPL works the same.
+    """
+
+    def interpret(self, statements: List[Stmt], on_error=None) -> Any:
+        program = ClosureCompiler(self).compile(statements)
+        logger.debug("Compiled program", statements=len(program))
+        try:
+            res = None
+            for statement in program:
+                res = statement(self.environment)
+            return res
+        except YaploxRuntimeError as excp:
+            on_error(excp)
@@ -0,0 +1,127 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from structlog import get_logger
+
+from yaplox.__version__ import __version__
+from yaplox.stmt import Stmt
+
+logger = get_logger()
+
+SUFFIX = ".yaplox"
+
+
+class CompileCache:
+    """
+    Content-addressed cache of resolved programs, comparable with `__pycache__`.
+
+    Every entry holds the resolved statements. The Resolver stores its results on
+    the nodes, so they are pickled together with the statements. The name of an entry
+    is a hash of the source and the Yaplox version, so a changed source or an
+    upgrade will never hit an old entry.
+
+    When the total size of the entries grows beyond `max_size` bytes, the least
+    recently used entries are removed.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    @staticmethod
+    def key(source: str, variant: str = "") -> str:
+        """
+        Create the key for `source`. `variant` can be used to separate entries of
+        the same source that are compiled differently.
+        """
+        digest = hashlib.sha256()
+        for part in (__version__, variant, source):
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{SUFFIX}"
+
+    def load(self, key: str) -> Optional[List[Stmt]]:
+        """
+        Load the statements stored under `key`, or return None on a miss. An
+        unreadable entry counts as a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                statements = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring broken cache entry", path=str(path), error=str(e))
+            return None
+
+        # Mark the entry as recently used for the eviction
+        try:
+            os.utime(path)
+        except OSError as e:
+            # A read-only cache, or an entry that was just evicted
+            logger.debug("Cannot mark cache entry as used", error=str(e))
+        return statements
+
+    def store(self, key: str, statements: List[Stmt]):
+        """
+        Store the statements under `key`. The entry is written to a
+        temporary file first, so a concurrent run never reads a half written entry.
+        """
+        try:
+            data = pickle.dumps(statements, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError) as e:
+            # Extremely deep trees cannot be pickled, just run without the cache
+            logger.debug("Cannot cache program", error=str(e))
+            return
+
+        temp_name = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_name, self._path(key))
+        except OSError as e:
+            # The eviction only sees complete entries, so a temporary file that is
+            # left behind would never be removed
+            if temp_name is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(temp_name)
+            logger.warning("Cannot write cache entry", error=str(e))
+            return
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the total size of the cache is
+        within `max_size`.
+        """
+        entries = []
+        total_size = 0
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
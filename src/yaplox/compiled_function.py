@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional
+
+from yaplox.cell import Cell
+from yaplox.completion_type import CompletionType
+from yaplox.slot_environment import SlotEnvironment
+from yaplox.stmt import Function
+from yaplox.yaplox_function import YaploxFunction
+from yaplox.yaplox_instance import YaploxInstance
+
+
+class CompiledFunction(YaploxFunction):
+    """
+    A function of the ClosureCompiler. The body has been compiled into a Python
+    closure that runs in the environment of the call.
+    """
+
+    def __init__(
+        self,
+        declaration: Function,
+        body: Callable[[SlotEnvironment], Any],
+        upvalues: List[Cell],
+        is_initializer: bool,
+        instance: Optional[YaploxInstance] = None,
+    ):
+        super().__init__(declaration, upvalues, is_initializer, instance)
+        self.body = body
+
+    def bind(self, instance: YaploxInstance) -> CompiledFunction:
+        return CompiledFunction(
+            self.declaration, self.body, self.upvalues, self.is_initializer, instance
+        )
+
+    def call(self, interpreter, arguments):
+        completion = self.body(self._create_environment(arguments, self.instance))
+        if self.is_initializer:
+            return self.instance
+        if completion is CompletionType.RETURN:
+            return interpreter.return_value
+        return None
+
+    def invoke(self, interpreter, instance: YaploxInstance, arguments: List[Any]):
+        completion = self.body(self._create_environment(arguments, instance))
+        if self.is_initializer:
+            return instance
+        if completion is CompletionType.RETURN:
+            return interpreter.return_value
+        return None
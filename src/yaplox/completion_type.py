@@ -0,0 +1,14 @@
+import enum
+
+
+class CompletionType(enum.Enum):
+    """
+    The completion of a statement that doesn't continue with the next statement.
+
+    Executing a statement returns a CompletionType to unwind the statements around
+    it, anything else means it completed normally. This replaces raising an
+    exception for every `return`.
+    """
+
+    # A `return` statement has run, the value is in Interpreter.return_value
+    RETURN = enum.auto()
@@ -14,6 +14,33 @@ class AppConfig(Configuration):
         ]
 
     DEBUG = Value(default=False, cast=as_boolean, help="Toggle debugging mode.")
+    SCANNER = Value(
+        default="default", help="Scanner implementation, 'default' or 'regex'."
+    )
+    PARSER = Value(
+        default="recursive", help="Parser implementation, 'recursive' or 'pratt'."
+    )
+    BACKEND = Value(
+        default="interpreter",
+        help="Execution backend, 'interpreter', 'closure', 'bytecode' or 'python'.",
+    )
+    MAX_CALL_DEPTH = Value(
+        default=10000,
+        cast=int,
+        help="Maximum depth of Lox calls on the bytecode backend.",
+    )
+    OPTIMIZE = Value(default=1, cast=int, help="Optimization level, 0, 1 or 2.")
+    CACHE = Value(
+        default=False, cast=as_boolean, help="Cache resolved programs on disk."
+    )
+    CACHE_DIR = Value(
+        default="__yaplox_cache__", help="Directory of the cache of resolved programs."
+    )
+    CACHE_MAX_SIZE = Value(
+        default=64 * 1024 * 1024,
+        cast=int,
+        help="Maximum size of the cache in bytes, old entries are removed first.",
+    )
 
 
 def set_logging():
@@ -0,0 +1,62 @@
+from typing import Any
+
+from yaplox.expr import Binary, Expr, Grouping, Literal, Logical, Unary
+from yaplox.interpreter import Interpreter
+from yaplox.optimizer_pass import OptimizerPass
+from yaplox.token_type import TokenType
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+
+class ConstantFolder(OptimizerPass):
+    """
+    Replace expressions that only have literal operands with a Literal of their
+    value, so they are calculated once instead of every time they are executed.
+
+    The values are calculated by the Interpreter itself, so the folded value is
+    always the value that the interpreter would have calculated. When the
+    calculation fails, for example for `"a" - 1` or a division by zero, the
+    expression is kept, and the error is raised at runtime at the original token.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.interpreter = Interpreter()
+
+    def _fold(self, expr: Expr) -> Expr:
+        try:
+            value: Any = expr.accept(self.interpreter)
+        except (YaploxRuntimeError, ArithmeticError):
+            return expr
+
+        self.changes += 1
+        return Literal(value)
+
+    def visit_binary_expr(self, expr: Binary):
+        super().visit_binary_expr(expr)
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            return self._fold(expr)
+        return expr
+
+    def visit_grouping_expr(self, expr: Grouping):
+        # The tree already holds the grouping, the node itself is not needed
+        self.changes += 1
+        return self._optimize_expression(expr.expression)
+
+    def visit_logical_expr(self, expr: Logical):
+        super().visit_logical_expr(expr)
+        if not isinstance(expr.left, Literal):
+            return expr
+
+        # A logical operator returns one of its operands, the left one when it
+        # decides the outcome, and else the right one.
+        self.changes += 1
+        truthy = Interpreter._is_truthy(expr.left.value)
+        if truthy == (expr.operator.token_type == TokenType.OR):
+            return expr.left
+        return expr.right
+
+    def visit_unary_expr(self, expr: Unary):
+        super().visit_unary_expr(expr)
+        if isinstance(expr.right, Literal):
+            return self._fold(expr)
+        return expr
@@ -0,0 +1,102 @@
+from collections import Counter
+from typing import Iterable, List, Optional, Set
+
+from yaplox.expr import Assign, Expr, Grouping, Literal, Variable
+from yaplox.interpreter import Interpreter
+from yaplox.optimizer_pass import OptimizerPass
+from yaplox.stmt import Block, Function, If, Return, Stmt, Var, While
+
+
+class DeadCodeEliminator(OptimizerPass):
+    """
+    Remove code that can never run or has no effect:
+
+    - statements after a `return`
+    - branches of an `if` that are never taken, and `while` loops with a false
+      condition. The conditions are only known when the ConstantFolder ran first.
+    - local `var` declarations that are never used, when the initializer has no
+      side effects
+
+    `changes` holds the number of removed statements.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # All names that have been read or assigned so far. Every use of a local
+        # variable comes after its declaration, so when a scope has been optimized,
+        # all uses of its variables have been seen.
+        self.used_names: Set[str] = set()
+
+    def _optimize_statements(self, statements: List[Stmt]) -> List[Stmt]:
+        optimized = super()._optimize_statements(statements)
+        for index, statement in enumerate(optimized):
+            if isinstance(statement, Return) and index + 1 < len(optimized):
+                self.changes += len(optimized) - index - 1
+                return optimized[: index + 1]
+        return optimized
+
+    def _remove_unused_vars(
+        self, statements: List[Stmt], params: Iterable[str] = ()
+    ) -> List[Stmt]:
+        # A name that is declared twice is an error, leave that to the Resolver
+        declared = Counter(params)
+        declared.update(
+            stmt.name.lexeme for stmt in statements if isinstance(stmt, Var)
+        )
+
+        kept = []
+        for statement in statements:
+            if (
+                isinstance(statement, Var)
+                and statement.name.lexeme not in self.used_names
+                and declared[statement.name.lexeme] == 1
+                and self._is_pure(statement.initializer)
+            ):
+                self.changes += 1
+            else:
+                kept.append(statement)
+        return kept
+
+    @staticmethod
+    def _is_pure(expr: Optional[Expr]) -> bool:
+        while isinstance(expr, Grouping):
+            expr = expr.expression
+        return expr is None or isinstance(expr, Literal)
+
+    def visit_assign_expr(self, expr: Assign):
+        self.used_names.add(expr.name.lexeme)
+        return super().visit_assign_expr(expr)
+
+    def visit_variable_expr(self, expr: Variable):
+        self.used_names.add(expr.name.lexeme)
+        return expr
+
+    def visit_block_stmt(self, stmt: Block):
+        statements = self._optimize_statements(stmt.statements)
+        stmt.statements = self._remove_unused_vars(statements)
+        return stmt
+
+    def visit_function_stmt(self, stmt: Function):
+        statements = self._optimize_statements(stmt.body)
+        params = (param.lexeme for param in stmt.params)
+        stmt.body = self._remove_unused_vars(statements, params)
+        return stmt
+
+    def visit_if_stmt(self, stmt: If):
+        super().visit_if_stmt(stmt)
+        if not isinstance(stmt.condition, Literal):
+            return stmt
+
+        self.changes += 1
+        if Interpreter._is_truthy(stmt.condition.value):
+            return stmt.then_branch
+        return stmt.else_branch
+
+    def visit_while_stmt(self, stmt: While):
+        super().visit_while_stmt(stmt)
+        if isinstance(stmt.condition, Literal) and not Interpreter._is_truthy(
+            stmt.condition.value
+        ):
+            self.changes += 1
+            return None
+        return stmt
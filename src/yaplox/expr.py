@@ -4,9 +4,11 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import Any, List, Optional
 
+from yaplox.inline_cache import InlineCache
 from yaplox.token import Token
+from yaplox.variable_access import VariableAccess
 
 
 class ExprVisitor(ABC):
@@ -62,15 +64,24 @@ class ExprVisitor(ABC):
 
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: ExprVisitor):
         raise NotImplementedError
 
 
 class Assign(Expr):
+    __slots__ = ("name", "value", "depth", "slot", "access")
+    __match_args__ = ("name", "value")
+
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
+        # Annotations, set by the Resolver
+        self.depth: Optional[int] = None
+        self.slot: int = 0
+        self.access: VariableAccess = VariableAccess.GLOBAL
 
     def accept(self, visitor: ExprVisitor):
         """ Create a accept method that calls the visitor. """
@@ -78,6 +89,9 @@ class Assign(Expr):
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+    __match_args__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
@@ -89,6 +103,9 @@ class Binary(Expr):
 
 
 class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments")
+    __match_args__ = ("callee", "paren", "arguments")
+
     def __init__(self, callee: Expr, paren: Token, arguments: List[Expr]):
         self.callee = callee
         self.paren = paren
@@ -100,9 +117,14 @@ class Call(Expr):
 
 
 class Get(Expr):
+    __slots__ = ("obj", "name", "cache")
+    __match_args__ = ("obj", "name")
+
     def __init__(self, obj: Expr, name: Token):
         self.obj = obj
         self.name = name
+        # Annotations, set by the Resolver
+        self.cache: InlineCache = InlineCache()
 
     def accept(self, visitor: ExprVisitor):
         """ Create a accept method that calls the visitor. """
@@ -110,6 +132,9 @@ class Get(Expr):
 
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+    __match_args__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression = expression
 
@@ -119,6 +144,9 @@ class Grouping(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+    __match_args__ = ("value",)
+
     def __init__(self, value: Any):
         self.value = value
 
@@ -128,6 +156,9 @@ class Literal(Expr):
 
 
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+    __match_args__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
@@ -139,6 +170,9 @@ class Logical(Expr):
 
 
 class Set(Expr):
+    __slots__ = ("obj", "name", "value")
+    __match_args__ = ("obj", "name", "value")
+
     def __init__(self, obj: Expr, name: Token, value: Expr):
         self.obj = obj
         self.name = name
@@ -150,9 +184,18 @@ class Set(Expr):
 
 
 class Super(Expr):
+    __slots__ = ("keyword", "method", "depth", "slot", "access", "this", "cache")
+    __match_args__ = ("keyword", "method")
+
     def __init__(self, keyword: Token, method: Token):
         self.keyword = keyword
         self.method = method
+        # Annotations, set by the Resolver
+        self.depth: Optional[int] = None
+        self.slot: int = 0
+        self.access: VariableAccess = VariableAccess.GLOBAL
+        self.this: Optional[This] = None
+        self.cache: InlineCache = InlineCache()
 
     def accept(self, visitor: ExprVisitor):
         """ Create a accept method that calls the visitor. """
@@ -160,8 +203,15 @@ class Super(Expr):
 
 
 class This(Expr):
+    __slots__ = ("keyword", "depth", "slot", "access")
+    __match_args__ = ("keyword",)
+
     def __init__(self, keyword: Token):
         self.keyword = keyword
+        # Annotations, set by the Resolver
+        self.depth: Optional[int] = None
+        self.slot: int = 0
+        self.access: VariableAccess = VariableAccess.GLOBAL
 
     def accept(self, visitor: ExprVisitor):
         """ Create a accept method that calls the visitor. """
@@ -169,6 +219,9 @@ class This(Expr):
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+    __match_args__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
@@ -179,8 +232,15 @@ class Unary(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ("name", "depth", "slot", "access")
+    __match_args__ = ("name",)
+
     def __init__(self, name: Token):
         self.name = name
+        # Annotations, set by the Resolver
+        self.depth: Optional[int] = None
+        self.slot: int = 0
+        self.access: VariableAccess = VariableAccess.GLOBAL
 
     def accept(self, visitor: ExprVisitor):
         """ Create a accept method that calls the visitor. """
@@ -0,0 +1,17 @@
+import enum
+
+
+class FrameType(enum.Enum):
+    """
+    The kind of environment the Interpreter creates for a Block, decided by the
+    Resolver.
+    """
+
+    # The block declares nothing, it runs in the environment of its parent
+    NONE = enum.auto()
+    # Closures capture the Cells of the variables instead of the frame, so when the
+    # block runs again in the same enclosing environment while a loop around it
+    # runs, its frame is reused
+    REUSABLE = enum.auto()
+    # A new frame for every execution, for a block that has not been resolved
+    FRESH = enum.auto()
@@ -0,0 +1,112 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+from yaplox.regex_scanner import RegexScanner
+from yaplox.token_buffer import TokenBuffer
+from yaplox.token_type import TokenType
+
+
+class IncrementalScanner:
+    """
+    Keep the tokens of a source up to date while it is being edited.
+
+    After an edit only the damaged region is scanned again. Scanning restarts at the
+    last token before the edit that cannot merge with the edited text, and stops as
+    soon as a new token starts where an old token started after the edit. From that
+    point on the old and new tokens are the same, only shifted. Line numbers are not
+    stored in a TokenBuffer, so they follow automatically from the updated newline
+    table.
+    """
+
+    def __init__(self, source: str, on_error=None):
+        self.on_error = on_error
+        self.buffer: TokenBuffer = RegexScanner(source, on_error).scan_buffer()
+        # Number of tokens that were scanned by the last edit
+        self.relexed = len(self.buffer)
+
+    @property
+    def source(self) -> str:
+        return self.buffer.source
+
+    def edit(self, offset: int, removed: int, inserted: str) -> TokenBuffer:
+        """
+        Replace `removed` characters at `offset` with the text `inserted`, and return
+        the TokenBuffer for the new source.
+        """
+        old = self.buffer
+        source = old.source[:offset] + inserted + old.source[offset + removed :]
+        delta = len(inserted) - removed
+        edit_end = offset + len(inserted)
+
+        first = self._restart_index(old, offset)
+        restart = old.starts[first] if first >= 0 else 0
+        first = max(first, 0)
+
+        buffer = TokenBuffer(source)
+        buffer.token_types = old.token_types[:first]
+        buffer.starts = old.starts[:first]
+        buffer.lengths = old.lengths[:first]
+        buffer._newlines = self._edit_newlines(old, offset, removed, inserted)
+
+        scanner = RegexScanner(source, self.on_error)
+        scanner.line = buffer.line_at(restart)
+
+        self.relexed = 0
+        resync = None
+        old_index = bisect_left(old.starts, edit_end - delta)
+        for token_type, start, end, _ in scanner._scan(restart):
+            if start >= edit_end:
+                old_start = start - delta
+                while old.starts[old_index] < old_start:
+                    old_index += 1
+                if old.starts[old_index] == old_start:
+                    resync = old_index
+                    break
+
+            buffer.append(token_type, start, end - start)
+            self.relexed += 1
+
+        if resync is None:
+            buffer.append(TokenType.EOF, len(source), 0)
+        else:
+            # The rest of the tokens did not change, they just moved
+            buffer.token_types.extend(old.token_types[resync:])
+            buffer.lengths.extend(old.lengths[resync:])
+            buffer.starts.extend(start + delta for start in old.starts[resync:])
+
+        self.buffer = buffer
+        return buffer
+
+    @staticmethod
+    def _restart_index(old: TokenBuffer, offset: int) -> int:
+        """
+        Find the token to restart scanning from, or -1 to scan from the beginning.
+
+        This is the last token that starts before the edit, not counting EOF: after
+        an unterminated string or a comment on the last line, the EOF position is
+        not a safe place to restart. The edited text can merge with the tokens in
+        front of it, like `12` `.` and an inserted `5`. So walk back as long as the
+        tokens are directly adjacent; whitespace between tokens cannot be merged.
+        """
+        starts = old.starts
+        lengths = old.lengths
+
+        index = min(bisect_right(starts, offset), len(old) - 1) - 1
+        while index > 0 and starts[index - 1] + lengths[index - 1] == starts[index]:
+            index -= 1
+        return index
+
+    @staticmethod
+    def _edit_newlines(
+        old: TokenBuffer, offset: int, removed: int, inserted: str
+    ) -> array:
+        newlines = old.newlines
+        delta = len(inserted) - removed
+        before = bisect_left(newlines, offset)
+        after = bisect_left(newlines, offset + removed)
+
+        result = newlines[:before]
+        result.extend(offset + match.start() for match in re.finditer("\n", inserted))
+        result.extend(newline + delta for newline in newlines[after:])
+        return result
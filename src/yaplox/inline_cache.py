@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from yaplox.token import Token
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+if TYPE_CHECKING:
+    from yaplox.yaplox_class import YaploxClass
+    from yaplox.yaplox_function import YaploxFunction
+    from yaplox.yaplox_instance import YaploxInstance
+
+# The number of classes a cache remembers. A call site that sees more classes is
+# megamorphic, and looks up every class that is not cached yet.
+MAX_ENTRIES = 4
+
+
+class InlineCache:
+    """
+    The methods found at one `Get` or `Super` expression, by the class they were
+    looked up in.
+
+    Classes can't be changed after they have been created, a redefined class is a
+    new YaploxClass. So a cached method stays valid as long as its class is the key,
+    and a redefined class misses instead of finding the old method.
+    """
+
+    __slots__ = ("entries", "hits", "misses")
+
+    def __init__(self):
+        self.entries: Dict[YaploxClass, Optional[YaploxFunction]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __reduce__(self):
+        # A pickled program gets an empty cache, the classes belong to one run
+        return InlineCache, ()
+
+    def find_method(self, klass: YaploxClass, name: str) -> Optional[YaploxFunction]:
+        entries = self.entries
+        if klass in entries:
+            self.hits += 1
+            return entries[klass]
+
+        self.misses += 1
+        method = klass.find_method(name)
+        if len(entries) < MAX_ENTRIES:
+            entries[klass] = method
+        return method
+
+    def get(self, instance: YaploxInstance, name: Token) -> Any:
+        """
+        Get a property like YaploxInstance.get: a field, or else a bound method
+        """
+        lexeme = name.lexeme
+        index = instance.shape.slots.get(lexeme)
+        if index is not None:
+            return instance.values[index]
+
+        method = self.find_method(instance.klass, lexeme)
+        if method is None:
+            raise YaploxRuntimeError(name, f"Undefined property '{lexeme}'.")
+        return method.bind(instance)
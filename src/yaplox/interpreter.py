@@ -1,8 +1,11 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 
 from structlog import get_logger
 
+from yaplox.binary_operators import BINARY_OPERATORS
+from yaplox.cell import Cell
 from yaplox.clock import Clock
+from yaplox.completion_type import CompletionType
 from yaplox.environment import Environment
 from yaplox.expr import (
     Assign,
@@ -20,6 +23,9 @@ from yaplox.expr import (
     Unary,
     Variable,
 )
+from yaplox.frame_type import FrameType
+from yaplox.resolved_locals import ResolvedExpr, ResolvedLocals
+from yaplox.slot_environment import SlotEnvironment
 from yaplox.stmt import (
     Block,
     Class,
@@ -35,21 +41,31 @@ from yaplox.stmt import (
 )
 from yaplox.token import Token
 from yaplox.token_type import TokenType
+from yaplox.variable_access import VariableAccess
 from yaplox.yaplox_callable import YaploxCallable
 from yaplox.yaplox_class import YaploxClass
 from yaplox.yaplox_function import YaploxFunction
 from yaplox.yaplox_instance import YaploxInstance
-from yaplox.yaplox_return_exception import YaploxReturnException
 from yaplox.yaplox_runtime_error import YaploxRuntimeError
 
 logger = get_logger()
 
+Declaration = Union[Class, Function, Var]
+
 
 class Interpreter(ExprVisitor, StmtVisitor):
     def __init__(self):
         self.globals = Environment()
-        self.environment = self.globals
-        self.locals = dict()
+        # Local variables live in slot environments, the top level has no slots
+        self.environment = SlotEnvironment(0)
+        # The Resolver stores the depth and slot on the expressions themselves,
+        # locals only gives dict style access to them
+        self.locals = ResolvedLocals()
+        # The last frame of the reusable Blocks in the loop that is running. A loop
+        # drops the frames when it ends, so they don't keep the locals alive.
+        self._loop_frames: Optional[Dict[Block, SlotEnvironment]] = None
+        # The value of the last return statement
+        self.return_value: Any = None
 
         self.globals.define("clock", Clock())
 
@@ -68,8 +84,57 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def _execute(self, stmt: Stmt):
         return stmt.accept(self)
 
-    def resolve(self, expr: Expr, depth: int):
-        self.locals[expr] = depth
+    @staticmethod
+    def resolve(expr: ResolvedExpr, depth: int, slot: int):
+        expr.access = VariableAccess.LOCAL
+        expr.depth = depth
+        expr.slot = slot
+
+    @staticmethod
+    def resolve_upvalue(expr: ResolvedExpr, index: int):
+        expr.access = VariableAccess.UPVALUE
+        expr.depth = None
+        expr.slot = index
+
+    def _define(self, declaration: Declaration, value: Any):
+        """
+        Define a variable in its slot, or as global when there is no slot. A variable
+        that is captured by a closure gets a new Cell.
+        """
+        slot = declaration.slot
+        if slot is None:
+            self.globals.define(declaration.name.lexeme, value)
+        elif declaration.captured:
+            self.environment.values[slot] = Cell(value)
+        else:
+            self.environment.values[slot] = value
+
+    def _initialize(self, declaration: Declaration, value: Any):
+        """
+        Set the value of a variable that has been defined before, without replacing
+        its Cell
+        """
+        slot = declaration.slot
+        if slot is None:
+            self.globals.define(declaration.name.lexeme, value)
+        elif declaration.captured:
+            self.environment.values[slot].value = value
+        else:
+            self.environment.values[slot] = value
+
+    def _create_function(
+        self, declaration: Function, is_initializer: bool = False
+    ) -> YaploxFunction:
+        """
+        Create a function, and capture the cells of the variables it uses from the
+        functions around it
+        """
+        environment = self.environment
+        upvalues = [
+            environment.get_at(depth, slot) if is_local else environment.upvalues[slot]
+            for is_local, depth, slot in declaration.upvalues
+        ]
+        return YaploxFunction(declaration, upvalues, is_initializer)
 
     @staticmethod
     def _stringify(obj) -> str:
@@ -83,94 +148,97 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
         return str(obj)
 
-    @staticmethod
-    def _binary_plus(expr, left, right):
-        if isinstance(left, (float, int)) and isinstance(right, (float, int)):
-            return left + right
-
-        if isinstance(left, str) and isinstance(right, str):
-            return str(left + right)
-
-        raise YaploxRuntimeError(
-            expr.operator, "Operands must be two numbers or two strings"
-        )
-
-    @staticmethod
-    def _is_equal(a, b) -> bool:
-        if a is None and b is None:
-            return True
-
-        if a is None:
-            return False
-
-        return a == b
-
     def visit_binary_expr(self, expr: Binary):
         left = self._evaluate(expr.left)
         right = self._evaluate(expr.right)
-        token_type = expr.operator.token_type
-
-        # Validate that for the following Tokens the operands are numeric.
-        # Orginal jpox does this in a switch statement. Since python does not
-        # have this statement, the dict method is chosen. To not duplicate this line
-        # over and over, the check is done seperately.
-        if token_type in (
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-            TokenType.MINUS,
-            TokenType.SLASH,
-            TokenType.STAR,
-        ):
-            self._check_number_operands(expr.operator, left, right)
-
-        choices = {
-            # Comparison operators
-            TokenType.GREATER: lambda: float(left) > float(right),
-            TokenType.GREATER_EQUAL: lambda: float(left) >= float(right),
-            TokenType.LESS: lambda: float(left) < float(right),
-            TokenType.LESS_EQUAL: lambda: float(left) <= float(right),
-            # Equality
-            TokenType.BANG_EQUAL: lambda: not self._is_equal(left, right),
-            TokenType.EQUAL_EQUAL: lambda: self._is_equal(left, right),
-            # Arithmetic operators
-            TokenType.MINUS: lambda: float(left) - float(right),
-            TokenType.SLASH: lambda: float(left) / float(right),
-            TokenType.STAR: lambda: float(left) * float(right),
-            TokenType.PLUS: lambda: self._binary_plus(expr, left, right),
-        }
 
+        # The operators are looked up in a table that is built once, every
+        # implementation checks the types of its operands itself.
         try:
-            option = choices[token_type]
-            result = option()
-            return result
-
+            operator = BINARY_OPERATORS[expr.operator.token_type]
         except KeyError:
             raise YaploxRuntimeError(
                 expr.operator, f"Unknown operator {expr.operator.lexeme}"
             )
+        return operator(expr.operator, left, right)
 
     def visit_call_expr(self, expr: Call):
-        function = self._evaluate(expr.callee)
+        callee = expr.callee
+        if type(callee) is Get:
+            return self._invoke(expr, callee)
 
+        function = self._evaluate(callee)
         arguments = [self._evaluate(argument) for argument in expr.arguments]
+        return self.call_value(expr.paren, function, arguments)
 
+    def call_value(self, paren: Token, function: Any, arguments: List[Any]):
+        """
+        Call a value with the evaluated arguments, after checking that it can be
+        called with them
+        """
         if not isinstance(function, YaploxCallable):
-            raise YaploxRuntimeError(expr.paren, "Can only call functions and classes.")
+            raise YaploxRuntimeError(paren, "Can only call functions and classes.")
 
-        # function = YaploxCallable(callee)
         if len(arguments) != function.arity():
             raise YaploxRuntimeError(
-                expr.paren,
+                paren,
                 f"Expected {function.arity()} arguments but got {len(arguments)}.",
             )
-        return function.call(self, arguments)
+        try:
+            return function.call(self, arguments)
+        except RecursionError:
+            # Lox calls use the Python stack, the innermost call reports it
+            raise YaploxRuntimeError(paren, "Stack overflow.")
+
+    def invoke_method(
+        self,
+        paren: Token,
+        method: YaploxFunction,
+        instance: YaploxInstance,
+        arguments: List[Any],
+    ):
+        """
+        Call a method of `instance` that was found in its class, with `this` in the
+        frame of the call instead of a bound method
+        """
+        if len(arguments) != method.arity():
+            raise YaploxRuntimeError(
+                paren,
+                f"Expected {method.arity()} arguments but got {len(arguments)}.",
+            )
+        try:
+            return method.invoke(self, instance, arguments)
+        except RecursionError:
+            raise YaploxRuntimeError(paren, "Stack overflow.")
+
+    def _invoke(self, expr: Call, get: Get):
+        """
+        Call a property: a field like any other value, or else a method with
+        invoke_method
+        """
+        obj = self._evaluate(get.obj)
+        if not isinstance(obj, YaploxInstance):
+            raise YaploxRuntimeError(get.name, "Only instances have properties.")
+
+        name = get.name.lexeme
+        index = obj.shape.slots.get(name)
+        if index is not None:
+            # A field shadows the methods
+            function = obj.values[index]
+            arguments = [self._evaluate(argument) for argument in expr.arguments]
+            return self.call_value(expr.paren, function, arguments)
+
+        method = get.cache.find_method(obj.klass, name)
+        if method is None:
+            raise YaploxRuntimeError(get.name, f"Undefined property '{name}'.")
+
+        arguments = [self._evaluate(argument) for argument in expr.arguments]
+        return self.invoke_method(expr.paren, method, obj, arguments)
 
     def visit_get_expr(self, expr: Get):
         obj = self._evaluate(expr.obj)
         if isinstance(obj, YaploxInstance):
-            return obj.get(expr.name)
+            return expr.cache.get(obj, expr.name)
 
         raise YaploxRuntimeError(expr.name, "Only instances have properties.")
 
@@ -201,12 +269,9 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return value
 
     def visit_super_expr(self, expr: Super):
-        distance = self.locals[expr]
-        superclass: YaploxClass = self.environment.get_at(
-            distance=distance, name="super"
-        )
-        obj = self.environment.get_at(distance=distance - 1, name="this")
-        method = superclass.find_method(expr.method.lexeme)
+        superclass: YaploxClass = self._look_up_variable(expr.keyword, expr)
+        obj = self._look_up_variable(expr.keyword, expr.this)  # type: ignore
+        method = expr.cache.find_method(superclass, expr.method.lexeme)
 
         # Check that we have a super method
         if method is None:
@@ -234,12 +299,6 @@ class Interpreter(ExprVisitor, StmtVisitor):
             return
         raise YaploxRuntimeError(operator, f"{operand} must be a number.")
 
-    @staticmethod
-    def _check_number_operands(operator: Token, left: Any, right: Any):
-        if isinstance(left, (float, int)) and isinstance(right, (float, int)):
-            return
-        raise YaploxRuntimeError(operator, "Operands must be numbers.")
-
     @staticmethod
     def _is_truthy(obj):
         if obj is None:
@@ -256,18 +315,31 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visit_variable_expr(self, expr: "Variable") -> Any:
         return self._look_up_variable(expr.name, expr)
 
-    def _look_up_variable(self, name: Token, expr: Expr) -> Any:
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
-        else:
+    def _look_up_variable(self, name: Token, expr: ResolvedExpr) -> Any:
+        access = expr.access
+        if access is VariableAccess.GLOBAL:
             return self.globals.get(name)
 
+        if access is VariableAccess.UPVALUE:
+            return self.environment.upvalues[expr.slot].value
+
+        environment = self.environment
+        for _ in range(expr.depth):  # type: ignore
+            environment = environment.enclosing  # type: ignore
+        value = environment.values[expr.slot]
+        if access is VariableAccess.CELL:
+            return value.value
+        return value
+
     def visit_assign_expr(self, expr: "Assign") -> Any:
         value = self._evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance:
-            self.environment.assign_at(distance, expr.name, value)
+        access = expr.access
+        if access is VariableAccess.LOCAL:
+            self.environment.assign_at(expr.depth, expr.slot, value)  # type: ignore
+        elif access is VariableAccess.UPVALUE:
+            self.environment.upvalues[expr.slot].value = value
+        elif access is VariableAccess.CELL:
+            self.environment.get_at(expr.depth, expr.slot).value = value  # type: ignore
         else:
             self.globals.assign(expr.name, value)
 
@@ -283,18 +355,17 @@ class Interpreter(ExprVisitor, StmtVisitor):
                     stmt.superclass.name, "Superclass must be a class."
                 )
 
-        self.environment.define(stmt.name.lexeme, None)
+        self._define(stmt, None)
 
         if stmt.superclass is not None:
-            self.environment = Environment(self.environment)
-            self.environment.define("super", superclass)
+            # `super` is only used by the methods, so it is always captured
+            self.environment = SlotEnvironment(1, self.environment)
+            self.environment.values[0] = Cell(superclass)
 
         methods: Dict[str, YaploxFunction] = {}
 
         for method in stmt.methods:
-            function = YaploxFunction(
-                method, self.environment, method.name.lexeme == "init"
-            )
+            function = self._create_function(method, method.name.lexeme == "init")
             methods[method.name.lexeme] = function
 
         klass = YaploxClass(
@@ -304,50 +375,103 @@ class Interpreter(ExprVisitor, StmtVisitor):
         if stmt.superclass is not None:
             self.environment = self.environment.enclosing  # type: ignore
 
-        self.environment.assign(stmt.name, klass)
+        self._initialize(stmt, klass)
 
     def visit_expression_stmt(self, stmt: Expression) -> None:
         return self._evaluate(stmt.expression)
 
     def visit_function_stmt(self, stmt: Function) -> None:
-        function = YaploxFunction(stmt, self.environment, False)
-        self.environment.define(stmt.name.lexeme, function)
+        # Define the variable first, a recursive function captures its own cell
+        self._define(stmt, None)
+        self._initialize(stmt, self._create_function(stmt))
 
-    def visit_if_stmt(self, stmt: If) -> None:
+    def visit_if_stmt(self, stmt: If) -> Optional[CompletionType]:
         if self._is_truthy(self._evaluate(stmt.condition)):
-            self._execute(stmt.then_branch)
+            completion = self._execute(stmt.then_branch)
         elif stmt.else_branch is not None:
-            self._execute(stmt.else_branch)
+            completion = self._execute(stmt.else_branch)
+        else:
+            return None
+        return completion if completion is CompletionType.RETURN else None
 
-    def visit_while_stmt(self, stmt: While) -> None:
-        while self._is_truthy(self._evaluate(stmt.condition)):
-            self._execute(stmt.body)
+    def visit_while_stmt(self, stmt: While) -> Optional[CompletionType]:
+        loop_frames = self._loop_frames
+        self._loop_frames = {}
+        try:
+            while self._is_truthy(self._evaluate(stmt.condition)):
+                if self._execute(stmt.body) is CompletionType.RETURN:
+                    return CompletionType.RETURN
+            return None
+        finally:
+            self._loop_frames = loop_frames
 
     def visit_print_stmt(self, stmt: Print) -> None:
         value = self._evaluate(stmt.expression)
         print(self._stringify(value))
 
-    def visit_return_stmt(self, stmt: Return) -> None:
+    def visit_return_stmt(self, stmt: Return) -> CompletionType:
         value = None
         if stmt.value:
             value = self._evaluate(stmt.value)
-        raise YaploxReturnException(value=value)
+        # The statements around the return unwind up to the call of the function
+        self.return_value = value
+        return CompletionType.RETURN
 
     def visit_var_stmt(self, stmt: "Var") -> None:
         value = None
         if stmt.initializer is not None:
             value = self._evaluate(stmt.initializer)
 
-        self.environment.define(stmt.name.lexeme, value)
-
-    def visit_block_stmt(self, stmt: "Block") -> None:
-        self.execute_block(stmt.statements, Environment(self.environment))
-
-    def execute_block(self, statements: List[Stmt], environment: Environment):
+        self._define(stmt, value)
+
+    def visit_block_stmt(self, stmt: "Block") -> Optional[CompletionType]:
+        frame_type = stmt.frame_type
+        if frame_type is FrameType.NONE:
+            for statement in stmt.statements:
+                if self._execute(statement) is CompletionType.RETURN:
+                    return CompletionType.RETURN
+            return None
+
+        loop_frames = self._loop_frames
+        if frame_type is FrameType.REUSABLE and loop_frames is not None:
+            # Every slot is written by its declaration before it is read, so the
+            # values of the previous iteration don't have to be cleared.
+            environment = loop_frames.get(stmt)
+            if environment is None or environment.enclosing is not self.environment:
+                environment = SlotEnvironment(stmt.slot_count, self.environment)
+                loop_frames[stmt] = environment
+        else:
+            environment = SlotEnvironment(stmt.slot_count, self.environment)
+
+        return self.execute_block(stmt.statements, environment)
+
+    def execute_function(
+        self, statements: List[Stmt], environment: SlotEnvironment
+    ) -> Optional[CompletionType]:
+        """
+        Execute the body of a function call. Its blocks don't reuse frames in the
+        loops of the caller, these would keep the locals of the call alive.
+        """
+        loop_frames = self._loop_frames
+        self._loop_frames = None
+        try:
+            return self.execute_block(statements, environment)
+        finally:
+            self._loop_frames = loop_frames
+
+    def execute_block(
+        self, statements: List[Stmt], environment: SlotEnvironment
+    ) -> Optional[CompletionType]:
+        """
+        Execute the statements in an environment. Returns CompletionType.RETURN when
+        a return statement has run.
+        """
         previous_env = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self._execute(statement)
+                if self._execute(statement) is CompletionType.RETURN:
+                    return CompletionType.RETURN
+            return None
         finally:
             self.environment = previous_env
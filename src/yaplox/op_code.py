@@ -0,0 +1,120 @@
+import enum
+from typing import Dict
+
+
+class OpCode(enum.IntEnum):
+    """
+    The instructions of the VirtualMachine. The operands follow the instruction in
+    the code of a Chunk, OPERANDS holds their number.
+    """
+
+    # Constants and literals
+    CONSTANT = enum.auto()
+    NIL = enum.auto()
+    TRUE = enum.auto()
+    FALSE = enum.auto()
+    POP = enum.auto()
+    # Variables, the operand is a slot in the frame, an upvalue index or a constant
+    # with the name
+    GET_LOCAL = enum.auto()
+    SET_LOCAL = enum.auto()
+    STORE_LOCAL = enum.auto()
+    GET_CELL = enum.auto()
+    SET_CELL = enum.auto()
+    STORE_NEW_CELL = enum.auto()
+    MAKE_CELL = enum.auto()
+    GET_UPVALUE = enum.auto()
+    SET_UPVALUE = enum.auto()
+    GET_GLOBAL = enum.auto()
+    SET_GLOBAL = enum.auto()
+    DEFINE_GLOBAL = enum.auto()
+    # Properties, the operand is a constant with the name. For GET_PROPERTY and
+    # GET_SUPER it is the expression, that has the name and an InlineCache
+    GET_PROPERTY = enum.auto()
+    CHECK_INSTANCE = enum.auto()
+    SET_PROPERTY = enum.auto()
+    GET_SUPER = enum.auto()
+    # Pushes the method and the instance for an INVOKE, or a field and nil
+    GET_METHOD = enum.auto()
+    # Operators, the operand is a constant with the operator token for errors
+    EQUAL = enum.auto()
+    NOT_EQUAL = enum.auto()
+    GREATER = enum.auto()
+    GREATER_EQUAL = enum.auto()
+    LESS = enum.auto()
+    LESS_EQUAL = enum.auto()
+    ADD = enum.auto()
+    SUBTRACT = enum.auto()
+    MULTIPLY = enum.auto()
+    DIVIDE = enum.auto()
+    NOT = enum.auto()
+    NEGATE = enum.auto()
+    PRINT = enum.auto()
+    # Jumps, the operand is the offset from the next instruction
+    JUMP = enum.auto()
+    JUMP_IF_FALSE = enum.auto()
+    JUMP_IF_TRUE = enum.auto()
+    POP_JUMP_IF_FALSE = enum.auto()
+    LOOP = enum.auto()
+    # Functions and classes
+    CALL = enum.auto()
+    # A call in a return statement, it replaces the frame of the caller
+    TAIL_CALL = enum.auto()
+    # A call of the result of GET_METHOD, the instance is `this` of the method
+    INVOKE = enum.auto()
+    TAIL_INVOKE = enum.auto()
+    CLOSURE = enum.auto()
+    RETURN = enum.auto()
+    CHECK_SUPERCLASS = enum.auto()
+    CLASS = enum.auto()
+
+
+OPERANDS: Dict[OpCode, int] = {
+    **{op_code: 0 for op_code in OpCode},
+    **{
+        op_code: 1
+        for op_code in (
+            OpCode.CONSTANT,
+            OpCode.GET_LOCAL,
+            OpCode.SET_LOCAL,
+            OpCode.STORE_LOCAL,
+            OpCode.GET_CELL,
+            OpCode.SET_CELL,
+            OpCode.STORE_NEW_CELL,
+            OpCode.MAKE_CELL,
+            OpCode.GET_UPVALUE,
+            OpCode.SET_UPVALUE,
+            OpCode.GET_GLOBAL,
+            OpCode.SET_GLOBAL,
+            OpCode.DEFINE_GLOBAL,
+            OpCode.GET_PROPERTY,
+            OpCode.CHECK_INSTANCE,
+            OpCode.SET_PROPERTY,
+            OpCode.GET_SUPER,
+            OpCode.GET_METHOD,
+            OpCode.GREATER,
+            OpCode.GREATER_EQUAL,
+            OpCode.LESS,
+            OpCode.LESS_EQUAL,
+            OpCode.ADD,
+            OpCode.SUBTRACT,
+            OpCode.MULTIPLY,
+            OpCode.DIVIDE,
+            OpCode.NEGATE,
+            OpCode.JUMP,
+            OpCode.JUMP_IF_FALSE,
+            OpCode.JUMP_IF_TRUE,
+            OpCode.POP_JUMP_IF_FALSE,
+            OpCode.LOOP,
+            OpCode.CLOSURE,
+            OpCode.CHECK_SUPERCLASS,
+        )
+    },
+    # The number of arguments and the parenthesis token
+    OpCode.CALL: 2,
+    OpCode.TAIL_CALL: 2,
+    OpCode.INVOKE: 2,
+    OpCode.TAIL_INVOKE: 2,
+    # The name, the number of methods and whether there is a superclass
+    OpCode.CLASS: 3,
+}
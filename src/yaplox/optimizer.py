@@ -0,0 +1,46 @@
+from typing import Dict, List, Tuple, Type
+
+from structlog import get_logger
+
+from yaplox.constant_folder import ConstantFolder
+from yaplox.dead_code_eliminator import DeadCodeEliminator
+from yaplox.optimizer_pass import OptimizerPass
+from yaplox.stmt import Stmt
+
+logger = get_logger()
+
+# The passes in the order they are run, with the lowest level that enables them
+PASSES: List[Tuple[int, Type[OptimizerPass]]] = [
+    (1, ConstantFolder),
+    (2, DeadCodeEliminator),
+]
+
+MAX_LEVEL = 2
+
+
+class Optimizer:
+    """
+    Pass manager that runs the optimizer passes between the Parser and the
+    Resolver. Level 0 disables all optimizations, each higher level adds more
+    passes.
+    """
+
+    def __init__(self, level: int):
+        if not 0 <= level <= MAX_LEVEL:
+            raise ValueError(f"Optimization level must be between 0 and {MAX_LEVEL}")
+        self.level = level
+        self.passes = [
+            pass_class for min_level, pass_class in PASSES if level >= min_level
+        ]
+        # The number of changes per pass in the last run
+        self.changes: Dict[str, int] = {}
+
+    def optimize(self, statements: List[Stmt]) -> List[Stmt]:
+        self.changes = {}
+        for pass_class in self.passes:
+            optimizer_pass = pass_class()
+            statements = optimizer_pass.optimize(statements)
+            self.changes[pass_class.__name__] = optimizer_pass.changes
+
+        logger.info("Optimized", level=self.level, **self.changes)
+        return statements
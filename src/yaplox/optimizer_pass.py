@@ -0,0 +1,167 @@
+from typing import List, Optional
+
+from yaplox.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from yaplox.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    StmtVisitor,
+    Var,
+    While,
+)
+
+
+class OptimizerPass(ExprVisitor, StmtVisitor):
+    """
+    Base class for a pass of the Optimizer. It walks the whole tree, and replaces
+    every node with the node that its visit method returns. The nodes are changed in
+    place, a pass only has to override the visit methods of the nodes it optimizes.
+
+    A visit method for a statement may return None to remove the statement.
+    """
+
+    def __init__(self):
+        # The number of nodes that have been changed or removed by this pass
+        self.changes = 0
+
+    def optimize(self, statements: List[Stmt]) -> List[Stmt]:
+        return self._optimize_statements(statements)
+
+    def _optimize_statements(self, statements: List[Stmt]) -> List[Stmt]:
+        optimized = []
+        for statement in statements:
+            result = self._optimize_statement(statement)
+            if result is not None:
+                optimized.append(result)
+        return optimized
+
+    def _optimize_statement(self, statement: Stmt) -> Optional[Stmt]:
+        return statement.accept(self)
+
+    def _optimize_branch(self, statement: Stmt) -> Stmt:
+        """
+        Optimize the body of an if or while statement, that cannot be removed
+        """
+        result = self._optimize_statement(statement)
+        if result is None:
+            return Block([])
+        return result
+
+    def _optimize_expression(self, expression: Expr) -> Expr:
+        return expression.accept(self)
+
+    def visit_assign_expr(self, expr: Assign):
+        expr.value = self._optimize_expression(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: Binary):
+        expr.left = self._optimize_expression(expr.left)
+        expr.right = self._optimize_expression(expr.right)
+        return expr
+
+    def visit_call_expr(self, expr: Call):
+        expr.callee = self._optimize_expression(expr.callee)
+        expr.arguments = [
+            self._optimize_expression(argument) for argument in expr.arguments
+        ]
+        return expr
+
+    def visit_get_expr(self, expr: Get):
+        expr.obj = self._optimize_expression(expr.obj)
+        return expr
+
+    def visit_grouping_expr(self, expr: Grouping):
+        expr.expression = self._optimize_expression(expr.expression)
+        return expr
+
+    def visit_literal_expr(self, expr: Literal):
+        return expr
+
+    def visit_logical_expr(self, expr: Logical):
+        expr.left = self._optimize_expression(expr.left)
+        expr.right = self._optimize_expression(expr.right)
+        return expr
+
+    def visit_set_expr(self, expr: Set):
+        expr.obj = self._optimize_expression(expr.obj)
+        expr.value = self._optimize_expression(expr.value)
+        return expr
+
+    def visit_super_expr(self, expr: Super):
+        return expr
+
+    def visit_this_expr(self, expr: This):
+        return expr
+
+    def visit_unary_expr(self, expr: Unary):
+        expr.right = self._optimize_expression(expr.right)
+        return expr
+
+    def visit_variable_expr(self, expr: Variable):
+        return expr
+
+    def visit_block_stmt(self, stmt: Block):
+        stmt.statements = self._optimize_statements(stmt.statements)
+        return stmt
+
+    def visit_class_stmt(self, stmt: Class):
+        if stmt.superclass is not None:
+            # The superclass must stay a Variable, so it is only visited
+            self.visit_variable_expr(stmt.superclass)
+        for method in stmt.methods:
+            self.visit_function_stmt(method)
+        return stmt
+
+    def visit_expression_stmt(self, stmt: Expression):
+        stmt.expression = self._optimize_expression(stmt.expression)
+        return stmt
+
+    def visit_function_stmt(self, stmt: Function):
+        stmt.body = self._optimize_statements(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt: If):
+        stmt.condition = self._optimize_expression(stmt.condition)
+        stmt.then_branch = self._optimize_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self._optimize_statement(stmt.else_branch)
+        return stmt
+
+    def visit_print_stmt(self, stmt: Print):
+        stmt.expression = self._optimize_expression(stmt.expression)
+        return stmt
+
+    def visit_return_stmt(self, stmt: Return):
+        if stmt.value is not None:
+            stmt.value = self._optimize_expression(stmt.value)
+        return stmt
+
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.initializer is not None:
+            stmt.initializer = self._optimize_expression(stmt.initializer)
+        return stmt
+
+    def visit_while_stmt(self, stmt: While):
+        stmt.condition = self._optimize_expression(stmt.condition)
+        stmt.body = self._optimize_branch(stmt.body)
+        return stmt
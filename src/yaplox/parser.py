@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from yaplox.expr import (
     Assign,
@@ -39,17 +39,25 @@ class ParseError(Exception):
 
 
 class Parser:
-    def __init__(self, tokens: List[Token], on_token_error=None):
+    def __init__(self, tokens: Iterable[Token], on_token_error=None):
         """
         Create a new parser that will parse the tokens in `tokens`
         'on_token_error' will be called when we encounter an error.
+
+        `tokens` can be a list, but also a lazy iterator like `Scanner.iter_tokens()`.
+        The grammar only needs to look one token ahead and one token back, so the
+        parser never holds on to more than those two tokens.
         """
 
-        self.tokens = tokens
+        self.tokens = iter(tokens)
         self.on_token_error = on_token_error
-        self.current = 0
+        self.current_token: Optional[Token] = next(self.tokens, None)
+        self.previous_token: Optional[Token] = None
 
     def parse(self) -> List[Stmt]:
+        if self.current_token is None:
+            raise IndexError("Cannot parse without tokens, expected at least an EOF")
+
         statements = []
         while not self._is_at_end():
             if declaration := self._declaration():
@@ -413,14 +421,16 @@ class Parser:
 
     def _advance(self) -> Token:
         if not self._is_at_end():
-            self.current += 1
+            self.previous_token = self.current_token
+            # The EOF token is never consumed, so there is always a next token
+            self.current_token = next(self.tokens)
         return self._previous()
 
     def _peek(self) -> Token:
-        return self.tokens[self.current]
+        return self.current_token  # type: ignore
 
     def _previous(self) -> Token:
-        return self.tokens[self.current - 1]
+        return self.previous_token  # type: ignore
 
     def _is_at_end(self) -> bool:
         return self._peek().token_type == TokenType.EOF
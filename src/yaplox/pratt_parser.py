@@ -0,0 +1,147 @@
+from typing import Callable, Dict, Tuple
+
+from yaplox.expr import (
+    Assign,
+    Binary,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from yaplox.parser import Parser
+from yaplox.precedence import Precedence
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+
+
+class PrattParser(Parser):
+    """
+    Parser that parses expressions with precedence climbing, also known as a Pratt
+    parser. Statements are parsed by the recursive descent Parser.
+
+    The recursive descent parser passes every expression through a method for every
+    precedence level, even a single literal. Here, a table keyed on the TokenType
+    finds the function to parse a token at the start of an expression (prefix) or
+    after an expression (infix), so the call depth per token is constant. The
+    resulting Expr trees are exactly the same.
+    """
+
+    def _expression(self) -> Expr:
+        return self._parse_precedence(Precedence.ASSIGNMENT)
+
+    def _parse_precedence(self, precedence: Precedence) -> Expr:
+        token = self._peek()
+        prefix = self.prefix_rules.get(token.token_type)
+        if prefix is None:
+            raise self._error(token, "Expect expression")
+
+        self._advance()
+        expr = prefix(self, token)
+
+        infix_rules = self.infix_rules
+        while True:
+            token = self._peek()
+            rule = infix_rules.get(token.token_type)
+            if rule is None or rule[1] < precedence:
+                return expr
+
+            self._advance()
+            expr = rule[0](self, expr, token)
+
+    # Prefix rules, called with the token that has just been consumed
+    def _literal(self, token: Token) -> Expr:
+        return Literal(token.literal)
+
+    def _false(self, token: Token) -> Expr:
+        return Literal(False)
+
+    def _true(self, token: Token) -> Expr:
+        return Literal(True)
+
+    def _nil(self, token: Token) -> Expr:
+        return Literal(None)
+
+    def _super(self, token: Token) -> Expr:
+        self._consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self._consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return Super(token, method)
+
+    def _this(self, token: Token) -> Expr:
+        return This(token)
+
+    def _variable(self, token: Token) -> Expr:
+        return Variable(token)
+
+    def _grouping(self, token: Token) -> Expr:
+        expr = self._expression()
+        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
+
+    def _unary_operator(self, token: Token) -> Expr:
+        return Unary(token, self._parse_precedence(Precedence.UNARY))
+
+    # Infix rules, called with the left operand and the operator token
+    def _assign(self, expr: Expr, token: Token) -> Expr:
+        # Assignment is right-associative, parse the value at the same precedence
+        value = self._parse_precedence(Precedence.ASSIGNMENT)
+
+        if isinstance(expr, Variable):
+            return Assign(name=expr.name, value=value)
+        elif isinstance(expr, Get):
+            return Set(expr.obj, expr.name, value)
+        raise self._error(token, "Invalid assignment target.")
+
+    def _logical(self, expr: Expr, token: Token) -> Expr:
+        precedence = self.infix_rules[token.token_type][1]
+        right = self._parse_precedence(Precedence(precedence + 1))
+        return Logical(left=expr, operator=token, right=right)
+
+    def _binary(self, expr: Expr, token: Token) -> Expr:
+        precedence = self.infix_rules[token.token_type][1]
+        right = self._parse_precedence(Precedence(precedence + 1))
+        return Binary(expr, token, right)
+
+    def _call_arguments(self, expr: Expr, token: Token) -> Expr:
+        return self._finish_call(expr)
+
+    def _dot(self, expr: Expr, token: Token) -> Expr:
+        name = self._consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        return Get(expr, name)
+
+    prefix_rules: Dict[TokenType, Callable] = {
+        TokenType.FALSE: _false,
+        TokenType.TRUE: _true,
+        TokenType.NIL: _nil,
+        TokenType.NUMBER: _literal,
+        TokenType.STRING: _literal,
+        TokenType.SUPER: _super,
+        TokenType.THIS: _this,
+        TokenType.IDENTIFIER: _variable,
+        TokenType.LEFT_PAREN: _grouping,
+        TokenType.BANG: _unary_operator,
+        TokenType.MINUS: _unary_operator,
+    }
+
+    infix_rules: Dict[TokenType, Tuple[Callable, Precedence]] = {
+        TokenType.EQUAL: (_assign, Precedence.ASSIGNMENT),
+        TokenType.OR: (_logical, Precedence.OR),
+        TokenType.AND: (_logical, Precedence.AND),
+        TokenType.BANG_EQUAL: (_binary, Precedence.EQUALITY),
+        TokenType.EQUAL_EQUAL: (_binary, Precedence.EQUALITY),
+        TokenType.GREATER: (_binary, Precedence.COMPARISON),
+        TokenType.GREATER_EQUAL: (_binary, Precedence.COMPARISON),
+        TokenType.LESS: (_binary, Precedence.COMPARISON),
+        TokenType.LESS_EQUAL: (_binary, Precedence.COMPARISON),
+        TokenType.MINUS: (_binary, Precedence.TERM),
+        TokenType.PLUS: (_binary, Precedence.TERM),
+        TokenType.SLASH: (_binary, Precedence.FACTOR),
+        TokenType.STAR: (_binary, Precedence.FACTOR),
+        TokenType.LEFT_PAREN: (_call_arguments, Precedence.CALL),
+        TokenType.DOT: (_dot, Precedence.CALL),
+    }
@@ -0,0 +1,19 @@
+import enum
+
+
+class Precedence(enum.IntEnum):
+    """
+    Binding power of the operators, from low to high. Used by the PrattParser.
+    """
+
+    NONE = enum.auto()
+    ASSIGNMENT = enum.auto()
+    OR = enum.auto()
+    AND = enum.auto()
+    EQUALITY = enum.auto()
+    COMPARISON = enum.auto()
+    TERM = enum.auto()
+    FACTOR = enum.auto()
+    UNARY = enum.auto()
+    CALL = enum.auto()
+    PRIMARY = enum.auto()
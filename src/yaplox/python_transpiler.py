@@ -0,0 +1,457 @@
+import math
+from typing import Any, Dict, List, Optional, Union
+
+from yaplox.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from yaplox.frame_type import FrameType
+from yaplox.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    StmtVisitor,
+    Var,
+    While,
+)
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.variable_access import VariableAccess
+
+# The Python operator and the runtime helper of the binary operators on numbers
+NUMBER_OPERATORS: Dict[TokenType, tuple] = {
+    TokenType.GREATER: (">", "lox_greater"),
+    TokenType.GREATER_EQUAL: (">=", "lox_greater_equal"),
+    TokenType.LESS: ("<", "lox_less"),
+    TokenType.LESS_EQUAL: ("<=", "lox_less_equal"),
+    TokenType.MINUS: ("-", "lox_minus"),
+    TokenType.SLASH: ("/", "lox_slash"),
+    TokenType.STAR: ("*", "lox_star"),
+    TokenType.PLUS: ("+", "lox_plus"),
+}
+
+# The operators that always give a bool, so their result can be tested directly
+BOOL_OPERATORS = (
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.BANG_EQUAL,
+    TokenType.EQUAL_EQUAL,
+)
+
+SCRIPT_NAME = "lox_script"
+
+Declaration = Union[Class, Function, Var]
+
+
+class PythonTranspiler(ExprVisitor, StmtVisitor):
+    """
+    Translate a resolved program into Python source, so CPython compiles it into its
+    own bytecode. The whole program becomes the function `lox_script`, and every Lox
+    function a nested Python function.
+
+    The generated code runs in the namespace of transpiler_runtime.create_namespace:
+    the Lox globals are the dict `G`, and `T` holds the tokens the runtime helpers
+    need for their errors. Local variables become Python locals, a captured variable
+    is a Cell, and the cells a function uses from the functions around it are bound
+    to default arguments when the function is created.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.indent = 0
+        self.tokens: List[Token] = []
+        self.declarations: List[Function] = []
+        self.constants: List[Any] = []
+        # The Python names of the slots of the scopes in the current function
+        self.scopes: List[List[Optional[str]]] = []
+        # The Python names of the upvalues of the current function
+        self.upvalues: List[str] = []
+        # The value of `this` in an initializer, that returns it
+        self.initializer_this: Optional[str] = None
+        self.names = 0
+        # The global variables read on a line of the source, to report the Lox token
+        # of a variable that is not defined
+        self.global_reads: Dict[int, Dict[str, Token]] = {}
+        self._pending_reads: Dict[str, Token] = {}
+
+    def transpile(self, statements: List[Stmt]) -> str:
+        """
+        Translate the statements into the source of `lox_script`. Like
+        Interpreter.interpret, the script returns the value of the last statement
+        when that is an expression.
+        """
+        self._emit(f"def {SCRIPT_NAME}():")
+        self.indent += 1
+        self.scopes = [[]]
+        start = len(self.lines)
+        for index, statement in enumerate(statements):
+            if index == len(statements) - 1 and isinstance(statement, Expression):
+                self._emit(f"return {self._expr(statement.expression)}")
+            else:
+                self._stmt(statement)
+        self._emit_pass(start)
+        self.indent -= 1
+        return "\n".join(self.lines) + "\n"
+
+    def _expr(self, expr: Expr) -> str:
+        return expr.accept(self)
+
+    def _stmt(self, stmt: Stmt):
+        stmt.accept(self)
+
+    def _emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+        if self._pending_reads:
+            self.global_reads[len(self.lines)] = self._pending_reads
+            self._pending_reads = {}
+
+    def _emit_pass(self, start: int):
+        """
+        Emit `pass` when no lines have been emitted since `start`
+        """
+        if len(self.lines) == start:
+            self._emit("pass")
+
+    def _token(self, token: Token) -> str:
+        self.tokens.append(token)
+        return f"T[{len(self.tokens) - 1}]"
+
+    def _constant(self, value: Any) -> str:
+        self.constants.append(value)
+        return f"K[{len(self.constants) - 1}]"
+
+    def _temporary(self) -> str:
+        self.names += 1
+        return f"t{self.names}"
+
+    def _new_name(self, name: str) -> str:
+        self.names += 1
+        return f"v{self.names}_{name}"
+
+    # Scopes and variables
+    def _begin_scope(self, size: int):
+        self.scopes.append([None] * size)
+
+    def _end_scope(self):
+        self.scopes.pop()
+
+    def _declare(self, declaration: Declaration) -> str:
+        """
+        Give the variable of a local declaration a new Python name
+        """
+        name = self._new_name(declaration.name.lexeme)
+        self.scopes[-1][declaration.slot] = name  # type: ignore
+        return name
+
+    def _local_name(self, depth: int, slot: int) -> str:
+        return self.scopes[-1 - depth][slot]  # type: ignore
+
+    def _variable(self, expr: Union[Super, This, Variable], name: Token) -> str:
+        access = expr.access
+        if access is VariableAccess.LOCAL:
+            return self._local_name(expr.depth, expr.slot)  # type: ignore
+        elif access is VariableAccess.CELL:
+            return f"{self._local_name(expr.depth, expr.slot)}.value"  # type: ignore
+        elif access is VariableAccess.UPVALUE:
+            return f"{self.upvalues[expr.slot]}.value"
+
+        self._pending_reads.setdefault(name.lexeme, name)
+        return f"G[{name.lexeme!r}]"
+
+    def _emit_define(self, declaration: Declaration, value: str):
+        if declaration.slot is None:
+            self._emit(f"G[{declaration.name.lexeme!r}] = {value}")
+        elif declaration.captured:
+            self._emit(f"{self._declare(declaration)} = Cell({value})")
+        else:
+            self._emit(f"{self._declare(declaration)} = {value}")
+
+    def _emit_initialize(self, declaration: Union[Class, Function], value: str):
+        """
+        Set the variable of a function or class that _emit_define defined as nil
+        """
+        if declaration.slot is not None and declaration.captured:
+            name = self._local_name(0, declaration.slot)
+            self._emit(f"{name}.value = {value}")
+        elif declaration.slot is not None:
+            self._emit(f"{self._local_name(0, declaration.slot)} = {value}")
+        else:
+            self._emit(f"G[{declaration.name.lexeme!r}] = {value}")
+
+    def _truthy(self, expr: Expr) -> str:
+        """
+        A Python condition that is true when the value of `expr` is truthy in Lox
+        """
+        if isinstance(expr, Grouping):
+            return self._truthy(expr.expression)
+        if isinstance(expr, Binary) and expr.operator.token_type in BOOL_OPERATORS:
+            return self._expr(expr)
+        if isinstance(expr, Unary) and expr.operator.token_type == TokenType.BANG:
+            return self._expr(expr)
+
+        value = self._temporary()
+        return f"(({value} := {self._expr(expr)}) is not None and {value} is not False)"
+
+    # Expressions
+    def visit_literal_expr(self, expr: Literal):
+        value = expr.value
+        if isinstance(value, str) or (
+            type(value) is float and math.isfinite(value)  # type: ignore
+        ):
+            return repr(value)
+        if value is None or value is True or value is False:
+            return repr(value)
+        return self._constant(value)
+
+    def visit_grouping_expr(self, expr: Grouping):
+        return self._expr(expr.expression)
+
+    def visit_variable_expr(self, expr: Variable):
+        return self._variable(expr, expr.name)
+
+    def visit_this_expr(self, expr: This):
+        return self._variable(expr, expr.keyword)
+
+    def visit_assign_expr(self, expr: Assign):
+        value = self._expr(expr.value)
+        access = expr.access
+        if access is VariableAccess.LOCAL:
+            local = self._local_name(expr.depth, expr.slot)  # type: ignore
+            return f"({local} := {value})"
+        elif access is VariableAccess.CELL:
+            cell = self._local_name(expr.depth, expr.slot)  # type: ignore
+            return f"lox_set_cell({cell}, {value})"
+        elif access is VariableAccess.UPVALUE:
+            return f"lox_set_cell({self.upvalues[expr.slot]}, {value})"
+        return f"lox_assign_global({self._token(expr.name)}, {value})"
+
+    def visit_binary_expr(self, expr: Binary):
+        left = self._expr(expr.left)
+        right = self._expr(expr.right)
+        token_type = expr.operator.token_type
+        if token_type == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        if token_type == TokenType.BANG_EQUAL:
+            return f"({left} != {right})"
+
+        # Both operands are evaluated before the types are checked, so `&` instead
+        # of `and`
+        operator, helper = NUMBER_OPERATORS[token_type]
+        a = self._temporary()
+        b = self._temporary()
+        return (
+            f"({a} {operator} {b} "
+            f"if (type({a} := {left}) is float) & (type({b} := {right}) is float) "
+            f"else {helper}({self._token(expr.operator)}, {a}, {b}))"
+        )
+
+    def visit_logical_expr(self, expr: Logical):
+        left = self._expr(expr.left)
+        right = self._expr(expr.right)
+        value = self._temporary()
+        truthy = f"({value} := {left}) is not None and {value} is not False"
+        if expr.operator.token_type == TokenType.OR:
+            return f"({value} if {truthy} else {right})"
+        return f"({right} if {truthy} else {value})"
+
+    def visit_unary_expr(self, expr: Unary):
+        token_type = expr.operator.token_type
+        if token_type == TokenType.BANG:
+            return f"(not {self._truthy(expr.right)})"
+
+        right = self._expr(expr.right)
+        if token_type == TokenType.MINUS:
+            value = self._temporary()
+            return (
+                f"(-{value} if type({value} := {right}) is float "
+                f"else lox_negate({self._token(expr.operator)}, {value}))"
+            )
+        return f"({right}, None)[1]"
+
+    def visit_call_expr(self, expr: Call):
+        callee = expr.callee
+        if type(callee) is Get:
+            # A method call, `this` is passed to the method without binding it
+            this = self._temporary()
+            method = f"lox_find_method({self._constant(callee)}, "
+            method += f"({this} := {self._expr(callee.obj)}))"
+            arguments = "".join(f", {self._expr(arg)}" for arg in expr.arguments)
+            return f"lox_invoke({self._token(expr.paren)}, {method}, {this}{arguments})"
+
+        function = self._expr(callee)
+        arguments = "".join(f", {self._expr(argument)}" for argument in expr.arguments)
+        return f"lox_call({self._token(expr.paren)}, {function}{arguments})"
+
+    def visit_get_expr(self, expr: Get):
+        return f"lox_get({self._constant(expr)}, {self._expr(expr.obj)})"
+
+    def visit_set_expr(self, expr: Set):
+        name = self._token(expr.name)
+        # The object is checked before the value is evaluated
+        obj = f"lox_check_instance({name}, {self._expr(expr.obj)})"
+        return f"lox_set({name}, {obj}, {self._expr(expr.value)})"
+
+    def visit_super_expr(self, expr: Super):
+        superclass = self._variable(expr, expr.keyword)
+        this = self._variable(expr.this, expr.keyword)  # type: ignore
+        return f"lox_super({self._constant(expr)}, {superclass}, {this})"
+
+    # Statements
+    def visit_expression_stmt(self, stmt: Expression):
+        self._emit(self._expr(stmt.expression))
+
+    def visit_print_stmt(self, stmt: Print):
+        self._emit(f"lox_print({self._expr(stmt.expression)})")
+
+    def visit_var_stmt(self, stmt: Var):
+        value = "None" if stmt.initializer is None else self._expr(stmt.initializer)
+        self._emit_define(stmt, value)
+
+    def visit_block_stmt(self, stmt: Block):
+        # A block with declarations has a scope in the Resolver
+        has_scope = stmt.frame_type is not FrameType.NONE
+        if has_scope:
+            self._begin_scope(stmt.slot_count)
+        for statement in stmt.statements:
+            self._stmt(statement)
+        if has_scope:
+            self._end_scope()
+
+    def _emit_suite(self, stmt: Stmt):
+        self.indent += 1
+        start = len(self.lines)
+        self._stmt(stmt)
+        self._emit_pass(start)
+        self.indent -= 1
+
+    def visit_if_stmt(self, stmt: If):
+        self._emit(f"if {self._truthy(stmt.condition)}:")
+        self._emit_suite(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self._emit("else:")
+            self._emit_suite(stmt.else_branch)
+
+    def visit_while_stmt(self, stmt: While):
+        self._emit(f"while {self._truthy(stmt.condition)}:")
+        self._emit_suite(stmt.body)
+
+    def visit_return_stmt(self, stmt: Return):
+        if self.initializer_this is not None:
+            self._emit(f"return {self.initializer_this}")
+        elif stmt.value is None:
+            self._emit("return None")
+        else:
+            self._emit(f"return {self._expr(stmt.value)}")
+
+    def _function(self, declaration: Function, is_method: bool = False) -> str:
+        """
+        Emit the Python function of a declaration, and return the expression that
+        creates its TranspiledFunction
+        """
+        # The cells of the upvalues are found in the scopes of this function
+        defaults = [
+            self._local_name(depth, slot) if is_local else self.upvalues[slot]
+            for is_local, depth, slot in declaration.upvalues
+        ]
+        python_name = self._new_name(declaration.name.lexeme)
+        is_initializer = is_method and declaration.name.lexeme == "init"
+
+        enclosing = (self.scopes, self.upvalues, self.initializer_this)
+        self.scopes = []
+        self.upvalues = [f"u{index}" for index in range(len(defaults))]
+
+        self._begin_scope(declaration.slot_count)
+        params = (["this"] if is_method else []) + [
+            param.lexeme for param in declaration.params
+        ]
+        for slot, param in enumerate(params):
+            self.scopes[-1][slot] = self._new_name(param)
+        arguments = list(self.scopes[-1][: len(params)]) + [
+            f"{upvalue}={default}" for upvalue, default in zip(self.upvalues, defaults)
+        ]
+
+        self._emit(f"def {python_name}({', '.join(arguments)}):")  # type: ignore
+        self.indent += 1
+        start = len(self.lines)
+        for slot in declaration.captured_params:
+            param_name = self.scopes[-1][slot]
+            self._emit(f"{param_name} = Cell({param_name})")
+
+        self.initializer_this = None
+        if is_initializer:
+            this = self.scopes[-1][0]
+            self.initializer_this = (
+                f"{this}.value" if 0 in declaration.captured_params else this
+            )
+        for statement in declaration.body:
+            self._stmt(statement)
+        if self.initializer_this is not None:
+            self._emit(f"return {self.initializer_this}")
+        self._emit_pass(start)
+        self.indent -= 1
+
+        self.scopes, self.upvalues, self.initializer_this = enclosing
+
+        self.declarations.append(declaration)
+        return (
+            f"TranspiledFunction(D[{len(self.declarations) - 1}], "
+            f"{python_name}, {is_initializer})"
+        )
+
+    def visit_function_stmt(self, stmt: Function):
+        # Define the variable first, a recursive function captures its own cell
+        if stmt.slot is not None and stmt.captured:
+            self._emit_define(stmt, "None")
+        elif stmt.slot is not None:
+            self._declare(stmt)
+        self._emit_initialize(stmt, self._function(stmt))
+
+    def visit_class_stmt(self, stmt: Class):
+        superclass = "None"
+        if stmt.superclass is not None:
+            superclass = self._temporary()
+            value = self._expr(stmt.superclass)
+            token = self._token(stmt.superclass.name)
+            self._emit(f"{superclass} = lox_check_superclass({token}, {value})")
+
+        self._emit_define(stmt, "None")
+
+        if stmt.superclass is not None:
+            # `super` is only used by the methods, so it is always captured
+            self._begin_scope(1)
+            super_cell = self._new_name("super")
+            self.scopes[-1][0] = super_cell
+            self._emit(f"{super_cell} = Cell({superclass})")
+
+        methods = [
+            f"{method.name.lexeme!r}: {self._function(method, is_method=True)}"
+            for method in stmt.methods
+        ]
+
+        if stmt.superclass is not None:
+            self._end_scope()
+
+        self._emit_initialize(
+            stmt,
+            f"YaploxClass({stmt.name.lexeme!r}, {superclass}, "
+            f"{{{', '.join(methods)}}})",
+        )
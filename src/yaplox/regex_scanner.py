@@ -0,0 +1,153 @@
+import re
+from typing import Dict, Iterator, Tuple
+
+from yaplox.scanner import Scanner
+from yaplox.token import Token
+from yaplox.token_buffer import TokenBuffer
+from yaplox.token_type import TokenType
+
+
+class RegexScanner(Scanner):
+    """
+    Drop-in replacement for the Scanner that uses one compiled master regex instead
+    of walking the source one character at a time.
+
+    Every alternative in the pattern consumes a complete lexeme, so whitespace,
+    comments, strings, numbers and identifiers are all skipped or sliced in bulk by
+    the regex engine. The only work left in Python is one loop iteration per token.
+    """
+
+    pattern = re.compile(
+        r"""
+        (?P<skip>(?:[ \r\t\n]|//[^\n]*)+)
+        | (?P<number>\d+(?:\.\d+)?)
+        | (?P<identifier>[^\W\d]\w*)
+        | (?P<string>"[^"]*")
+        | (?P<operator>[!=<>]=?|[(){},.\-+;*/])
+        | (?P<error>.)
+        """,
+        re.VERBOSE | re.DOTALL,
+    )
+
+    operators: Dict[str, TokenType] = {
+        "(": TokenType.LEFT_PAREN,
+        ")": TokenType.RIGHT_PAREN,
+        "{": TokenType.LEFT_BRACE,
+        "}": TokenType.RIGHT_BRACE,
+        ",": TokenType.COMMA,
+        ".": TokenType.DOT,
+        "-": TokenType.MINUS,
+        "+": TokenType.PLUS,
+        ";": TokenType.SEMICOLON,
+        "*": TokenType.STAR,
+        "/": TokenType.SLASH,
+        "!": TokenType.BANG,
+        "!=": TokenType.BANG_EQUAL,
+        "=": TokenType.EQUAL,
+        "==": TokenType.EQUAL_EQUAL,
+        "<": TokenType.LESS,
+        "<=": TokenType.LESS_EQUAL,
+        ">": TokenType.GREATER,
+        ">=": TokenType.GREATER_EQUAL,
+    }
+
+    def iter_tokens(self) -> Iterator[Token]:
+        # Local names are quite a bit faster than attribute lookups in the hot loop
+        keywords = self.keywords
+        operators = self.operators
+        line = self.line
+
+        for match in self.pattern.finditer(self.source):
+            kind = match.lastgroup
+            lexeme = match.group()
+
+            if kind == "skip":
+                line += lexeme.count("\n")
+            elif kind == "identifier":
+                token_type = keywords.get(lexeme, TokenType.IDENTIFIER)
+                yield Token(token_type, lexeme, None, line)
+            elif kind == "operator":
+                yield Token(operators[lexeme], lexeme, None, line)
+            elif kind == "number":
+                yield Token(TokenType.NUMBER, lexeme, float(lexeme), line)
+            elif kind == "string":
+                # Like the original scanner, a string token is reported on the line
+                # where it ends
+                line += lexeme.count("\n")
+                yield Token(TokenType.STRING, lexeme, lexeme[1:-1], line)
+            elif self._report_error(match.start(), line):
+                line = self.line
+                break
+
+        self.line = line
+        self.current = len(self.source)
+        yield Token(token_type=TokenType.EOF, lexeme="", literal=None, line=line)
+
+    def scan_buffer(self) -> TokenBuffer:
+        """
+        Scan the source into a compact TokenBuffer, instead of a list of Tokens
+        """
+        buffer = TokenBuffer(self.source)
+        append = buffer.append
+
+        for token_type, start, end, _ in self._scan():
+            append(token_type, start, end - start)
+
+        append(TokenType.EOF, len(self.source), 0)
+        return buffer
+
+    def _scan(self, pos: int = 0) -> Iterator[Tuple[TokenType, int, int, int]]:
+        """
+        Scan the source from `pos`, and yield a tuple (token_type, start, end, line)
+        for every token. The EOF token is not included.
+        """
+        # Local names are quite a bit faster than attribute lookups in the hot loop
+        keywords = self.keywords
+        operators = self.operators
+        source = self.source
+        line = self.line
+
+        for match in self.pattern.finditer(source, pos):
+            kind = match.lastgroup
+            start, end = match.span()
+
+            if kind == "skip":
+                line += source.count("\n", start, end)
+            elif kind == "identifier":
+                token_type = keywords.get(source[start:end], TokenType.IDENTIFIER)
+                yield token_type, start, end, line
+            elif kind == "operator":
+                yield operators[source[start:end]], start, end, line
+            elif kind == "number":
+                yield TokenType.NUMBER, start, end, line
+            elif kind == "string":
+                # Like the original scanner, a string token is reported on the line
+                # where it ends
+                line += source.count("\n", start, end)
+                yield TokenType.STRING, start, end, line
+            elif self._report_error(start, line):
+                line = self.line
+                break
+
+        self.line = line
+        self.current = len(source)
+
+    def _report_error(self, start: int, line: int) -> bool:
+        """
+        Report the error for the unexpected character at `start`. Returns True when
+        the rest of the source cannot be scanned.
+        """
+        source = self.source
+        self.line = line
+
+        if source[start] == '"':
+            # An opening quote without a closing one consumes the rest of the source
+            self.line += source.count("\n", start)
+            self.on_error(self.line, "Unterminated string.")
+            return True
+
+        if not self.on_error:
+            raise KeyError(source[start])
+
+        self.on_error(line, f"Unexpected character: {source[start]}")
+        return False
@@ -0,0 +1,34 @@
+from typing import Any, Optional, Tuple, Union
+
+from yaplox.expr import Assign, Expr, Super, This, Variable
+from yaplox.variable_access import VariableAccess
+
+ResolvedExpr = Union[Assign, Super, This, Variable]
+
+
+class ResolvedLocals:
+    """
+    Compatibility view for `Interpreter.locals`. The Resolver stores the depth and
+    slot of a local variable on the expression itself, this class only translates
+    dict style access to those annotations. It doesn't keep references to the
+    expressions, so it cannot be iterated.
+    """
+
+    def __getitem__(self, expr: Expr) -> Tuple[int, int]:
+        depth = getattr(expr, "depth", None)
+        if depth is None:
+            raise KeyError(expr)
+        return depth, expr.slot  # type: ignore
+
+    def __setitem__(self, expr: ResolvedExpr, value: Tuple[int, int]):
+        expr.access = VariableAccess.LOCAL
+        expr.depth, expr.slot = value
+
+    def __contains__(self, expr: Any) -> bool:
+        return getattr(expr, "depth", None) is not None
+
+    def get(self, expr: Expr, default: Any = None) -> Optional[Tuple[int, int]]:
+        try:
+            return self[expr]
+        except KeyError:
+            return default
@@ -1,5 +1,5 @@
 from collections import deque
-from typing import Deque, List
+from typing import Deque, List, Optional, Tuple, Union
 
 from structlog import get_logger
 
@@ -20,8 +20,11 @@ from yaplox.expr import (
     Unary,
     Variable,
 )
+from yaplox.frame_type import FrameType
 from yaplox.function_type import FunctionType
 from yaplox.interpreter import Interpreter
+from yaplox.resolved_locals import ResolvedExpr
+from yaplox.scope import Scope
 from yaplox.stmt import (
     Block,
     Class,
@@ -36,17 +39,30 @@ from yaplox.stmt import (
     While,
 )
 from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.variable_access import VariableAccess
 
 logger = get_logger()
 
+# The statements that declare a variable in their scope
+DECLARATIONS = (Class, Function, Var)
+
 
 class Resolver(ExprVisitor, StmtVisitor):
     def __init__(self, interpreter: Interpreter, on_error=None):
         self.interpreter = interpreter
-        self.scopes: Deque = deque()
+        self.scopes: Deque[Scope] = deque()
+        # The number of functions around the code that is resolved. For every
+        # function, the index of its scope, and the variables it captures from the
+        # functions around it: (from a local, depth or 0, slot or upvalue index)
+        self.function_depth = 0
+        self.function_scopes: List[int] = []
+        self.function_upvalues: List[List[Tuple[bool, int, int]]] = []
         self.on_error = on_error
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
+        # The fields the initializer that is resolved assigns to `this`
+        self.initializer_fields: List[str] = []
 
     def resolve(self, statements: List[Stmt]):
         self._resolve_statements(statements)
@@ -61,39 +77,118 @@ class Resolver(ExprVisitor, StmtVisitor):
     def _resolve_expression(self, expression: Expr):
         expression.accept(self)
 
-    def _resolve_local(self, expr: Expr, name: Token):
+    def _resolve_local(self, expr: ResolvedExpr, name: Token):
         for idx, scope in enumerate(reversed(self.scopes)):
             if name.lexeme in scope:
-                self.interpreter.resolve(expr, idx)
+                if scope.function_depth == self.function_depth:
+                    self.interpreter.resolve(expr, idx, scope.slots[name.lexeme])
+                    scope.references.setdefault(name.lexeme, []).append(expr)
+                else:
+                    upvalue = self._resolve_upvalue(
+                        self.function_depth, len(self.scopes) - 1 - idx, name.lexeme
+                    )
+                    self.interpreter.resolve_upvalue(expr, upvalue)
                 return
         # Not found. Assume it is global.
 
+    def _resolve_upvalue(self, function_depth: int, index: int, name: str) -> int:
+        """
+        Find the variable `name` of the scope at `index` for the function at
+        `function_depth`, and return its index in the upvalues of the function.
+        When the variable is not a local variable of the function directly around
+        it, that function captures it as well.
+        """
+        function_scope = self.function_scopes[function_depth - 1]
+        scope = self.scopes[index]
+
+        if scope.function_depth == function_depth - 1:
+            # The depth is relative to the environment that declares the function
+            scope.captured.add(name)
+            upvalue = (True, function_scope - 1 - index, scope.slots[name])
+        else:
+            enclosing = self._resolve_upvalue(function_depth - 1, index, name)
+            upvalue = (False, 0, enclosing)
+
+        upvalues = self.function_upvalues[function_depth - 1]
+        if upvalue not in upvalues:
+            upvalues.append(upvalue)
+        return upvalues.index(upvalue)
+
     def _resolve_function(self, function: Function, type: FunctionType):
         enclosing_function = self.current_function
         self.current_function = type
+        self.function_depth += 1
+        enclosing_fields = self.initializer_fields
+        if type == FunctionType.INITIALIZER:
+            self.initializer_fields = []
 
         self._begin_scope()
+        self.function_scopes.append(len(self.scopes) - 1)
+        self.function_upvalues.append([])
+
+        # In a method, `this` is the first slot, before the parameters
+        if type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            self._define_implicit("this")
         for param in function.params:
             self._declare(param)
             self._define(param)
 
+        scope = self.scopes[-1]
+        first_local = len(scope.slots)
         self._resolve_statements(function.body)
-        self._end_scope()
+
+        # The captured parameters are stored in a Cell when the function is called
+        function.captured_params = tuple(
+            sorted(
+                scope.slots[name]
+                for name in scope.captured
+                if scope.slots[name] < first_local
+            )
+        )
+        function.upvalues = tuple(self.function_upvalues.pop())
+        self.function_scopes.pop()
+        function.slot_count = self._end_scope()
+        if type == FunctionType.INITIALIZER:
+            function.fields = tuple(dict.fromkeys(self.initializer_fields))
+
+        self.initializer_fields = enclosing_fields
         self.current_function = enclosing_function
+        self.function_depth -= 1
 
     def _begin_scope(self):
-        self.scopes.append({})
+        self.scopes.append(Scope(self.function_depth))
 
-    def _end_scope(self):
-        self.scopes.pop()
+    def _end_scope(self) -> int:
+        """
+        End the scope, and return the number of slots the environment of the scope
+        needs. The variables that are captured by a closure are stored in a Cell,
+        the declarations and expressions that use them are marked.
+        """
+        scope = self.scopes.pop()
+        for name in scope.captured:
+            declaration = scope.declarations.get(name)
+            if declaration is not None:
+                declaration.captured = True
+            for expr in scope.references.get(name, []):
+                expr.access = VariableAccess.CELL
+        return len(scope.slots)
+
+    def _declare_statement(self, stmt: Union[Class, Function, Var]):
+        """
+        Declare the variable of a class, function or var statement
+        """
+        stmt.slot = self._declare(stmt.name)
+        if stmt.slot is not None:
+            self.scopes[-1].declarations[stmt.name.lexeme] = stmt
 
-    def _declare(self, name: Token):
+    def _declare(self, name: Token) -> Optional[int]:
         """
-        Declare that a variable exists
+        Declare that a variable exists, and return the slot of the variable. Global
+        variables do not have a slot.
         Example is `var a;`
         """
         if len(self.scopes) == 0:
-            return
+            return None
 
         # Look at the last scope
         scope = self.scopes[-1]
@@ -101,6 +196,14 @@ class Resolver(ExprVisitor, StmtVisitor):
             self.on_error(name, "Already variable with this name in this scope.")
 
         scope[name.lexeme] = False
+        return scope.add_slot(name.lexeme)
+
+    def _define_implicit(self, name: str):
+        """
+        Define a variable that is not declared in the code, `this` and `super`
+        """
+        self.scopes[-1][name] = True
+        self.scopes[-1].add_slot(name)
 
     def _define(self, name: Token):
         """
@@ -154,6 +257,11 @@ class Resolver(ExprVisitor, StmtVisitor):
     def visit_set_expr(self, expr: Set):
         self._resolve_expression(expr.value)
         self._resolve_expression(expr.obj)
+        if self.current_function == FunctionType.INITIALIZER and isinstance(
+            expr.obj, This
+        ):
+            # The instances of the class are created with room for these fields
+            self.initializer_fields.append(expr.name.lexeme)
 
     def visit_super_expr(self, expr: Super):
         if self.current_class == ClassType.NONE:
@@ -164,6 +272,10 @@ class Resolver(ExprVisitor, StmtVisitor):
             )
 
         self._resolve_local(expr, expr.keyword)
+        # The method is bound to `this`, which is resolved like a This expression
+        this = Token(TokenType.THIS, "this", None, expr.keyword.line)
+        expr.this = This(this)
+        self._resolve_local(expr.this, this)
 
     def visit_unary_expr(self, expr: Unary):
         self._resolve_expression(expr.right)
@@ -176,15 +288,25 @@ class Resolver(ExprVisitor, StmtVisitor):
         self._resolve_local(expr, expr.name)
 
     def visit_block_stmt(self, stmt: Block):
+        if not any(
+            isinstance(statement, DECLARATIONS) for statement in stmt.statements
+        ):
+            # Without declarations the block doesn't need a scope of its own
+            stmt.frame_type = FrameType.NONE
+            self._resolve_statements(stmt.statements)
+            return
+
+        # Closures capture cells instead of frames, so the frame can be reused
         self._begin_scope()
         self._resolve_statements(stmt.statements)
-        self._end_scope()
+        stmt.slot_count = self._end_scope()
+        stmt.frame_type = FrameType.REUSABLE
 
     def visit_class_stmt(self, stmt: Class):
         enclosing_class = self.current_class
         self.current_class = ClassType.CLASS
 
-        self._declare(stmt.name)
+        self._declare_statement(stmt)
         self._define(stmt.name)
 
         if stmt.superclass and stmt.name.lexeme == stmt.superclass.name.lexeme:
@@ -196,10 +318,7 @@ class Resolver(ExprVisitor, StmtVisitor):
 
         if stmt.superclass is not None:
             self._begin_scope()
-            self.scopes[-1]["super"] = True
-
-        self._begin_scope()
-        self.scopes[-1]["this"] = True
+            self._define_implicit("super")
 
         for method in stmt.methods:
             declaration = FunctionType.METHOD
@@ -208,8 +327,6 @@ class Resolver(ExprVisitor, StmtVisitor):
 
             self._resolve_function(method, declaration)
 
-        self._end_scope()
-
         if stmt.superclass is not None:
             self._end_scope()
 
@@ -219,7 +336,7 @@ class Resolver(ExprVisitor, StmtVisitor):
         self._resolve_expression(stmt.expression)
 
     def visit_function_stmt(self, stmt: Function):
-        self._declare(stmt.name)
+        self._declare_statement(stmt)
         self._define(stmt.name)
 
         self._resolve_function(stmt, FunctionType.FUNCTION)
@@ -243,7 +360,7 @@ class Resolver(ExprVisitor, StmtVisitor):
             self._resolve_expression(stmt.value)
 
     def visit_var_stmt(self, stmt: Var):
-        self._declare(stmt.name)
+        self._declare_statement(stmt)
 
         if stmt.initializer is not None:
             self._resolve_expression(stmt.initializer)
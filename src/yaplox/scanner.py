@@ -1,4 +1,4 @@
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, Iterator, List
 
 from yaplox.token import Token
 from yaplox.token_type import TokenType
@@ -36,18 +36,28 @@ class Scanner:
         self.source = source
         self.on_error = on_error
         self.tokens = []
+        self._pending: List[Token] = []
 
     def scan_tokens(self) -> List[Token]:
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """
+        Lazily scan the source, yielding the tokens one by one. The last token is
+        always an EOF token. This allows the Parser to consume tokens while they are
+        scanned, without the complete token list in memory.
+        """
+        pending = self._pending
         while not self._is_at_end():
             # We are at the beginning of the next lexeme.
             self.start = self.current
             self._scan_token()
+            if pending:
+                yield from pending
+                pending.clear()
 
-        self.tokens.append(
-            Token(token_type=TokenType.EOF, lexeme="", literal=None, line=self.line)
-        )
-
-        return self.tokens
+        yield Token(token_type=TokenType.EOF, lexeme="", literal=None, line=self.line)
 
     def _operator_slash(self):
         if self._match("/"):
@@ -191,7 +201,7 @@ class Scanner:
         """
         text = self.source[self.start : self.current]
 
-        self.tokens.append(
+        self._pending.append(
             Token(token_type=token_type, lexeme=text, literal=literal, line=self.line)
         )
 
@@ -0,0 +1,30 @@
+from typing import TYPE_CHECKING, Dict, List, Set, Union
+
+if TYPE_CHECKING:
+    from yaplox.expr import Assign, Super, This, Variable
+    from yaplox.stmt import Class, Function, Var
+
+
+class Scope(dict):
+    """
+    A scope of the Resolver. As a dict it maps the names of the variables to
+    whether they have been defined. It also keeps what the Resolver needs to know
+    to number the variables, and to find the variables that are captured by a
+    closure.
+    """
+
+    __slots__ = ("function_depth", "slots", "declarations", "references", "captured")
+
+    def __init__(self, function_depth: int):
+        super().__init__()
+        # The number of functions around the scope
+        self.function_depth = function_depth
+        self.slots: Dict[str, int] = {}
+        self.declarations: Dict[str, Union[Class, Function, Var]] = {}
+        # The expressions in the same function that use a variable of this scope
+        self.references: Dict[str, List[Union[Assign, Super, This, Variable]]] = {}
+        # The variables that are used by a function inside the scope
+        self.captured: Set[str] = set()
+
+    def add_slot(self, name: str) -> int:
+        return self.slots.setdefault(name, len(self.slots))
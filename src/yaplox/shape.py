@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+# A shape with this many fields doesn't get more transitions, the instances that
+# grow beyond it get a dictionary shape
+MAX_FIELDS = 64
+# The number of different fields that can be added to the instances of one shape.
+# An instance that adds another field is megamorphic, it gets a dictionary shape.
+MAX_TRANSITIONS = 8
+
+
+class Shape:
+    """
+    The layout of the fields of a YaploxInstance: `slots` maps the name of a field
+    to its index in the values of the instance.
+
+    Every class has an empty root shape. Adding a field moves an instance to the
+    next shape in a tree of transitions, so all instances that got the same fields
+    in the same order share one shape and only store a list of values.
+
+    A dictionary shape has no transitions, it belongs to one instance and grows
+    with it. Instances that don't fit in the tree use one.
+    """
+
+    __slots__ = ("slots", "transitions")
+
+    def __init__(
+        self,
+        slots: Optional[Dict[str, int]] = None,
+        transitions: Optional[Dict[str, Shape]] = None,
+    ):
+        self.slots: Dict[str, int] = {} if slots is None else slots
+        self.transitions = transitions
+
+    @classmethod
+    def root(cls) -> Shape:
+        return cls({}, {})
+
+    @property
+    def is_dictionary(self) -> bool:
+        return self.transitions is None
+
+    def with_field(self, name: str) -> Shape:
+        """
+        Return the shape of an instance of this shape after `name` is added
+        """
+        transitions = self.transitions
+        if transitions is None:
+            self.slots[name] = len(self.slots)
+            return self
+
+        shape = transitions.get(name)
+        if shape is not None:
+            return shape
+
+        slots = {**self.slots, name: len(self.slots)}
+        if len(self.slots) >= MAX_FIELDS or len(transitions) >= MAX_TRANSITIONS:
+            return Shape(slots, None)
+
+        shape = Shape(slots, {})
+        transitions[name] = shape
+        return shape
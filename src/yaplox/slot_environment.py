@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+from yaplox.cell import Cell
+
+
+class SlotEnvironment:
+    """
+    Environment for local variables. The Resolver numbers the variables of every
+    scope, so the values are stored in a list of a fixed size, and a variable is
+    found by its distance and slot instead of by its name.
+
+    Global variables are stored in an Environment, since they can be defined at
+    runtime, for example in the REPL.
+
+    The environment of a function call has no enclosing environment. The variables
+    of the functions around it are found in `upvalues`, the Cells the function
+    captured when it was created. Blocks inside the function share its upvalues.
+    """
+
+    __slots__ = ("values", "enclosing", "upvalues")
+
+    def __init__(
+        self,
+        size: int,
+        enclosing: Optional[SlotEnvironment] = None,
+        upvalues: Optional[List[Cell]] = None,
+    ):
+        self.values: List[Any] = [None] * size
+        self.enclosing = enclosing
+        if upvalues is None:
+            upvalues = [] if enclosing is None else enclosing.upvalues
+        self.upvalues: List[Cell] = upvalues
+
+    def _ancestor(self, distance: int) -> SlotEnvironment:
+        environment = self
+
+        for _ in range(distance):
+            environment = environment.enclosing  # type: ignore
+
+        return environment
+
+    def get_at(self, distance: int, slot: int) -> Any:
+        """
+        Return the variable in `slot` of the environment at `distance`
+        """
+        return self._ancestor(distance).values[slot]
+
+    def assign_at(self, distance: int, slot: int, value: Any):
+        self._ancestor(distance).values[slot] = value
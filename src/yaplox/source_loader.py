@@ -0,0 +1,49 @@
+import codecs
+import mmap
+import os
+import stat
+import sys
+from typing import BinaryIO, Optional
+
+# Read stdin in blocks of 1 MiB
+CHUNK_SIZE = 1024 * 1024
+
+
+def load_source(file: str) -> str:
+    """
+    Load the source from `file`, or from stdin when `file` is `-`.
+    """
+    if file == "-":
+        return load_stream(sys.stdin.buffer)
+    return load_file(file)
+
+
+def load_file(file: str) -> str:
+    """
+    Memory-map the file, and decode it straight into the source string. The mapped
+    pages are backed by the file itself, so the decoded source is the only copy of
+    the script that is kept in memory.
+
+    Pipes, devices and empty files cannot be mapped, they are read as a stream.
+    """
+    with open(file, "rb") as f:
+        status = os.fstat(f.fileno())
+        if not stat.S_ISREG(status.st_mode) or status.st_size == 0:
+            return load_stream(f)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, "utf-8")
+
+
+def load_stream(stream: BinaryIO, chunk_size: Optional[int] = None) -> str:
+    """
+    Read and decode a stream in chunks. The incremental decoder takes care of
+    multi-byte characters that are split over two chunks.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = []
+
+    while chunk := stream.read(chunk_size or CHUNK_SIZE):
+        chunks.append(decoder.decode(chunk))
+    chunks.append(decoder.decode(b"", final=True))
+
+    return "".join(chunks)
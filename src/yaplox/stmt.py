@@ -4,9 +4,10 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from yaplox.expr import Expr, Variable
+from yaplox.frame_type import FrameType
 from yaplox.token import Token
 
 
@@ -51,14 +52,22 @@ class StmtVisitor(ABC):
 
 
 class Stmt(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: StmtVisitor):
         raise NotImplementedError
 
 
 class Block(Stmt):
+    __slots__ = ("statements", "slot_count", "frame_type")
+    __match_args__ = ("statements",)
+
     def __init__(self, statements: List[Stmt]):
         self.statements = statements
+        # Annotations, set by the Resolver
+        self.slot_count: int = 0
+        self.frame_type: FrameType = FrameType.FRESH
 
     def accept(self, visitor: StmtVisitor):
         """ Create a accept method that calls the visitor. """
@@ -66,12 +75,18 @@ class Block(Stmt):
 
 
 class Class(Stmt):
+    __slots__ = ("name", "superclass", "methods", "slot", "captured")
+    __match_args__ = ("name", "superclass", "methods")
+
     def __init__(
         self, name: Token, superclass: Optional[Variable], methods: List[Function]
     ):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        # Annotations, set by the Resolver
+        self.slot: Optional[int] = None
+        self.captured: bool = False
 
     def accept(self, visitor: StmtVisitor):
         """ Create a accept method that calls the visitor. """
@@ -79,6 +94,9 @@ class Class(Stmt):
 
 
 class Expression(Stmt):
+    __slots__ = ("expression",)
+    __match_args__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression = expression
 
@@ -88,10 +106,30 @@ class Expression(Stmt):
 
 
 class Function(Stmt):
+    __slots__ = (
+        "name",
+        "params",
+        "body",
+        "slot",
+        "captured",
+        "slot_count",
+        "captured_params",
+        "upvalues",
+        "fields",
+    )
+    __match_args__ = ("name", "params", "body")
+
     def __init__(self, name: Token, params: List[Token], body: List[Stmt]):
         self.name = name
         self.params = params
         self.body = body
+        # Annotations, set by the Resolver
+        self.slot: Optional[int] = None
+        self.captured: bool = False
+        self.slot_count: int = 0
+        self.captured_params: Tuple[int, ...] = ()
+        self.upvalues: Tuple[Tuple[bool, int, int], ...] = ()
+        self.fields: Tuple[str, ...] = ()
 
     def accept(self, visitor: StmtVisitor):
         """ Create a accept method that calls the visitor. """
@@ -99,6 +137,9 @@ class Function(Stmt):
 
 
 class If(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+    __match_args__ = ("condition", "then_branch", "else_branch")
+
     def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Optional[Stmt]):
         self.condition = condition
         self.then_branch = then_branch
@@ -110,6 +151,9 @@ class If(Stmt):
 
 
 class Print(Stmt):
+    __slots__ = ("expression",)
+    __match_args__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression = expression
 
@@ -119,6 +163,9 @@ class Print(Stmt):
 
 
 class Return(Stmt):
+    __slots__ = ("keyword", "value")
+    __match_args__ = ("keyword", "value")
+
     def __init__(self, keyword: Token, value: Optional[Expr]):
         self.keyword = keyword
         self.value = value
@@ -129,9 +176,15 @@ class Return(Stmt):
 
 
 class Var(Stmt):
+    __slots__ = ("name", "initializer", "slot", "captured")
+    __match_args__ = ("name", "initializer")
+
     def __init__(self, name: Token, initializer: Optional[Expr]):
         self.name = name
         self.initializer = initializer
+        # Annotations, set by the Resolver
+        self.slot: Optional[int] = None
+        self.captured: bool = False
 
     def accept(self, visitor: StmtVisitor):
         """ Create a accept method that calls the visitor. """
@@ -139,6 +192,9 @@ class Var(Stmt):
 
 
 class While(Stmt):
+    __slots__ = ("condition", "body")
+    __match_args__ = ("condition", "body")
+
     def __init__(self, condition: Expr, body: Stmt):
         self.condition = condition
         self.body = body
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterator, List, Optional
+
+from yaplox.token_type import TokenType
+
+# TokenType values start at 1, index them directly
+TOKEN_TYPES: List[Optional[TokenType]] = [None, *TokenType]
+
+
+class TokenBuffer:
+    """
+    Compact storage for the tokens of a source, as a struct of arrays.
+
+    A Token is a full Python object with its own lexeme string. For a million tokens
+    that adds up quickly, so this buffer only stores three integers per token: the
+    token type, the start offset and the length of the lexeme in the source.
+    The lexeme, the literal and the line number are computed when they are requested
+    through a TokenView. Line numbers are looked up in a table with the offsets of
+    all the newlines in the source, that is built on first use.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.token_types = array("B")
+        self.starts = array("I")
+        self.lengths = array("I")
+        self._newlines: Optional[array] = None
+
+    def append(self, token_type: TokenType, start: int, length: int):
+        self.token_types.append(token_type.value)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def __len__(self) -> int:
+        return len(self.token_types)
+
+    def __getitem__(self, index: int) -> TokenView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TokenBuffer index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self) -> Iterator[TokenView]:
+        for index in range(len(self)):
+            yield TokenView(self, index)
+
+    @property
+    def newlines(self) -> array:
+        if self._newlines is None:
+            self._newlines = array(
+                "I", (match.start() for match in re.finditer("\n", self.source))
+            )
+        return self._newlines
+
+    def line_at(self, offset: int) -> int:
+        """
+        Return the line number of the character at `offset`
+        """
+        return bisect_left(self.newlines, offset) + 1
+
+    def token_type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.token_types[index]]  # type: ignore
+
+    def lexeme(self, index: int) -> str:
+        start = self.starts[index]
+        return self.source[start : start + self.lengths[index]]
+
+    def literal(self, index: int) -> Any:
+        token_type = self.token_type(index)
+        if token_type == TokenType.NUMBER:
+            return float(self.lexeme(index))
+        if token_type == TokenType.STRING:
+            return self.lexeme(index)[1:-1]
+        return None
+
+    def line(self, index: int) -> int:
+        # Tokens are reported on the line they end on, this matters for multi-line
+        # strings.
+        end = self.starts[index] + max(self.lengths[index] - 1, 0)
+        return self.line_at(end)
+
+
+class TokenView:
+    """
+    A thin view on one token in a TokenBuffer. It behaves like a Token, so the Parser
+    and the error reporting in Yaplox can use it without knowing the difference.
+    """
+
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer: TokenBuffer, index: int):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def token_type(self) -> TokenType:
+        return self.buffer.token_type(self.index)
+
+    @property
+    def lexeme(self) -> str:
+        return self.buffer.lexeme(self.index)
+
+    @property
+    def literal(self) -> Any:
+        return self.buffer.literal(self.index)
+
+    @property
+    def line(self) -> int:
+        return self.buffer.line(self.index)
+
+    def __repr__(self):
+        return f"{self.token_type} {self.lexeme} {self.literal}"
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Any, Callable, List, Optional
+
+from yaplox.stmt import Function
+from yaplox.yaplox_function import YaploxFunction
+from yaplox.yaplox_instance import YaploxInstance
+
+
+class TranspiledFunction(YaploxFunction):
+    """
+    A function of the PythonTranspiler. `function` is the generated Python function,
+    it takes `this` first for a method, then the arguments. The cells of its upvalues
+    are bound to its default arguments when it is created.
+    """
+
+    def __init__(
+        self,
+        declaration: Function,
+        function: Callable[..., Any],
+        is_initializer: bool,
+        instance: Optional[YaploxInstance] = None,
+    ):
+        upvalues = list(function.__defaults__ or ())
+        super().__init__(declaration, upvalues, is_initializer, instance)
+        self.function = function
+        self.param_count = len(declaration.params)
+        # The Python callable that takes the arguments of a call
+        self.target = function if instance is None else partial(function, instance)
+
+    def bind(self, instance: YaploxInstance) -> TranspiledFunction:
+        return TranspiledFunction(
+            self.declaration, self.function, self.is_initializer, instance
+        )
+
+    def call(self, interpreter, arguments):
+        return self.target(*arguments)
+
+    def invoke(self, interpreter, instance: YaploxInstance, arguments: List[Any]):
+        return self.function(instance, *arguments)
@@ -0,0 +1,188 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+from yaplox.binary_operators import (
+    greater,
+    greater_equal,
+    less,
+    less_equal,
+    minus,
+    plus,
+    slash,
+    star,
+)
+from yaplox.cell import Cell
+from yaplox.expr import Get, Super
+from yaplox.token import Token
+from yaplox.transpiled_function import TranspiledFunction
+from yaplox.yaplox_callable import YaploxCallable
+from yaplox.yaplox_class import YaploxClass
+from yaplox.yaplox_instance import YaploxInstance
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+if TYPE_CHECKING:
+    from yaplox.interpreter import Interpreter
+    from yaplox.python_transpiler import PythonTranspiler
+
+# The helpers for the Lox semantics that the code of the PythonTranspiler calls. The
+# generated code checks the common cases inline, and calls these for the rest.
+
+
+def create_namespace(
+    interpreter: "Interpreter", transpiler: "PythonTranspiler"
+) -> Dict[str, Any]:
+    """
+    Create the namespace the code of the transpiler runs in. `G` holds the Lox
+    globals, `T` the tokens for errors, `D` the declarations of the functions and
+    `K` the constants that have no Python literal and the expressions with an
+    InlineCache.
+    """
+    environment = interpreter.globals
+    stringify = interpreter._stringify
+
+    lox_call = create_lox_call(interpreter)
+
+    def lox_assign_global(name: Token, value: Any) -> Any:
+        environment.assign(name, value)
+        return value
+
+    def lox_print(value: Any):
+        print(stringify(value))
+
+    return {
+        "transpiler": transpiler,
+        "G": environment.values,
+        "T": transpiler.tokens,
+        "D": transpiler.declarations,
+        "K": transpiler.constants,
+        "Cell": Cell,
+        "TranspiledFunction": TranspiledFunction,
+        "YaploxClass": YaploxClass,
+        "lox_call": lox_call,
+        "lox_invoke": create_lox_invoke(lox_call),
+        "lox_find_method": lox_find_method,
+        "lox_assign_global": lox_assign_global,
+        "lox_print": lox_print,
+        "lox_set_cell": lox_set_cell,
+        "lox_get": lox_get,
+        "lox_check_instance": lox_check_instance,
+        "lox_set": lox_set,
+        "lox_super": lox_super,
+        "lox_negate": lox_negate,
+        "lox_check_superclass": lox_check_superclass,
+        "lox_greater": greater,
+        "lox_greater_equal": greater_equal,
+        "lox_less": less,
+        "lox_less_equal": less_equal,
+        "lox_minus": minus,
+        "lox_plus": plus,
+        "lox_slash": slash,
+        "lox_star": star,
+    }
+
+
+def create_lox_call(interpreter: "Interpreter") -> Callable[..., Any]:
+    """
+    Create the helper for a call, it passes `interpreter` to the callables that
+    aren't transpiled
+    """
+
+    def lox_call(paren: Token, callee: Any, *arguments: Any) -> Any:
+        try:
+            if type(callee) is TranspiledFunction:
+                if len(arguments) != callee.param_count:
+                    raise arity_error(paren, callee.param_count, len(arguments))
+                return callee.target(*arguments)
+
+            if not isinstance(callee, YaploxCallable):
+                raise YaploxRuntimeError(paren, "Can only call functions and classes.")
+            if len(arguments) != callee.arity():
+                raise arity_error(paren, callee.arity(), len(arguments))
+            return callee.call(interpreter, list(arguments))
+        except RecursionError:
+            raise YaploxRuntimeError(paren, "Stack overflow.")
+
+    return lox_call
+
+
+def create_lox_invoke(lox_call: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Create the helper for a method call, it calls a field with `lox_call`
+    """
+
+    def lox_invoke(paren: Token, method: Any, this: Any, *arguments: Any) -> Any:
+        """
+        Call the result of lox_find_method, a method with `this` or a field
+        """
+        if type(method) is Cell:
+            return lox_call(paren, method.value, *arguments)
+        try:
+            if len(arguments) != method.param_count:
+                raise arity_error(paren, method.param_count, len(arguments))
+            return method.function(this, *arguments)
+        except RecursionError:
+            raise YaploxRuntimeError(paren, "Stack overflow.")
+
+    return lox_invoke
+
+
+def arity_error(paren: Token, arity: int, count: int) -> YaploxRuntimeError:
+    return YaploxRuntimeError(paren, f"Expected {arity} arguments but got {count}.")
+
+
+def lox_set_cell(cell: Cell, value: Any) -> Any:
+    cell.value = value
+    return value
+
+
+def lox_get(expr: Get, obj: Any) -> Any:
+    if isinstance(obj, YaploxInstance):
+        return expr.cache.get(obj, expr.name)
+    raise YaploxRuntimeError(expr.name, "Only instances have properties.")
+
+
+def lox_find_method(expr: Get, obj: Any) -> Any:
+    """
+    Find the method of a call before its arguments are evaluated. A field is
+    returned in a Cell, so lox_invoke can tell it from a method.
+    """
+    if not isinstance(obj, YaploxInstance):
+        raise YaploxRuntimeError(expr.name, "Only instances have properties.")
+    name = expr.name.lexeme
+    index = obj.shape.slots.get(name)
+    if index is not None:
+        return Cell(obj.values[index])
+    method = expr.cache.find_method(obj.klass, name)
+    if method is None:
+        raise YaploxRuntimeError(expr.name, f"Undefined property '{name}'.")
+    return method
+
+
+def lox_check_instance(name: Token, obj: Any) -> YaploxInstance:
+    if not isinstance(obj, YaploxInstance):
+        raise YaploxRuntimeError(name, "Only instances have fields.")
+    return obj
+
+
+def lox_set(name: Token, obj: YaploxInstance, value: Any) -> Any:
+    obj.set(name, value)
+    return value
+
+
+def lox_super(expr: Super, superclass: YaploxClass, this: YaploxInstance) -> Any:
+    method = expr.method
+    found = expr.cache.find_method(superclass, method.lexeme)
+    if found is None:
+        raise YaploxRuntimeError(method, f"Undefined property '{method.lexeme}'.")
+    return found.bind(this)
+
+
+def lox_negate(operator: Token, value: Any) -> float:
+    if not isinstance(value, (float, int)):
+        raise YaploxRuntimeError(operator, f"{value} must be a number.")
+    return -float(value)
+
+
+def lox_check_superclass(superclass_name: Token, superclass: Any) -> YaploxClass:
+    if not isinstance(superclass, YaploxClass):
+        raise YaploxRuntimeError(superclass_name, "Superclass must be a class.")
+    return superclass
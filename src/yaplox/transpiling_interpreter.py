@@ -0,0 +1,64 @@
+from typing import Any, List
+
+from structlog import get_logger
+
+from yaplox.interpreter import Interpreter
+from yaplox.python_transpiler import SCRIPT_NAME, PythonTranspiler
+from yaplox.stmt import Stmt
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.transpiler_runtime import create_namespace
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+logger = get_logger()
+
+FILENAME = "<lox>"
+
+
+class TranspilingInterpreter(Interpreter):
+    """
+    Backend that translates the resolved program into Python source with the
+    PythonTranspiler, and lets CPython compile and run it. It keeps the globals of the
+    Interpreter, so the REPL works the same.
+
+    A program that CPython can't compile, because it nests too deep, runs on the
+    Interpreter instead.
+    """
+
+    def interpret(self, statements: List[Stmt], on_error=None) -> Any:
+        transpiler = PythonTranspiler()
+        source = transpiler.transpile(statements)
+        namespace = create_namespace(self, transpiler)
+        try:
+            exec(compile(source, FILENAME, "exec"), namespace)
+        except (SyntaxError, RecursionError, MemoryError) as excp:
+            logger.info("Can't compile the transpiled program", error=excp)
+            return super().interpret(statements, on_error)
+        logger.debug("Compiled program", lines=len(transpiler.lines))
+
+        try:
+            return namespace[SCRIPT_NAME]()
+        except YaploxRuntimeError as excp:
+            on_error(excp)
+        except KeyError as excp:
+            on_error(self._undefined_variable(excp))
+
+    @staticmethod
+    def _undefined_variable(excp: KeyError) -> YaploxRuntimeError:
+        """
+        Translate the KeyError of a global variable that is read before it has been
+        defined into the error of the Interpreter. The line of the traceback gives the
+        token that was read.
+        """
+        traceback = excp.__traceback__
+        while traceback is not None and traceback.tb_next is not None:
+            traceback = traceback.tb_next
+        if traceback is None or traceback.tb_frame.f_code.co_filename != FILENAME:
+            raise excp
+
+        name = excp.args[0]
+        reads = traceback.tb_frame.f_globals["transpiler"].global_reads
+        token = reads.get(traceback.tb_lineno, {}).get(name)
+        if token is None:
+            token = Token(TokenType.IDENTIFIER, name, None, 0)
+        return YaploxRuntimeError(token, f"Undefined variable '{name}'.")
@@ -0,0 +1,17 @@
+import enum
+
+
+class VariableAccess(enum.Enum):
+    """
+    How the Interpreter finds a variable, decided by the Resolver.
+    """
+
+    # By name in the globals
+    GLOBAL = enum.auto()
+    # In a slot of an environment of the current function
+    LOCAL = enum.auto()
+    # In a Cell in a slot of the current function, the variable is captured by a
+    # closure
+    CELL = enum.auto()
+    # In a Cell in the upvalues of the current function
+    UPVALUE = enum.auto()
@@ -0,0 +1,515 @@
+from typing import TYPE_CHECKING, Any, List, Tuple
+
+from yaplox.binary_operators import (
+    greater,
+    greater_equal,
+    is_equal,
+    less,
+    less_equal,
+    minus,
+    plus,
+    slash,
+    star,
+)
+from yaplox.bytecode_closure import BytecodeClosure
+from yaplox.bytecode_function import BytecodeFunction
+from yaplox.cell import Cell
+from yaplox.config import config
+from yaplox.op_code import OpCode
+from yaplox.yaplox_callable import YaploxCallable
+from yaplox.yaplox_class import YaploxClass
+from yaplox.yaplox_instance import YaploxInstance
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+if TYPE_CHECKING:
+    from yaplox.interpreter import Interpreter
+
+# Plain ints for the dispatch loop, comparing with an IntEnum member is slower
+CONSTANT = int(OpCode.CONSTANT)
+NIL = int(OpCode.NIL)
+TRUE = int(OpCode.TRUE)
+FALSE = int(OpCode.FALSE)
+POP = int(OpCode.POP)
+GET_LOCAL = int(OpCode.GET_LOCAL)
+SET_LOCAL = int(OpCode.SET_LOCAL)
+STORE_LOCAL = int(OpCode.STORE_LOCAL)
+GET_CELL = int(OpCode.GET_CELL)
+SET_CELL = int(OpCode.SET_CELL)
+STORE_NEW_CELL = int(OpCode.STORE_NEW_CELL)
+MAKE_CELL = int(OpCode.MAKE_CELL)
+GET_UPVALUE = int(OpCode.GET_UPVALUE)
+SET_UPVALUE = int(OpCode.SET_UPVALUE)
+GET_GLOBAL = int(OpCode.GET_GLOBAL)
+SET_GLOBAL = int(OpCode.SET_GLOBAL)
+DEFINE_GLOBAL = int(OpCode.DEFINE_GLOBAL)
+GET_PROPERTY = int(OpCode.GET_PROPERTY)
+CHECK_INSTANCE = int(OpCode.CHECK_INSTANCE)
+SET_PROPERTY = int(OpCode.SET_PROPERTY)
+GET_SUPER = int(OpCode.GET_SUPER)
+GET_METHOD = int(OpCode.GET_METHOD)
+EQUAL = int(OpCode.EQUAL)
+NOT_EQUAL = int(OpCode.NOT_EQUAL)
+GREATER = int(OpCode.GREATER)
+GREATER_EQUAL = int(OpCode.GREATER_EQUAL)
+LESS = int(OpCode.LESS)
+LESS_EQUAL = int(OpCode.LESS_EQUAL)
+ADD = int(OpCode.ADD)
+SUBTRACT = int(OpCode.SUBTRACT)
+MULTIPLY = int(OpCode.MULTIPLY)
+DIVIDE = int(OpCode.DIVIDE)
+NOT = int(OpCode.NOT)
+NEGATE = int(OpCode.NEGATE)
+PRINT = int(OpCode.PRINT)
+JUMP = int(OpCode.JUMP)
+JUMP_IF_FALSE = int(OpCode.JUMP_IF_FALSE)
+JUMP_IF_TRUE = int(OpCode.JUMP_IF_TRUE)
+POP_JUMP_IF_FALSE = int(OpCode.POP_JUMP_IF_FALSE)
+LOOP = int(OpCode.LOOP)
+CALL = int(OpCode.CALL)
+TAIL_CALL = int(OpCode.TAIL_CALL)
+INVOKE = int(OpCode.INVOKE)
+TAIL_INVOKE = int(OpCode.TAIL_INVOKE)
+CLOSURE = int(OpCode.CLOSURE)
+RETURN = int(OpCode.RETURN)
+CHECK_SUPERCLASS = int(OpCode.CHECK_SUPERCLASS)
+CLASS = int(OpCode.CLASS)
+
+
+class VirtualMachine:
+    """
+    Stack based virtual machine for the bytecode of the BytecodeCompiler.
+
+    All frames share one value stack. A frame starts at its `base`: the slots of the
+    local variables come first, the temporary values are pushed after them. A call
+    to a Lox function pushes the state of the caller on a list of frames and
+    continues the same loop, so Lox calls don't use Python recursion. A tail call
+    replaces the frame of the caller, and more than MAX_CALL_DEPTH frames is a stack
+    overflow.
+    """
+
+    def __init__(self, interpreter: "Interpreter"):
+        # The interpreter provides the globals, and is passed to native functions
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+        self.stack: List[Any] = []
+
+    def run(self, function: BytecodeFunction) -> Any:
+        """
+        Run the top level function of a program, and return its result
+        """
+        return self.call(BytecodeClosure(function, []), [])
+
+    def call(self, closure: BytecodeClosure, arguments: List[Any]) -> Any:
+        """
+        Call a closure and return its result. The stack is restored after a runtime
+        error, so the next program can run on it.
+        """
+        stack = self.stack
+        start = len(stack)
+        stack.append(closure)
+        stack.extend(arguments)
+        try:
+            return self._execute(closure, len(arguments))
+        except BaseException:
+            del stack[start:]
+            raise
+
+    @staticmethod
+    def _enter(
+        stack: List[Any], closure: BytecodeClosure, argc: int
+    ) -> Tuple[int, int]:
+        """
+        Create the frame of a call, with the closure and the arguments on top of the
+        stack. Returns the base of the frame and the height of the stack after the
+        call returns.
+        """
+        function = closure.function
+        if closure.instance is None:
+            base = len(stack) - argc
+            return_to = base - 1
+        else:
+            # `this` replaces the closure in slot 0
+            base = return_to = len(stack) - argc - 1
+            stack[base] = closure.instance
+
+        missing = function.frame_size - (len(stack) - base)
+        if missing > 0:
+            stack.extend([None] * missing)
+        for slot in function.captured_params:
+            stack[base + slot] = Cell(stack[base + slot])
+        return base, return_to
+
+    @staticmethod
+    def _check_arity(callee: Any, argc: int, paren: Any):
+        if argc != callee.arity():
+            raise YaploxRuntimeError(
+                paren, f"Expected {callee.arity()} arguments but got {argc}."
+            )
+
+    def _execute(self, closure: BytecodeClosure, argc: int) -> Any:  # noqa: C901
+        stack = self.stack
+        globals_values = self.globals.values
+        # The state of the callers
+        frames: List[Tuple[Any, ...]] = []
+        max_depth = config.MAX_CALL_DEPTH
+
+        function = closure.function
+        code = function.chunk.code
+        constants = function.chunk.constants
+        upvalues = closure.upvalues
+        base, return_to = self._enter(stack, closure, argc)
+        ip = 0
+
+        while True:
+            op_code = code[ip]
+
+            if op_code == GET_LOCAL:
+                stack.append(stack[base + code[ip + 1]])
+                ip += 2
+            elif op_code == CONSTANT:
+                stack.append(constants[code[ip + 1]])
+                ip += 2
+            elif op_code == GET_GLOBAL:
+                name = constants[code[ip + 1]]
+                try:
+                    stack.append(globals_values[name.lexeme])
+                except KeyError:
+                    stack.append(self.globals.get(name))
+                ip += 2
+            elif op_code == POP_JUMP_IF_FALSE:
+                value = stack.pop()
+                if value is None or value is False:
+                    ip += code[ip + 1] + 2
+                else:
+                    ip += 2
+            elif op_code == LESS:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left < right
+                else:
+                    stack[-1] = less(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == ADD:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                else:
+                    stack[-1] = plus(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == SUBTRACT:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left - right
+                else:
+                    stack[-1] = minus(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == SET_LOCAL:
+                stack[base + code[ip + 1]] = stack[-1]
+                ip += 2
+            elif op_code == POP:
+                stack.pop()
+                ip += 1
+            elif op_code == STORE_LOCAL:
+                stack[base + code[ip + 1]] = stack.pop()
+                ip += 2
+            elif op_code == SET_GLOBAL:
+                name = constants[code[ip + 1]]
+                if name.lexeme in globals_values:
+                    globals_values[name.lexeme] = stack[-1]
+                else:
+                    self.globals.assign(name, stack[-1])
+                ip += 2
+            elif op_code == LOOP:
+                ip += 2 - code[ip + 1]
+            elif op_code == JUMP:
+                ip += code[ip + 1] + 2
+            elif op_code == TAIL_CALL and type(stack[-code[ip + 1] - 1]) is (
+                BytecodeClosure
+            ):
+                argc = code[ip + 1]
+                callee = stack[-argc - 1]
+                self._check_arity(callee, argc, constants[code[ip + 2]])
+                # Move the callee and the arguments to the start of the frame
+                del stack[return_to : len(stack) - argc - 1]
+                function = callee.function
+                code = function.chunk.code
+                constants = function.chunk.constants
+                upvalues = callee.upvalues
+                base, return_to = self._enter(stack, callee, argc)
+                ip = 0
+            elif (op_code == INVOKE or op_code == TAIL_INVOKE) and stack[
+                -code[ip + 1] - 1
+            ] is not None:
+                # The method and `this` are below the arguments
+                argc = code[ip + 1]
+                method = stack[-argc - 2]
+                self._check_arity(method, argc, constants[code[ip + 2]])
+                if op_code == TAIL_INVOKE:
+                    del stack[return_to : len(stack) - argc - 2]
+                else:
+                    if len(frames) >= max_depth:
+                        raise YaploxRuntimeError(
+                            constants[code[ip + 2]], "Stack overflow."
+                        )
+                    frames.append(
+                        (function, code, constants, upvalues, ip + 3, base, return_to)
+                    )
+                function = method.function
+                code = function.chunk.code
+                constants = function.chunk.constants
+                upvalues = method.upvalues
+                base, return_to = self._enter(stack, method, argc + 1)
+                ip = 0
+            elif (
+                op_code == CALL
+                or op_code == TAIL_CALL
+                or op_code == INVOKE
+                or op_code == TAIL_INVOKE
+            ):
+                argc = code[ip + 1]
+                if op_code == INVOKE or op_code == TAIL_INVOKE:
+                    # A field is called like any other value, remove the nil of
+                    # GET_METHOD
+                    del stack[-argc - 1]
+                callee = stack[-argc - 1]
+                ip += 3
+
+                if type(callee) is BytecodeClosure:
+                    self._check_arity(callee, argc, constants[code[ip - 1]])
+                elif isinstance(callee, YaploxClass):
+                    self._check_arity(callee, argc, constants[code[ip - 1]])
+                    instance = YaploxInstance(klass=callee)
+                    initializer = callee.initializer
+                    if initializer is None:
+                        stack[-1] = instance
+                        continue
+                    # The initializer is entered as a method, with the instance as
+                    # `this` between the class and the arguments
+                    stack.insert(len(stack) - argc, instance)
+                    callee = initializer
+                    argc += 1
+                elif isinstance(callee, YaploxCallable):
+                    self._check_arity(callee, argc, constants[code[ip - 1]])
+                    arguments = stack[len(stack) - argc :]
+                    result = callee.call(self.interpreter, arguments)
+                    del stack[-argc - 1 :]
+                    stack.append(result)
+                    continue
+                else:
+                    raise YaploxRuntimeError(
+                        constants[code[ip - 1]], "Can only call functions and classes."
+                    )
+
+                if len(frames) >= max_depth:
+                    raise YaploxRuntimeError(constants[code[ip - 1]], "Stack overflow.")
+                frames.append(
+                    (function, code, constants, upvalues, ip, base, return_to)
+                )
+                function = callee.function
+                code = function.chunk.code
+                constants = function.chunk.constants
+                upvalues = callee.upvalues
+                base, return_to = self._enter(stack, callee, argc)
+                ip = 0
+            elif op_code == RETURN:
+                result = stack.pop()
+                if function.is_initializer:
+                    result = stack[base]
+                del stack[return_to:]
+                if not frames:
+                    return result
+                stack.append(result)
+                function, code, constants, upvalues, ip, base, return_to = frames.pop()
+            elif op_code == GET_CELL:
+                stack.append(stack[base + code[ip + 1]].value)
+                ip += 2
+            elif op_code == GET_UPVALUE:
+                stack.append(upvalues[code[ip + 1]].value)
+                ip += 2
+            elif op_code == GET_PROPERTY:
+                obj = stack[-1]
+                get = constants[code[ip + 1]]
+                if not isinstance(obj, YaploxInstance):
+                    raise YaploxRuntimeError(
+                        get.name, "Only instances have properties."
+                    )
+                stack[-1] = get.cache.get(obj, get.name)
+                ip += 2
+            elif op_code == GET_METHOD:
+                obj = stack[-1]
+                get = constants[code[ip + 1]]
+                if not isinstance(obj, YaploxInstance):
+                    raise YaploxRuntimeError(
+                        get.name, "Only instances have properties."
+                    )
+                lexeme = get.name.lexeme
+                index = obj.shape.slots.get(lexeme)
+                if index is not None:
+                    stack[-1] = obj.values[index]
+                    stack.append(None)
+                else:
+                    method = get.cache.find_method(obj.klass, lexeme)
+                    if method is None:
+                        raise YaploxRuntimeError(
+                            get.name, f"Undefined property '{lexeme}'."
+                        )
+                    stack[-1] = method
+                    stack.append(obj)
+                ip += 2
+            elif op_code == GREATER:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = greater(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == LESS_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left <= right
+                else:
+                    stack[-1] = less_equal(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == GREATER_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left >= right
+                else:
+                    stack[-1] = greater_equal(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == MULTIPLY:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = star(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == DIVIDE:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left / right
+                else:
+                    stack[-1] = slash(constants[code[ip + 1]], left, right)
+                ip += 2
+            elif op_code == EQUAL:
+                right = stack.pop()
+                stack[-1] = is_equal(stack[-1], right)
+                ip += 1
+            elif op_code == NOT_EQUAL:
+                right = stack.pop()
+                stack[-1] = not is_equal(stack[-1], right)
+                ip += 1
+            elif op_code == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+                ip += 1
+            elif op_code == NEGATE:
+                value = stack[-1]
+                if type(value) is not float:
+                    if not isinstance(value, (float, int)):
+                        raise YaploxRuntimeError(
+                            constants[code[ip + 1]], f"{value} must be a number."
+                        )
+                    value = float(value)
+                stack[-1] = -value
+                ip += 2
+            elif op_code == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += code[ip + 1] + 2
+                else:
+                    ip += 2
+            elif op_code == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 2
+                else:
+                    ip += code[ip + 1] + 2
+            elif op_code == NIL:
+                stack.append(None)
+                ip += 1
+            elif op_code == TRUE:
+                stack.append(True)
+                ip += 1
+            elif op_code == FALSE:
+                stack.append(False)
+                ip += 1
+            elif op_code == PRINT:
+                print(self.interpreter._stringify(stack.pop()))
+                ip += 1
+            elif op_code == SET_CELL:
+                stack[base + code[ip + 1]].value = stack[-1]
+                ip += 2
+            elif op_code == STORE_NEW_CELL:
+                stack[base + code[ip + 1]] = Cell(stack.pop())
+                ip += 2
+            elif op_code == MAKE_CELL:
+                stack[base + code[ip + 1]] = Cell()
+                ip += 2
+            elif op_code == SET_UPVALUE:
+                upvalues[code[ip + 1]].value = stack[-1]
+                ip += 2
+            elif op_code == DEFINE_GLOBAL:
+                globals_values[constants[code[ip + 1]]] = stack.pop()
+                ip += 2
+            elif op_code == CHECK_INSTANCE:
+                if not isinstance(stack[-1], YaploxInstance):
+                    raise YaploxRuntimeError(
+                        constants[code[ip + 1]], "Only instances have fields."
+                    )
+                ip += 2
+            elif op_code == SET_PROPERTY:
+                value = stack.pop()
+                stack[-1].set(constants[code[ip + 1]], value)
+                stack[-1] = value
+                ip += 2
+            elif op_code == GET_SUPER:
+                superclass = stack.pop()
+                super_expr = constants[code[ip + 1]]
+                name = super_expr.method
+                method = super_expr.cache.find_method(superclass, name.lexeme)
+                if method is None:
+                    raise YaploxRuntimeError(
+                        name, f"Undefined property '{name.lexeme}'."
+                    )
+                stack[-1] = method.bind(stack[-1])
+                ip += 2
+            elif op_code == CLOSURE:
+                prototype = constants[code[ip + 1]]
+                captured = [
+                    stack[base + index] if is_local else upvalues[index]
+                    for is_local, index in prototype.upvalues
+                ]
+                stack.append(BytecodeClosure(prototype, captured))
+                ip += 2
+            elif op_code == CHECK_SUPERCLASS:
+                if not isinstance(stack[-1], YaploxClass):
+                    raise YaploxRuntimeError(
+                        constants[code[ip + 1]], "Superclass must be a class."
+                    )
+                ip += 2
+            elif op_code == CLASS:
+                superclass = stack.pop() if code[ip + 3] else None
+                count = code[ip + 2]
+                methods = stack[len(stack) - count :]
+                del stack[len(stack) - count :]
+                stack.append(
+                    YaploxClass(
+                        name=constants[code[ip + 1]],
+                        superclass=superclass,
+                        methods={
+                            method.declaration.name.lexeme: method for method in methods
+                        },
+                    )
+                )
+                ip += 4
+            else:
+                raise RuntimeError(f"Unknown op code {op_code}")
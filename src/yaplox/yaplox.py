@@ -1,50 +1,134 @@
 import sys
+from typing import Dict, List, Optional, Type
 
 from structlog import get_logger
 
 from yaplox.__version__ import __version__
-from yaplox.config import config  # noqa: F401
+from yaplox.bytecode_interpreter import BytecodeInterpreter
+from yaplox.closure_interpreter import ClosureInterpreter
+from yaplox.compile_cache import CompileCache
+from yaplox.config import config
 from yaplox.interpreter import Interpreter
+from yaplox.optimizer import Optimizer
 from yaplox.parser import Parser
+from yaplox.pratt_parser import PrattParser
+from yaplox.regex_scanner import RegexScanner
 from yaplox.resolver import Resolver
 from yaplox.scanner import Scanner
+from yaplox.source_loader import load_source
+from yaplox.stmt import Stmt
 from yaplox.token import Token
 from yaplox.token_type import TokenType
+from yaplox.transpiling_interpreter import TranspilingInterpreter
 from yaplox.yaplox_runtime_error import YaploxRuntimeError
 
 logger = get_logger()
 
+SCANNERS: Dict[str, Type[Scanner]] = {
+    "default": Scanner,
+    "regex": RegexScanner,
+}
+
+PARSERS: Dict[str, Type[Parser]] = {
+    "recursive": Parser,
+    "pratt": PrattParser,
+}
+
+BACKENDS: Dict[str, Type[Interpreter]] = {
+    "interpreter": Interpreter,
+    "closure": ClosureInterpreter,
+    "bytecode": BytecodeInterpreter,
+    "python": TranspilingInterpreter,
+}
+
+OPTIMIZE_FLAGS = ("-O0", "-O1", "-O2")
+BACKEND_FLAG = "--backend="
+
 
 class Yaplox:
-    def __init__(self):
+    def __init__(
+        self,
+        scanner: Optional[str] = None,
+        parser: Optional[str] = None,
+        cache: Optional[bool] = None,
+        optimize: Optional[int] = None,
+        backend: Optional[str] = None,
+    ):
+        """
+        Create a new Yaplox runner. `scanner` selects one of the SCANNERS and `parser`
+        one of the PARSERS. `cache` enables the on-disk CompileCache, `optimize`
+        sets the level of the Optimizer and `backend` selects one of the BACKENDS
+        that runs the program. When they are not given, the SCANNER, PARSER, CACHE,
+        OPTIMIZE and BACKEND configuration values are used.
+        """
         self.had_error: bool = False
         self.had_runtime_error: bool = False
-        self.interpreter: Interpreter = Interpreter()
+        self.interpreter: Interpreter = BACKENDS[backend or config.BACKEND]()
+        self.scanner_class = SCANNERS[scanner or config.SCANNER]
+        self.parser_class = PARSERS[parser or config.PARSER]
+        self.optimizer = Optimizer(config.OPTIMIZE if optimize is None else optimize)
+
+        self.compile_cache: Optional[CompileCache] = None
+        if config.CACHE if cache is None else cache:
+            self.compile_cache = CompileCache(config.CACHE_DIR, config.CACHE_MAX_SIZE)
 
     def run(self, source: str):
         logger.debug("Running line", source=source)
 
-        scanner = Scanner(source, on_error=self.error)
-        tokens = scanner.scan_tokens()
+        if self.compile_cache is None:
+            statements = self._compile(source)
+        else:
+            statements = self._compile_cached(source, self.compile_cache)
+
+        if statements is None:
+            return
+
+        self.interpreter.interpret(statements, on_error=self.runtime_error)
 
-        for token in tokens:
-            logger.debug("Running token", token=token)
+    def _compile_cached(
+        self, source: str, compile_cache: CompileCache
+    ) -> Optional[List[Stmt]]:
+        """
+        Load the resolved program from the cache. On a miss, the source is compiled
+        and the result is stored.
+        """
+        key = compile_cache.key(source, variant=f"O{self.optimizer.level}")
+        cached = compile_cache.load(key)
+        if cached is not None:
+            logger.debug("Loaded program from cache", key=key)
+            return cached
+
+        statements = self._compile(source)
+        if statements is not None:
+            compile_cache.store(key, statements)
+        return statements
+
+    def _compile(self, source: str) -> Optional[List[Stmt]]:
+        """
+        Scan, parse, optimize and resolve the source. Returns None when there was an
+        error.
+        """
+        scanner = self.scanner_class(source, on_error=self.error)
+        # The tokens are scanned lazily while the parser consumes them
+        tokens = scanner.iter_tokens()
 
-        parser = Parser(tokens, on_token_error=self.token_error)
+        parser = self.parser_class(tokens, on_token_error=self.token_error)
         statements = parser.parse()
 
         if self.had_error:
             logger.debug("Error after parsing")
-            return
+            return None
+
+        statements = self.optimizer.optimize(statements)
 
         resolver = Resolver(interpreter=self.interpreter, on_error=self.token_error)
         resolver.resolve(statements)
         # Stop if there was a resolution error.
         if self.had_error:
             logger.debug("Error after resolving")
-            return
+            return None
 
-        self.interpreter.interpret(statements, on_error=self.runtime_error)
+        return statements
 
     def error(self, line: int, message: str):
         self.report(line, "", message)
@@ -68,18 +152,16 @@ class Yaplox:
         self.had_error = True
 
     @staticmethod
-    def _load_file(file: str) -> str:  # pragma: no cover
-        with open(file) as f:
-            content = f.readlines()
-            lines = "\n".join(content)
-            return lines
+    def _load_file(file: str) -> str:
+        return load_source(file)
 
     def run_file(self, file: str):  # pragma: no cover
         """
-        Run yaplox with `file` as filename for the source input
+        Run yaplox with `file` as filename for the source input. Use `-` to read the
+        source from stdin.
         """
-        lines = self._load_file(file)
-        self.run(lines)
+        source = self._load_file(file)
+        self.run(source)
 
         # Indicate an error in the exit code
         if self.had_error:
@@ -117,12 +199,32 @@ class Yaplox:
     def main():  # pragma: no cover
         """
         Run Yaplox from the console. Accepts one argument as a file that will be
-        executed, or no arguments to run in REPL mode.
+        executed, or no arguments to run in REPL mode. The optimization level can be
+        set with `-O0`, `-O1` or `-O2` and the backend with `--backend=<name>` before
+        the file.
         """
-        if len(sys.argv) > 2:
-            print(f"Usage: {sys.argv[0]} [script]")
+        args = sys.argv[1:]
+        optimize = None
+        backend = None
+        invalid = False
+        # Options come before the script, a single `-` is stdin
+        while args and args[0] != "-" and args[0].startswith("-"):
+            option = args.pop(0)
+            if option in OPTIMIZE_FLAGS:
+                optimize = int(option[2:])
+            elif option.startswith(BACKEND_FLAG):
+                backend = option[len(BACKEND_FLAG) :]
+                invalid = invalid or backend not in BACKENDS
+            else:
+                invalid = True
+
+        if invalid or len(args) > 1:
+            print(
+                f"Usage: {sys.argv[0]} [-O0|-O1|-O2] "
+                f"[--backend={'|'.join(BACKENDS)}] [script]"
+            )
             sys.exit(64)
-        elif len(sys.argv) == 2:
-            Yaplox().run_file(sys.argv[1])
+        elif len(args) == 1:
+            Yaplox(optimize=optimize, backend=backend).run_file(args[0])
         else:
-            Yaplox().run_prompt()
+            Yaplox(optimize=optimize, backend=backend).run_prompt()
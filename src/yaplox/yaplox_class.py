@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
+from yaplox.shape import Shape
 from yaplox.yaplox_callable import YaploxCallable
 from yaplox.yaplox_function import YaploxFunction
 from yaplox.yaplox_instance import YaploxInstance
@@ -13,19 +14,13 @@ if TYPE_CHECKING:
 class YaploxClass(YaploxCallable):
     def call(self, interpreter: Interpreter, arguments: List[Any]):
         instance = YaploxInstance(klass=self)
-        initializer = self.find_method("init")
+        initializer = self.initializer
         if initializer is not None:
-            initializer.bind(instance=instance).call(
-                interpreter=interpreter, arguments=arguments
-            )
+            initializer.invoke(interpreter, instance, arguments)
         return instance
 
     def arity(self) -> int:
-        initializer = self.find_method("init")
-        if initializer is not None:
-            return initializer.arity()
-        else:
-            return 0
+        return self.initializer_arity
 
     def __init__(
         self,
@@ -36,17 +31,39 @@ class YaploxClass(YaploxCallable):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        # All methods of the class, with the inherited methods it doesn't override,
+        # so a method is found with one lookup however deep the class is. `super`
+        # finds its methods in the table of the superclass.
+        inherited = {} if superclass is None else superclass.method_table
+        self.method_table: Dict[str, YaploxFunction] = {**inherited, **methods}
+        # The shape of a new instance
+        self.shape = Shape.root()
+
+        # A class can't change after it has been created, a redefined class is a new
+        # YaploxClass. So the initializer is looked up once.
+        self.initializer = self.find_method("init")
+        self.initializer_arity = (
+            0 if self.initializer is None else self.initializer.arity()
+        )
+        # The fields the initializers assign to `this`, a new instance has room for
+        # them
+        fields = () if superclass is None else superclass.field_names
+        own = () if self.initializer is None else self.initializer.declaration.fields
+        self.field_names: Tuple[str, ...] = tuple(dict.fromkeys((*fields, *own)))
+        self.field_count = len(self.field_names)
+        # The shape of an instance once the initializers have assigned their fields.
+        # The transitions to it are created here, so instances that assign the fields
+        # in this order share the shapes from the first instance on. An instance
+        # still starts at the root shape, a field isn't defined until it is assigned.
+        shape = self.shape
+        for field_name in self.field_names:
+            if shape.is_dictionary:
+                break
+            shape = shape.with_field(field_name)
+        self.initialized_shape = shape
 
     def __repr__(self):
         return self.name
 
     def find_method(self, name: str) -> Optional[YaploxFunction]:
-        try:
-            return self.methods[name]
-        except KeyError:
-            pass
-
-        if self.superclass:
-            return self.superclass.find_method(name)
-
-        return None
+        return self.method_table.get(name)
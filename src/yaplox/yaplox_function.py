@@ -1,45 +1,77 @@
 from __future__ import annotations
 
-from yaplox.environment import Environment
+from typing import Any, List, Optional
+
+from yaplox.cell import Cell
+from yaplox.completion_type import CompletionType
+from yaplox.slot_environment import SlotEnvironment
 from yaplox.stmt import Function
 from yaplox.yaplox_callable import YaploxCallable
 from yaplox.yaplox_instance import YaploxInstance
-from yaplox.yaplox_return_exception import YaploxReturnException
 
 
 class YaploxFunction(YaploxCallable):
     def __init__(
         self,
         declaration: Function,
-        closure: Environment,
+        upvalues: List[Cell],
         is_initializer: bool,
+        instance: Optional[YaploxInstance] = None,
     ):
         super().__init__()
-        self.closure = closure
+        # The cells of the variables the function uses from the functions around it
+        self.upvalues = upvalues
         self.declaration = declaration
         self.is_initializer = is_initializer
+        # `this` of a bound method
+        self.instance = instance
 
     def bind(self, instance: YaploxInstance) -> YaploxFunction:
-        environment = Environment(self.closure)
-        environment.define("this", instance)
-        return YaploxFunction(self.declaration, environment, self.is_initializer)
+        return YaploxFunction(
+            self.declaration, self.upvalues, self.is_initializer, instance
+        )
+
+    def _create_environment(
+        self, arguments: List[Any], instance: Optional[YaploxInstance]
+    ) -> SlotEnvironment:
+        """
+        Create the environment of a call, with the arguments in the first slots
+        """
+        declaration = self.declaration
+        environment = SlotEnvironment(declaration.slot_count, None, self.upvalues)
+        values = environment.values
+        # `this` is the first slot of a method, followed by the parameters
+        if instance is None:
+            values[: len(arguments)] = arguments
+        else:
+            values[0] = instance
+            values[1 : len(arguments) + 1] = arguments
+        for slot in declaration.captured_params:
+            values[slot] = Cell(values[slot])
+        return environment
 
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
-
-        for declared_token, argument in zip(self.declaration.params, arguments):
-            environment.define(declared_token.lexeme, argument)
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except YaploxReturnException as yaplox_return:
-            if self.is_initializer:
-                # When we're in init(), return this as an early return
-                return self.closure.get_at(0, "this")
-            return yaplox_return.value
+        environment = self._create_environment(arguments, self.instance)
+        completion = interpreter.execute_function(self.declaration.body, environment)
+        if self.is_initializer:
+            # init() returns this, also after an early return
+            return self.instance
+        if completion is CompletionType.RETURN:
+            return interpreter.return_value
+        return None
 
+    def invoke(self, interpreter, instance: YaploxInstance, arguments: List[Any]):
+        """
+        Call a method of a class with `this` set to `instance`, like
+        `bind(instance).call(...)` without creating the bound function
+        """
+        environment = self._create_environment(arguments, instance)
+        completion = interpreter.execute_function(self.declaration.body, environment)
         if self.is_initializer:
-            # When init() is called directly on a class
-            return self.closure.get_at(0, "this")
+            return instance
+        if completion is CompletionType.RETURN:
+            return interpreter.return_value
+        return None
 
     def arity(self) -> int:
         return len(self.declaration.params)
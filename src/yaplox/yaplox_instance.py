@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List
 
 from yaplox.token import Token
 from yaplox.yaplox_runtime_error import YaploxRuntimeError
@@ -10,18 +10,34 @@ if TYPE_CHECKING:
 
 
 class YaploxInstance:
+    """
+    An instance of a YaploxClass. The values of the fields are stored in a list,
+    the Shape of the instance maps the names of the fields to their index. The list
+    is created with room for the fields the initializers of the class assign.
+    """
+
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass: YaploxClass):
         self.klass = klass
-        self.fields: Dict[str, Any] = {}
+        self.shape = klass.shape
+        self.values: List[Any] = [None] * klass.field_count
 
     def __repr__(self) -> str:
         return f"{self.klass.name} instance"
 
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """
+        A copy of the fields by name
+        """
+        values = self.values
+        return {name: values[index] for name, index in self.shape.slots.items()}
+
     def get(self, name: Token) -> Any:
-        try:
-            return self.fields[name.lexeme]
-        except KeyError:
-            pass
+        index = self.shape.slots.get(name.lexeme)
+        if index is not None:
+            return self.values[index]
 
         method = self.klass.find_method(name.lexeme)
         if method is not None:
@@ -30,4 +46,14 @@ class YaploxInstance:
         raise YaploxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
 
     def set(self, name: Token, value: Any):
-        self.fields[name.lexeme] = value
+        lexeme = name.lexeme
+        shape = self.shape
+        index = shape.slots.get(lexeme)
+        if index is None:
+            # A new field, it is stored after the fields of the current shape
+            index = len(shape.slots)
+            self.shape = shape.with_field(lexeme)
+            if index == len(self.values):
+                self.values.append(value)
+                return
+        self.values[index] = value
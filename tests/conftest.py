@@ -4,7 +4,17 @@ import pytest
 
 from yaplox.token import Token
 from yaplox.token_type import TokenType
-from yaplox.yaplox import Yaplox
+from yaplox.yaplox import BACKENDS, Yaplox
+
+
+@pytest.fixture(autouse=True, params=list(BACKENDS))
+def backend(request, monkeypatch) -> str:
+    """
+    Run every test with every backend. The backend is selected with the BACKEND
+    configuration value, so every Yaplox that is created in a test uses it.
+    """
+    monkeypatch.setenv("YAPLOX_BACKEND", request.param)
+    return request.param
 
 
 @pytest.fixture
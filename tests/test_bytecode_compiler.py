@@ -0,0 +1,186 @@
+import pytest
+
+from yaplox.bytecode_compiler import BytecodeCompiler
+from yaplox.bytecode_interpreter import BytecodeInterpreter
+from yaplox.chunk import Chunk
+from yaplox.interpreter import Interpreter
+from yaplox.parser import Parser
+from yaplox.resolver import Resolver
+from yaplox.scanner import Scanner
+from yaplox.yaplox import Yaplox
+
+
+def compile_source(source: str):
+    statements = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver(Interpreter()).resolve(statements)
+    return BytecodeCompiler().compile(statements)
+
+
+class TestBytecodeCompiler:
+    def test_expression(self):
+        script = compile_source("1 + 2 * 3;")
+
+        assert script.chunk.disassemble() == [
+            "0000    1 CONSTANT 0",
+            "0002    1 CONSTANT 1",
+            "0004    1 CONSTANT 2",
+            "0006    1 MULTIPLY 3",
+            "0008    1 ADD 4",
+            "0010    1 RETURN",
+        ]
+        assert script.chunk.constants[:3] == [1.0, 2.0, 3.0]
+
+    def test_signed_zero_constants(self, capsys):
+        chunk = Chunk()
+
+        assert [chunk.add_constant(value) for value in (0.0, -0.0, 0.0, -0.0)] == [
+            0,
+            1,
+            0,
+            1,
+        ]
+        assert str(chunk.constants[1]) == "-0.0"
+
+        # -0 is folded to a constant at -O1
+
+        Yaplox(backend="bytecode").run("print 0; print -0;")
+        assert capsys.readouterr().out == "0\n-0\n"
+
+    def test_jumps(self):
+        script = compile_source("var a = 1;\nwhile (a < 3) a = a + 1;")
+
+        assert script.chunk.disassemble() == [
+            "0000    1 CONSTANT 0",
+            "0002    1 DEFINE_GLOBAL 1",
+            "0004    2 GET_GLOBAL 2",
+            "0006    2 CONSTANT 3",
+            "0008    2 LESS 4",
+            "0010    2 POP_JUMP_IF_FALSE 11",
+            "0012    2 GET_GLOBAL 5",
+            "0014    2 CONSTANT 0",
+            "0016    2 ADD 6",
+            "0018    2 SET_GLOBAL 7",
+            "0020    2 POP",
+            "0021    2 LOOP 19",
+            "0023    2 NIL",
+            "0024    2 RETURN",
+        ]
+
+    def test_frame_slots(self):
+        """ The scopes of a function share one frame """
+        script = compile_source(
+            "fun f(a) { { var b = a; } { var c; var d; } var e = a; }"
+        )
+        function = script.chunk.constants[0]
+
+        assert function.frame_size == 4
+        # The blocks start after the slots of `a` and `e`, and share their slots
+        code = function.chunk.disassemble()
+        assert [" ".join(line.split()[2:]) for line in code] == [
+            "GET_LOCAL 0",
+            "STORE_LOCAL 2",
+            "NIL",
+            "STORE_LOCAL 2",
+            "NIL",
+            "STORE_LOCAL 3",
+            "GET_LOCAL 0",
+            "STORE_LOCAL 1",
+            "NIL",
+            "RETURN",
+        ]
+
+    def test_deep_recursion(self, capsys):
+        """ Lox calls don't use the Python stack """
+        code = """
+        fun count(n) { if (n == 0) return 0; return count(n - 1) + 1; }
+        print count(5000);
+        """
+        Yaplox(backend="bytecode").run(code)
+
+        assert capsys.readouterr().out == "5000\n"
+
+    def test_tail_call(self):
+        script = compile_source("fun f(n) { return g(n); }")
+        function = script.chunk.constants[0]
+
+        assert [" ".join(line.split()[2:]) for line in function.chunk.disassemble()][
+            :4
+        ] == ["GET_GLOBAL 0", "GET_LOCAL 0", "TAIL_CALL 1 1", "RETURN"]
+
+    def test_invoke(self):
+        script = compile_source("fun f(a) { a.m(1); return a.m(2); }")
+        function = script.chunk.constants[0]
+
+        assert [" ".join(line.split()[2:]) for line in function.chunk.disassemble()][
+            :9
+        ] == [
+            "GET_LOCAL 0",
+            "GET_METHOD 0",
+            "CONSTANT 1",
+            "INVOKE 1 2",
+            "POP",
+            "GET_LOCAL 0",
+            "GET_METHOD 3",
+            "CONSTANT 4",
+            "TAIL_INVOKE 1 5",
+        ]
+
+    def test_tail_calls_keep_the_depth(self, capsys, monkeypatch):
+        monkeypatch.setenv("YAPLOX_MAX_CALL_DEPTH", "100")
+        code = """
+        fun loop(n, acc) { if (n == 0) return acc; return loop(n - 1, acc + 1); }
+        print loop(1000, 0);
+        fun count(n) { if (n == 0) return 0; return count(n - 1) + 1; }
+        print count(99);
+        print count(100);
+        """
+        yaplox = Yaplox(backend="bytecode")
+        yaplox.run(code)
+
+        captured = capsys.readouterr()
+        assert captured.out == "1000\n99\n"
+        assert "Stack overflow. in line [line4]" in captured.err
+
+    def test_tail_invokes_keep_the_depth(self, capsys, monkeypatch):
+        monkeypatch.setenv("YAPLOX_MAX_CALL_DEPTH", "100")
+        code = """
+        class A {
+          loop(n) { if (n == 0) return n; return this.loop(n - 1); }
+          count(n) { if (n == 0) return 0; return this.count(n - 1) + 1; }
+        }
+        print A().loop(1000);
+        print A().count(99);
+        print A().count(100);
+        """
+        Yaplox(backend="bytecode").run(code)
+
+        captured = capsys.readouterr()
+        assert captured.out == "0\n99\n"
+        assert "Stack overflow. in line [line4]" in captured.err
+
+    @pytest.mark.parametrize(
+        ("code", "message"),
+        [
+            ('var a = 1;\n\nprint -"a";', "a must be a number. in line [line3]"),
+            ("fun f() {}\n\nf(1);", "Expected 0 arguments but got 1. in line [line3]"),
+            ("var a = 1;\na.b = 2;", "Only instances have fields. in line [line2]"),
+            ("class A {}\nclass B < A { m() { super.m(); } }\nB().m();", "line2"),
+        ],
+    )
+    def test_runtime_error_line(self, capsys, code, message):
+        yaplox = Yaplox(backend="bytecode")
+        yaplox.run(code)
+
+        assert yaplox.had_runtime_error
+        assert message in capsys.readouterr().err
+
+    def test_stack_is_restored(self, capsys):
+        interpreter = BytecodeInterpreter()
+        yaplox = Yaplox(backend="bytecode")
+        yaplox.interpreter = interpreter
+
+        yaplox.run("fun f(a) { return a + nil; } print 1 + f(1);")
+        yaplox.run("print 2;")
+
+        assert interpreter.vm.stack == []
+        assert capsys.readouterr().out == "2\n"
@@ -1,3 +1,6 @@
+from yaplox.yaplox import Yaplox
+
+
 class TestClassesInheretance:
     def test_class_circular(self, run_code_block):
         line = "class Oops < Oops {}"
@@ -62,6 +65,32 @@ class TestClassesInheretance:
             "Pipe full of custard and coat with chocolate.\n"
         )
 
+    def test_super_binds_this(self, run_code_block):
+        lines = """
+        class A {
+          init(name) {
+            this.name = name;
+          }
+          name() {
+            return this.name;
+          }
+        }
+
+        class B < A {
+          init() {
+            super.init("b");
+          }
+          describe() {
+            return super.name;
+          }
+        }
+
+        print B().describe()();
+        """
+
+        assert run_code_block(lines).err == ""
+        assert run_code_block(lines).out == "b\n"
+
     def test_multiple_inherit(self, run_code_block):
         lines = """
         class A {
@@ -116,3 +145,40 @@ class TestClassesInheretance:
             == "[line 1] Error  at 'super' : Can't use 'super' outside of a class.\n"
         )
         assert captured.out == ""
+
+    def test_method_table(self):
+        yaplox = Yaplox()
+        yaplox.run(
+            """
+            class A { a() {} m() {} }
+            class B < A { b() {} m() {} }
+            class C < B { c() {} }
+            """
+        )
+        classes = yaplox.interpreter.globals.values
+        a, b, c = classes["A"], classes["B"], classes["C"]
+
+        # Overrides replace the inherited methods, the own methods are kept apart
+        assert c.method_table == {
+            "a": a.methods["a"],
+            "m": b.methods["m"],
+            "b": b.methods["b"],
+            "c": c.methods["c"],
+        }
+        assert list(c.methods) == ["c"]
+        assert c.find_method("m") is b.methods["m"]
+        assert c.find_method("missing") is None
+
+    def test_deep_super(self, run_code_block):
+        lines = """
+        class A { name() { return "A"; } }
+        class B < A {}
+        class C < B { name() { return "C" + super.name(); } }
+        class D < C {}
+        class E < D { name() { return "E" + super.name(); } }
+        print E().name();
+        """
+        captured = run_code_block(lines)
+
+        assert captured.err == ""
+        assert captured.out == "ECA\n"
@@ -1,3 +1,7 @@
+from yaplox.yaplox import Yaplox
+from yaplox.yaplox_instance import YaploxInstance
+
+
 class TestClasses:
     def test_class(self, run_code_block):
         lines = """
@@ -219,3 +223,124 @@ class TestClasses:
         """
         assert run_code_block(lines).err == ""
         assert run_code_block(lines).out == "Foo instance\n"
+
+    def test_invoke_field(self, run_code_block):
+        # A field that holds a function shadows the method with the same name
+        lines = """
+        class Foo {
+          bar() { return "method"; }
+        }
+        fun bar(value) { return "field " + value; }
+        var foo = Foo();
+        print foo.bar();
+        foo.bar = bar;
+        print foo.bar("value");
+        foo.bar = "not callable";
+        foo.bar();
+        """
+        captured = run_code_block(lines)
+
+        assert captured.out == "method\nfield value\n"
+        assert captured.err == "Can only call functions and classes. in line [line11]\n"
+
+    def test_invoke_undefined_before_arguments(self, run_code_block):
+        # The method is looked up before the arguments are evaluated
+        lines = """
+        class Foo {}
+        fun argument() { print "evaluated"; }
+        Foo().bar(argument());
+        """
+        captured = run_code_block(lines)
+
+        assert captured.out == ""
+        assert captured.err == "Undefined property 'bar'. in line [line4]\n"
+
+    def test_invoke_arity(self, run_code_block):
+        lines = """
+        class Foo {
+          bar(a, b) { return a + b; }
+        }
+        print Foo().bar(1, 2);
+        Foo().bar(1);
+        """
+        captured = run_code_block(lines)
+
+        assert captured.out == "3\n"
+        assert captured.err == "Expected 2 arguments but got 1. in line [line6]\n"
+
+    def test_invoke_this(self, run_code_block):
+        lines = """
+        class Counter {
+          init(n) { this.n = n; }
+          count(n) {
+            if (n == 0) return this.n;
+            this.n = this.n + 1;
+            return this.count(n - 1);
+          }
+          other() { return Counter(10).count(2) + this.n; }
+        }
+        var counter = Counter(0);
+        print counter.count(5);
+        print counter.other();
+        print counter.init(1).n;
+        """
+        captured = run_code_block(lines)
+
+        assert captured.err == ""
+        assert captured.out == "5\n17\n1\n"
+
+    def test_cached_initializer(self):
+        yaplox = Yaplox()
+        yaplox.run(
+            """
+            class A { init(a, b) { this.a = a; this.b = b; } }
+            class B < A { init() { super.init(1, 2); this.c = 3; } }
+            class C < B {}
+            """
+        )
+        classes = yaplox.interpreter.globals.values
+
+        assert classes["A"].initializer is classes["A"].methods["init"]
+        assert classes["C"].initializer is classes["B"].methods["init"]
+        assert [classes[name].arity() for name in "ABC"] == [2, 0, 0]
+        assert classes["C"].field_names == ("a", "b", "c")
+        assert YaploxInstance(classes["C"]).values == [None, None, None]
+
+    def test_initialized_shape(self):
+        yaplox = Yaplox()
+        yaplox.run(
+            """
+            class A { init(a, b) { this.a = a; this.b = b; } }
+            class B < A { init() { super.init(1, 2); this.c = 3; } }
+            var b = B();
+            """
+        )
+        values = yaplox.interpreter.globals.values
+        klass = values["B"]
+
+        assert YaploxInstance(klass).shape is klass.shape
+        assert klass.shape.transitions["a"].transitions["b"].transitions["c"] is (
+            klass.initialized_shape
+        )
+        assert klass.initialized_shape.slots == {"a": 0, "b": 1, "c": 2}
+        assert values["b"].shape is klass.initialized_shape
+
+    def test_preallocated_fields(self, run_code_block):
+        # The room for a field doesn't define it
+        lines = """
+        class Foo {
+          init(set) { if (set) this.bar = "bar"; this.baz = "baz"; }
+          bar() { return "method"; }
+        }
+        var foo = Foo(false);
+        print foo.baz;
+        print foo.bar();
+        foo.bar = "field";
+        print foo.bar;
+        print Foo(true).bar;
+        print foo.qux;
+        """
+        captured = run_code_block(lines)
+
+        assert captured.out == "baz\nmethod\nfield\nbar\n"
+        assert captured.err == "Undefined property 'qux'. in line [line12]\n"
@@ -0,0 +1,64 @@
+import pytest
+
+from yaplox.closure_compiler import ClosureCompiler
+from yaplox.closure_interpreter import ClosureInterpreter
+from yaplox.compiled_function import CompiledFunction
+from yaplox.expr import Binary, Literal
+from yaplox.interpreter import Interpreter
+from yaplox.parser import Parser
+from yaplox.resolver import Resolver
+from yaplox.scanner import Scanner
+from yaplox.slot_environment import SlotEnvironment
+from yaplox.token_type import TokenType
+from yaplox.yaplox import Yaplox
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+
+class TestClosureCompiler:
+    @pytest.mark.parametrize(
+        ("left", "token_type", "right", "expected"),
+        [
+            (7.0, TokenType.LESS, 10.0, True),
+            (10.0, TokenType.SLASH, 4.0, 2.5),
+            (2.0, TokenType.PLUS, True, 3.0),
+            ("Foo", TokenType.PLUS, "Bar", "FooBar"),
+            (None, TokenType.EQUAL_EQUAL, None, True),
+        ],
+    )
+    def test_binary(self, create_token_factory, left, token_type, right, expected):
+        operator = create_token_factory(token_type=token_type)
+        expr = Binary(Literal(left), operator, Literal(right))
+
+        compiled = ClosureCompiler(Interpreter()).visit_binary_expr(expr)
+
+        assert compiled(SlotEnvironment(0)) == expected
+
+    def test_binary_error(self, create_token_factory):
+        operator = create_token_factory(token_type=TokenType.MINUS)
+        expr = Binary(Literal(1.0), operator, Literal("a"))
+        compiled = ClosureCompiler(Interpreter()).visit_binary_expr(expr)
+
+        with pytest.raises(YaploxRuntimeError) as excinfo:
+            compiled(SlotEnvironment(0))
+        assert excinfo.value.message == "Operands must be numbers."
+
+    def test_select_backend(self):
+        assert type(Yaplox(backend="closure").interpreter) is ClosureInterpreter
+        assert type(Yaplox(backend="interpreter").interpreter) is Interpreter
+
+    def test_compiled_functions(self):
+        source = "fun f(a) { return a + 1; } var b = f(1);"
+        interpreter = ClosureInterpreter()
+        statements = Parser(Scanner(source).scan_tokens()).parse()
+        Resolver(interpreter).resolve(statements)
+        interpreter.interpret(statements)
+
+        assert isinstance(interpreter.globals.values["f"], CompiledFunction)
+        assert interpreter.globals.values["b"] == 2
+
+    def test_runtime_error_line(self, capsys):
+        yaplox = Yaplox(backend="closure")
+        yaplox.run('var a = 1;\n\nprint a + "b";')
+
+        assert yaplox.had_runtime_error
+        assert "in line [line3]" in capsys.readouterr().err
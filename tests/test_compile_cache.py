@@ -0,0 +1,104 @@
+import os
+
+from yaplox.compile_cache import CompileCache
+from yaplox.yaplox import Yaplox
+
+SOURCE = """
+fun counter() {
+    var count = 0;
+    fun increment() {
+        count = count + 1;
+        return count;
+    }
+    return increment;
+}
+var c = counter();
+c();
+print c();
+"""
+
+
+class TestCompileCache:
+    def test_key(self):
+        assert CompileCache.key(SOURCE) == CompileCache.key(SOURCE)
+        assert CompileCache.key(SOURCE) != CompileCache.key(SOURCE + " ")
+        assert CompileCache.key(SOURCE) != CompileCache.key(SOURCE, variant="O2")
+
+    def test_miss(self, tmp_path):
+        compile_cache = CompileCache(str(tmp_path / "cache"), 1024)
+        assert compile_cache.load(compile_cache.key(SOURCE)) is None
+
+    def test_broken_entry(self, tmp_path):
+        compile_cache = CompileCache(str(tmp_path), 1024)
+        key = compile_cache.key(SOURCE)
+        (tmp_path / f"{key}.yaplox").write_bytes(b"not a pickle")
+
+        assert compile_cache.load(key) is None
+
+    def test_read_only_entry(self, tmp_path, mocker):
+        compile_cache = CompileCache(str(tmp_path), 1024 * 1024)
+        key = compile_cache.key(SOURCE)
+        compile_cache.store(key, [])
+        mocker.patch("os.utime", side_effect=PermissionError("read-only"))
+
+        # The entry is used, it only isn't marked as recently used
+        assert compile_cache.load(key) == []
+
+    def test_failed_store(self, tmp_path, mocker):
+        compile_cache = CompileCache(str(tmp_path), 1024 * 1024)
+        key = compile_cache.key(SOURCE)
+        mocker.patch("os.replace", side_effect=OSError("No space left on device"))
+
+        # The temporary file is removed, and there is no entry
+        compile_cache.store(key, [])
+        assert list(tmp_path.iterdir()) == []
+        assert compile_cache.load(key) is None
+
+    def test_run_from_cache(self, tmp_path, monkeypatch, mocker, capsys):
+        monkeypatch.setenv("YAPLOX_CACHE_DIR", str(tmp_path))
+
+        Yaplox(cache=True).run(SOURCE)
+        assert capsys.readouterr().out == "2\n"
+        assert len(list(tmp_path.glob("*.yaplox"))) == 1
+
+        # On a hit, the source is not scanned, parsed or resolved
+        compile_mock = mocker.patch.object(Yaplox, "_compile")
+        Yaplox(cache=True).run(SOURCE)
+        assert capsys.readouterr().out == "2\n"
+        assert not compile_mock.called
+
+    def test_errors_are_not_cached(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setenv("YAPLOX_CACHE_DIR", str(tmp_path))
+
+        yaplox = Yaplox(cache=True)
+        yaplox.run("{ var a = a; }")
+        assert yaplox.had_error
+        assert not list(tmp_path.glob("*.yaplox"))
+
+    def test_cache_from_config(self, tmp_path, monkeypatch):
+        assert Yaplox().compile_cache is None
+
+        monkeypatch.setenv("YAPLOX_CACHE", "true")
+        monkeypatch.setenv("YAPLOX_CACHE_DIR", str(tmp_path))
+        assert Yaplox().compile_cache.directory == tmp_path
+
+    def test_eviction(self, tmp_path):
+        compile_cache = CompileCache(str(tmp_path), 1024 * 1024)
+        keys = []
+        for number in range(3):
+            source = f"print {number};"
+            key = compile_cache.key(source)
+            compile_cache.store(key, Yaplox()._compile(source))
+            os.utime(tmp_path / f"{key}.yaplox", (number, number))
+            keys.append(key)
+
+        # Loading the oldest entry marks it as recently used
+        assert compile_cache.load(keys[0]) is not None
+
+        entry_size = (tmp_path / f"{keys[0]}.yaplox").stat().st_size
+        compile_cache.max_size = entry_size * 2
+        compile_cache.evict()
+
+        assert compile_cache.load(keys[0]) is not None
+        assert compile_cache.load(keys[1]) is None
+        assert compile_cache.load(keys[2]) is not None
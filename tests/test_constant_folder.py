@@ -0,0 +1,113 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from yaplox.constant_folder import ConstantFolder
+from yaplox.expr import Binary, Literal, Variable
+from yaplox.optimizer import Optimizer
+from yaplox.parser import Parser
+from yaplox.scanner import Scanner
+from yaplox.stmt import While
+from yaplox.yaplox import Yaplox
+
+EXAMPLES = sorted(Path(__file__).parent.parent.glob("examples/*.lox"))
+
+
+def fold(source):
+    tokens = Scanner(source).scan_tokens()
+    statements = Parser(tokens).parse()
+    return ConstantFolder().optimize(statements)
+
+
+class TestConstantFolder:
+    @pytest.mark.parametrize(
+        ("source", "expected"),
+        [
+            ("1 + 2 * 3;", 7.0),
+            ("(1 + 2) * 3;", 9.0),
+            ("-(4 / 8);", -0.5),
+            ('"foo" + "bar";', "foobar"),
+            ("1 < 2 == !false;", True),
+            ('nil == nil != ("a" == "b");', True),
+            ("nil or 3;", 3.0),
+            ('false and "never";', False),
+            ('"yes" or "never";', "yes"),
+            ("true and 1 + 1;", 2.0),
+            ("!!nil;", False),
+        ],
+    )
+    def test_fold(self, source, expected):
+        statements = fold(source)
+        expr = statements[0].expression
+
+        assert isinstance(expr, Literal)
+        assert expr.value == expected
+        assert type(expr.value) is type(expected)
+
+    @pytest.mark.parametrize(
+        "source", ['"a" - 1;', "-nil;", "1 / 0;", '1 + "a";', '1 < "a";']
+    )
+    def test_not_folded(self, source):
+        # These fail at runtime, so they must be kept
+        expr = fold(source)[0].expression
+        assert not isinstance(expr, Literal)
+
+    def test_partially_folded(self):
+        statements = fold("while (a < 10 * 10) a = a + (2 + 3);")
+        loop = statements[0]
+
+        assert isinstance(loop, While)
+        assert isinstance(loop.condition, Binary)
+        assert isinstance(loop.condition.left, Variable)
+        assert loop.condition.right.value == 100.0
+        assert loop.body.expression.value.right.value == 5.0
+
+    def test_drop_grouping(self):
+        statements = fold("print (((a)));")
+        assert isinstance(statements[0].expression, Variable)
+
+    def test_folded_runtime_error(self, run_code_lines):
+        captured = run_code_lines(["var a = 1;", 'print (2 + 3) - ("a" + "b");'])
+        assert "Operands must be numbers. in line [line2]" in captured.err
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda path: path.name)
+    def test_same_output(self, path, capsys):
+        source = path.read_text()
+
+        Yaplox(optimize=0).run(source)
+        expected = capsys.readouterr()
+        Yaplox(optimize=1).run(source)
+        captured = capsys.readouterr()
+
+        assert captured.out == expected.out
+
+
+class TestOptimizer:
+    def test_levels(self):
+        assert Optimizer(0).passes == []
+        assert ConstantFolder in Optimizer(1).passes
+        assert ConstantFolder in Optimizer(2).passes
+
+        with pytest.raises(ValueError):
+            Optimizer(3)
+
+    def test_level_from_config(self, monkeypatch):
+        assert Yaplox().optimizer.level == 1
+        monkeypatch.setenv("YAPLOX_OPTIMIZE", "0")
+        assert Yaplox().optimizer.level == 0
+
+    @pytest.mark.parametrize("flag", ["-O0", "-O1", "-O2"])
+    def test_main_flag(self, flag, monkeypatch, capsys):
+        monkeypatch.setattr(Yaplox, "_load_file", staticmethod(lambda file: "print 3;"))
+        run_file = Yaplox.run_file
+
+        def mocked_run_file(yaplox, file):
+            assert yaplox.optimizer.level == int(flag[2])
+            run_file(yaplox, file)
+
+        monkeypatch.setattr(Yaplox, "run_file", mocked_run_file)
+        with patch("sys.argv", ["yaplox.py", flag, "source.lox"]):
+            Yaplox.main()
+
+        assert capsys.readouterr().out == "3\n"
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+
+from yaplox.constant_folder import ConstantFolder
+from yaplox.dead_code_eliminator import DeadCodeEliminator
+from yaplox.parser import Parser
+from yaplox.scanner import Scanner
+from yaplox.stmt import Block, Function, Print, Return, Var
+from yaplox.yaplox import Yaplox
+
+EXAMPLES = sorted(Path(__file__).parent.parent.glob("examples/*.lox"))
+
+
+def eliminate(source):
+    tokens = Scanner(source).scan_tokens()
+    statements = ConstantFolder().optimize(Parser(tokens).parse())
+    eliminator = DeadCodeEliminator()
+    return eliminator.optimize(statements), eliminator.changes
+
+
+class TestDeadCodeEliminator:
+    def test_after_return(self):
+        statements, changes = eliminate(
+            "fun f() { print 1; return 2; print 3; { print 4; } }"
+        )
+        function = statements[0]
+
+        assert isinstance(function, Function)
+        assert [type(stmt) for stmt in function.body] == [Print, Return]
+        assert changes == 2
+
+    def test_constant_if(self):
+        statements, changes = eliminate(
+            """
+            if (false) { print 1; }
+            if (1 == 2) print 2; else print 3;
+            if (nil or "yes") print 4; else print 5;
+            if (a) print 6;
+            """
+        )
+
+        assert [stmt.expression.value for stmt in statements[:2]] == [3.0, 4.0]
+        assert len(statements) == 3
+        assert changes == 3
+
+    def test_return_in_constant_if(self):
+        statements, changes = eliminate(
+            "fun f() { if (true) return 1; else return 2; print 3; }"
+        )
+
+        assert [type(stmt) for stmt in statements[0].body] == [Return]
+        assert changes == 2
+
+    def test_while_false(self):
+        statements, changes = eliminate("while (false) print 1; while (a) print 2;")
+
+        assert len(statements) == 1
+        assert changes == 1
+
+    def test_unused_vars(self):
+        statements, changes = eliminate(
+            """
+            var global = 1;
+            {
+                var unused = 1 + 2;
+                var uninitialized;
+                var used = "used";
+                var assigned;
+                var side_effect = f();
+                assigned = used;
+            }
+            """
+        )
+        block = statements[1]
+
+        assert isinstance(block, Block)
+        assert [
+            stmt.name.lexeme for stmt in block.statements if isinstance(stmt, Var)
+        ] == [
+            "used",
+            "assigned",
+            "side_effect",
+        ]
+        assert changes == 2
+
+    def test_keep_redeclared_vars(self, capsys):
+        # The Resolver must still report these errors
+        Yaplox(optimize=2).run("fun f(a) { var a = 1; { var b; var b; } }")
+        captured = capsys.readouterr()
+
+        assert captured.err.count("Already variable with this name in this scope.") == 2
+
+    def test_keep_superclass_vars(self, capsys):
+        Yaplox(optimize=2).run("fun f() { var A = nil; class B < A {} } f();")
+        captured = capsys.readouterr()
+
+        assert captured.err.startswith("Superclass must be a class.")
+
+    def test_report_changes(self):
+        yaplox = Yaplox(optimize=2)
+        yaplox.run("if (false) print 1; fun f() { var a; return; print 2; }")
+
+        assert yaplox.optimizer.changes["DeadCodeEliminator"] == 3
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda path: path.name)
+    def test_same_output(self, path, capsys):
+        source = path.read_text()
+
+        Yaplox(optimize=0).run(source)
+        expected = capsys.readouterr()
+        Yaplox(optimize=2).run(source)
+        captured = capsys.readouterr()
+
+        assert captured.out == expected.out
@@ -327,6 +327,54 @@ class TestFunctions:
         captured = capsys.readouterr()
         assert captured.out == "1\n2\nnil\n"
 
+    def test_return_unwinds_statements(self, run_code_block):
+        """
+        A return ends the blocks, branches and loops around it, but not the function
+        that calls the function, and a function without return gives nil.
+        """
+        code = """
+        fun find(limit) {
+            for (var i = 0; i < limit; i = i + 1) {
+                {
+                    var j = i * 2;
+                    if (j < 6) {
+                        print j;
+                    } else {
+                        return j;
+                    }
+                }
+            }
+            return -1;
+        }
+        fun outer() {
+            fun inner() { return 1; }
+            inner();
+            print "after";
+            "not returned";
+        }
+        print find(10);
+        print find(2);
+        print outer();
+        """
+        captured = run_code_block(code)
+
+        assert captured.err == ""
+        assert captured.out == "0\n2\n4\n6\n0\n2\n-1\nafter\nnil\n"
+
+    def test_stack_overflow(self, run_code_block):
+        """ Too deep recursion is a Lox runtime error on every backend """
+        code = """
+        fun count(n) {
+            if (n == 0) return 0;
+            return count(n - 1) + 1;
+        }
+        print count(20000);
+        """
+        captured = run_code_block(code)
+
+        assert captured.out == ""
+        assert captured.err == "Stack overflow. in line [line4]\n"
+
     def test_closures(self, capsys):
         """
         Test closures, where a function in a function must have access to variables that
@@ -357,3 +405,57 @@ class TestFunctions:
 
         captured = capsys.readouterr()
         assert captured.out == "1\n2\n"
+
+    def test_closures_share_cells(self, run_code_block):
+        """
+        Closures that capture the same variable share it, also with the function that
+        declares it, and every run of a block gets its own variables.
+        """
+        code = """
+        fun pair() {
+            var value = 0;
+            fun get() { return value; }
+            fun set(new) { value = new; }
+            set(5);
+            print value;
+            return get;
+        }
+        print pair()();
+
+        fun adder(a) {
+            fun middle() {
+                fun inner(b) { a = a + b; return a; }
+                return inner;
+            }
+            return middle();
+        }
+        var add = adder(10);
+        add(1);
+        print add(2);
+
+        var closures;
+        for (var i = 0; i < 3; i = i + 1) {
+            var j = i;
+            fun get() { return j; }
+            if (i == 1) closures = get;
+        }
+        print closures();
+        """
+        assert run_code_block(code).out == "5\n5\n13\n1\n"
+
+    def test_closure_keeps_only_its_variables(self):
+        """ A closure keeps the cells it uses, not the frames around it """
+        source = """
+        fun make() {
+            var big = "unused";
+            var used = 1;
+            fun get() { return used; }
+            return get;
+        }
+        var get = make();
+        """
+        yaplox = Yaplox()
+        yaplox.run(source)
+
+        get = yaplox.interpreter.globals.values["get"]
+        assert [cell.value for cell in get.upvalues] == [1]
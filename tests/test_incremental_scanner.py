@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from yaplox.incremental_scanner import IncrementalScanner
+from yaplox.regex_scanner import RegexScanner
+
+SOURCE = """
+class Point {
+  init(x, y) {
+    this.x = x; // the x coordinate
+    this.y = y;
+  }
+}
+
+var p = Point(1, 2.5);
+print "point" + "
+multi line";
+print p.x >= p.y;
+"""
+
+
+def as_tuples(buffer):
+    return [
+        (token.token_type, token.lexeme, token.literal, token.line) for token in buffer
+    ]
+
+
+class TestIncrementalScanner:
+    @pytest.mark.parametrize(
+        ("offset", "removed", "inserted"),
+        [
+            # Extend an identifier
+            (SOURCE.index("Point {") + 5, 0, "s"),
+            # Merge two operators
+            (SOURCE.index(">="), 2, "= ="),
+            (SOURCE.index(">="), 0, "=="),
+            # Turn a number into a longer number
+            (SOURCE.index("2.5") + 3, 0, "75"),
+            (SOURCE.index("1, 2.5"), 1, "1."),
+            # Comment out code, and uncomment it
+            (SOURCE.index("this.y"), 0, "// "),
+            (SOURCE.index("// the x"), 2, ""),
+            # Add and remove newlines
+            (SOURCE.index("var p"), 0, "\n\n\n"),
+            (SOURCE.index("multi"), 1, ""),
+            # Open a string that never closes, or close it again
+            (SOURCE.index("var p"), 0, '"'),
+            (SOURCE.index('"point"'), 1, ""),
+            # Edit at the very start and end
+            (0, 1, "var a;"),
+            (len(SOURCE), 0, "print a;"),
+            (len(SOURCE) - 1, 1, ""),
+            # Replace everything
+            (0, len(SOURCE), "print 1;"),
+        ],
+    )
+    def test_edit(self, offset, removed, inserted, mocker):
+        on_error_mock = mocker.MagicMock()
+        scanner = IncrementalScanner(SOURCE, on_error=on_error_mock)
+
+        buffer = scanner.edit(offset, removed, inserted)
+
+        source = SOURCE[:offset] + inserted + SOURCE[offset + removed :]
+        assert buffer.source == scanner.source == source
+        expected = RegexScanner(source, on_error=on_error_mock).scan_buffer()
+        assert as_tuples(buffer) == as_tuples(expected)
+
+    def test_random_edits(self):
+        # Apply a series of random edits, and compare every result with a full scan
+        rnd = random.Random(1234)
+        fragments = ["a", "1", ".", "=", "\n", " ", "/", "//", '"', "or", "{}", ";"]
+        scanner = IncrementalScanner(SOURCE, on_error=lambda line, message: None)
+
+        for _ in range(300):
+            source = scanner.source
+            offset = rnd.randint(0, len(source))
+            removed = rnd.randint(0, min(3, len(source) - offset))
+            inserted = "".join(rnd.choices(fragments, k=rnd.randint(0, 3)))
+
+            buffer = scanner.edit(offset, removed, inserted)
+
+            expected = RegexScanner(buffer.source, lambda line, message: None)
+            assert as_tuples(buffer) == as_tuples(expected.scan_buffer())
+
+    def test_edit_relexes_locally(self):
+        source = "var a = 1;\n" * 10_000
+        scanner = IncrementalScanner(source)
+        assert scanner.relexed == 50_001
+
+        buffer = scanner.edit(source.index("a = 1") + 1, 0, "bc")
+
+        # Only a few tokens around the edit are scanned again
+        assert scanner.relexed <= 3
+        assert buffer[1].lexeme == "abc"
+
+        buffer = scanner.edit(len(source) // 2, 0, "\n\n")
+        assert scanner.relexed <= 3
+        assert buffer[-1].line == 10_003
+
+    def test_edit_error(self, mocker):
+        on_error_mock = mocker.MagicMock()
+        scanner = IncrementalScanner("print 1;\nprint 2;\n", on_error=on_error_mock)
+
+        scanner.edit(15, 0, "@")
+
+        on_error_mock.assert_called_once_with(2, "Unexpected character: @")
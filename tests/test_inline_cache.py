@@ -0,0 +1,82 @@
+import pickle
+
+from yaplox.inline_cache import MAX_ENTRIES, InlineCache
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.yaplox import Yaplox
+from yaplox.yaplox_class import YaploxClass
+from yaplox.yaplox_instance import YaploxInstance
+
+
+def define(source: str) -> dict:
+    yaplox = Yaplox()
+    yaplox.run(source)
+    return yaplox.interpreter.globals.values
+
+
+class TestInlineCache:
+    def test_hits_and_misses(self):
+        classes = define("class A { m() {} } class B < A {}")
+        cache = InlineCache()
+
+        for _ in range(3):
+            assert cache.find_method(classes["A"], "m") is classes["A"].methods["m"]
+            assert cache.find_method(classes["B"], "m") is classes["A"].methods["m"]
+
+        assert (cache.hits, cache.misses) == (4, 2)
+
+    def test_megamorphic(self):
+        classes = [YaploxClass(f"C{index}", None, {}) for index in range(10)]
+        cache = InlineCache()
+
+        for klass in classes:
+            cache.find_method(klass, "m")
+            cache.find_method(klass, "m")
+
+        assert len(cache.entries) == MAX_ENTRIES
+        assert cache.hits == MAX_ENTRIES
+        assert cache.misses == 2 * len(classes) - MAX_ENTRIES
+
+    def test_fields_before_methods(self):
+        classes = define("class A { m() {} }")
+        instance = YaploxInstance(classes["A"])
+        cache = InlineCache()
+        name = Token(TokenType.IDENTIFIER, "m", None, 1)
+
+        assert cache.get(instance, name).declaration.name.lexeme == "m"
+        instance.set(name, 1)
+        assert cache.get(instance, name) == 1
+
+    def test_redefined_class(self, run_code_block):
+        code = """
+        class A { m() { return 1; } }
+        fun call(a) { return a.m(); }
+        print call(A());
+        print call(A());
+        class A { m() { return 2; } }
+        print call(A());
+        """
+        captured = run_code_block(code)
+
+        assert captured.err == ""
+        assert captured.out == "1\n1\n2\n"
+
+    def test_super(self, run_code_block):
+        code = """
+        class A { m() { return "A"; } }
+        class B < A { m() { return "B" + super.m(); } }
+        for (var i = 0; i < 2; i = i + 1) print B().m();
+        """
+        captured = run_code_block(code)
+
+        assert captured.err == ""
+        assert captured.out == "BA\nBA\n"
+
+    def test_pickle(self):
+        classes = define("class A { m() {} }")
+        cache = InlineCache()
+        cache.find_method(classes["A"], "m")
+
+        loaded = pickle.loads(pickle.dumps(cache))
+
+        assert (loaded.entries, loaded.hits, loaded.misses) == ({}, 0, 0)
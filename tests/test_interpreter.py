@@ -1,3 +1,5 @@
+import weakref
+
 import pytest
 
 from yaplox.expr import Binary, Grouping, Literal, Unary
@@ -6,6 +8,8 @@ from yaplox.parser import Parser
 from yaplox.scanner import Scanner
 from yaplox.stmt import Expression
 from yaplox.token_type import TokenType
+from yaplox.yaplox import Yaplox
+from yaplox.yaplox_callable import YaploxCallable
 from yaplox.yaplox_runtime_error import YaploxRuntimeError
 
 
@@ -125,6 +129,26 @@ class TestInterpreter:
         with pytest.raises(YaploxRuntimeError):
             Interpreter().visit_binary_expr(expr)
 
+    @pytest.mark.parametrize(
+        ("left", "token_type", "right", "message"),
+        [
+            (10.0, TokenType.LESS, "Foo", "Operands must be numbers."),
+            (None, TokenType.STAR, 2.0, "Operands must be numbers."),
+            (1.0, TokenType.PLUS, None, "Operands must be two numbers or two strings"),
+            ("a", TokenType.PLUS, 1.0, "Operands must be two numbers or two strings"),
+        ],
+    )
+    def test_binary_expression_messages(
+        self, create_token_factory, left, token_type, right, message
+    ):
+        operator = create_token_factory(token_type=token_type)
+        expr = Binary(left=Literal(left), operator=operator, right=Literal(right))
+        with pytest.raises(YaploxRuntimeError) as excinfo:
+            Interpreter().visit_binary_expr(expr)
+
+        assert excinfo.value.message == message
+        assert excinfo.value.token is operator
+
     def test_nested_binary_expr(self, create_token_factory, mocker):
         """ Test nested binary expressions, 4 * 6 / 2 """
         on_scanner_error_mock = mocker.MagicMock()
@@ -236,3 +260,38 @@ class TestInterpreter:
         ]
 
         assert run_code_lines(lines).out == "nil\n"
+
+    def test_frames_are_released(self):
+        class Value:
+            pass
+
+        class Allocate(YaploxCallable):
+            def __init__(self):
+                self.values = []
+
+            def call(self, interpreter, arguments):
+                value = Value()
+                self.values.append(weakref.ref(value))
+                return value
+
+            def arity(self) -> int:
+                return 0
+
+        allocate = Allocate()
+        yaplox = Yaplox()
+        yaplox.interpreter.globals.define("allocate", allocate)
+        yaplox.run(
+            """
+            fun f() {
+              for (var i = 0; i < 3; i = i + 1) { var inner = allocate(); }
+              { var block = allocate(); }
+              var local = allocate();
+            }
+            for (var i = 0; i < 2; i = i + 1) { var outer = allocate(); f(); }
+            """
+        )
+
+        # The reused frames of blocks don't keep the values alive after a call or
+        # loop has finished
+        assert len(allocate.values) == 12
+        assert [value() for value in allocate.values] == [None] * 12
@@ -156,3 +156,41 @@ class TestParser:
         assert on_parser_error_mock.called
 
         on_parser_error_mock.assert_called_once_with(tokens[1], "Expect variable name.")
+
+    def test_parse_lazy_tokens(self, mocker):
+        """
+        The parser pulls tokens from an iterator as it needs them, it never asks for
+        tokens beyond the one it is looking at.
+        """
+        on_parser_error_mock = mocker.MagicMock()
+        consumed = []
+
+        def iter_tokens():
+            for token in Scanner("print 1;\nprint 2;").iter_tokens():
+                consumed.append(token)
+                yield token
+
+        parser = Parser(iter_tokens(), on_token_error=on_parser_error_mock)
+
+        # Only the first token has been pulled from the iterator
+        assert len(consumed) == 1
+
+        statement = parser._declaration()
+        assert AstPrinter().print(statement.expression) == "1.0"
+        # print 1 ; and the next print token as lookahead
+        assert [token.lexeme for token in consumed] == ["print", "1", ";", "print"]
+
+        assert len(parser.parse()) == 1
+        assert consumed[-1].token_type == TokenType.EOF
+        assert not on_parser_error_mock.called
+
+    def test_nodes_have_slots(self):
+        statements = Parser(Scanner("print -(1 + a);").scan_tokens()).parse()
+        statement = statements[0]
+        unary = statement.expression
+
+        # Slotted nodes don't have an instance dict
+        assert not hasattr(statement, "__dict__")
+        assert not hasattr(unary, "__dict__")
+        assert unary.__match_args__ == ("operator", "right")
+        assert isinstance(unary.right.expression, Binary)
@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pytest
+
+from yaplox.parser import Parser
+from yaplox.pratt_parser import PrattParser
+from yaplox.scanner import Scanner
+from yaplox.token import Token
+from yaplox.yaplox import Yaplox
+
+EXAMPLES = sorted(Path(__file__).parent.parent.glob("examples/*.lox"))
+
+
+def dump(node):
+    """
+    Convert an AST into nested tuples, so two trees can be compared
+    """
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    if isinstance(node, Token):
+        return node.token_type, node.lexeme, node.literal, node.line
+    if hasattr(node, "accept"):
+        fields = [(name, dump(getattr(node, name))) for name in node.__match_args__]
+        return type(node).__name__, fields
+    return node
+
+
+def parse(parser_class, source, on_token_error):
+    tokens = Scanner(source).scan_tokens()
+    return parser_class(tokens, on_token_error=on_token_error).parse()
+
+
+class TestPrattParser:
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "1;",
+            "-1 - -2 - 3;",
+            "!!true == false != nil;",
+            "1 + 2 * 3 - 4 / 5 * (6 - 7);",
+            "1 < 2 == 3 >= 4 <= 5 > 6;",
+            'a or b and c or "d" and e;',
+            "a = b = c or d;",
+            "a.b.c = d.e(f, g)(h).i = 3;",
+            "-a.b(c);",
+            "super.method(this, this.a);",
+            "print clock() - start;",
+            "fun f(a, b) { return a * b + f(a - 1, b); }",
+            "class A < B { init(x) { this.x = x; super.init(); } }",
+            "for (var i = 0; i < 10; i = i + 1) { if (i > 2 and i != 5) print i; }",
+        ],
+    )
+    def test_same_tree(self, source, mocker):
+        on_token_error_mock = mocker.MagicMock()
+
+        expected = parse(Parser, source, on_token_error_mock)
+        statements = parse(PrattParser, source, on_token_error_mock)
+
+        assert dump(statements) == dump(expected)
+        assert not on_token_error_mock.called
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda path: path.name)
+    def test_same_tree_examples(self, path, mocker):
+        on_token_error_mock = mocker.MagicMock()
+        source = path.read_text()
+
+        expected = parse(Parser, source, on_token_error_mock)
+        statements = parse(PrattParser, source, on_token_error_mock)
+
+        assert dump(statements) == dump(expected)
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "a + b = c;",
+            "1 = 2;",
+            "a = 1 = 2;",
+            "(a = 1;",
+            "1 +;",
+            "a.1;",
+            "super;",
+            "super.;",
+            "f(1, 2;",
+            "print 1 + 2; print ); var a = 3;",
+        ],
+    )
+    def test_same_errors(self, source, mocker):
+        expected_error_mock = mocker.MagicMock()
+        on_token_error_mock = mocker.MagicMock()
+
+        expected = parse(Parser, source, expected_error_mock)
+        statements = parse(PrattParser, source, on_token_error_mock)
+
+        assert dump(statements) == dump(expected)
+        assert on_token_error_mock.called
+        assert [
+            (token.lexeme, token.line, message)
+            for (token, message), _ in on_token_error_mock.call_args_list
+        ] == [
+            (token.lexeme, token.line, message)
+            for (token, message), _ in expected_error_mock.call_args_list
+        ]
+
+    def test_select_parser(self, monkeypatch, capsys):
+        assert Yaplox().parser_class is Parser
+        assert Yaplox(parser="pratt").parser_class is PrattParser
+
+        monkeypatch.setenv("YAPLOX_PARSER", "pratt")
+        yaplox = Yaplox()
+        assert yaplox.parser_class is PrattParser
+
+        yaplox.run("var a = 1; a = a + 2 * 3; print a;")
+        assert capsys.readouterr().out == "7\n"
@@ -0,0 +1,86 @@
+import pytest
+
+from yaplox.interpreter import Interpreter
+from yaplox.parser import Parser
+from yaplox.python_transpiler import PythonTranspiler
+from yaplox.resolver import Resolver
+from yaplox.scanner import Scanner
+from yaplox.transpiling_interpreter import TranspilingInterpreter
+from yaplox.yaplox import Yaplox
+
+
+def transpile_source(source: str) -> str:
+    statements = Parser(Scanner(source).scan_tokens()).parse()
+    Resolver(Interpreter()).resolve(statements)
+    return PythonTranspiler().transpile(statements)
+
+
+class TestPythonTranspiler:
+    def test_locals(self):
+        source = transpile_source("{ var a = 1; a = a + 2; print a; }")
+
+        assert source.splitlines() == [
+            "def lox_script():",
+            "    v1_a = 1.0",
+            "    (v1_a := (t2 + t3 if (type(t2 := v1_a) is float) & "
+            "(type(t3 := 2.0) is float) else lox_plus(T[0], t2, t3)))",
+            "    lox_print(v1_a)",
+        ]
+
+    def test_closures(self):
+        """ A closure gets the cells it uses as default arguments """
+        source = transpile_source(
+            "fun make() { var a = 1; fun get() { return a; } return get; }"
+        )
+
+        assert source.splitlines() == [
+            "def lox_script():",
+            "    def v1_make():",
+            "        v2_a = Cell(1.0)",
+            "        def v4_get(u0=v2_a):",
+            "            return u0.value",
+            "        v3_get = TranspiledFunction(D[0], v4_get, False)",
+            "        return v3_get",
+            "    G['make'] = TranspiledFunction(D[1], v1_make, False)",
+        ]
+
+    def test_select_backend(self):
+        assert isinstance(Yaplox(backend="python").interpreter, TranspilingInterpreter)
+
+    def test_closures_in_loop(self, capsys):
+        code = """
+        var fns = nil;
+        for (var i = 0; i < 3; i = i + 1) {
+            var j = i;
+            fun f() { print j; }
+            if (i == 1) fns = f;
+        }
+        fns();
+        """
+        Yaplox(backend="python").run(code)
+
+        assert capsys.readouterr().out == "1\n"
+
+    @pytest.mark.parametrize(
+        ("code", "message"),
+        [
+            ("var a = 1;\n\nprint a + b;", "Undefined variable 'b'. in line [line3]"),
+            ("fun f() {\n  return\n    x;\n}\nf();", "'x'. in line [line3]"),
+            ('var a = 1;\n\nprint -"a";', "a must be a number. in line [line3]"),
+            ("fun f() {}\n\nf(1);", "Expected 0 arguments but got 1. in line [line3]"),
+            ("var a = 1;\na.b = 2;", "Only instances have fields. in line [line2]"),
+        ],
+    )
+    def test_runtime_error_line(self, capsys, code, message):
+        yaplox = Yaplox(backend="python")
+        yaplox.run(code)
+
+        assert yaplox.had_runtime_error
+        assert message in capsys.readouterr().err
+
+    def test_fallback(self, capsys):
+        """ A program that CPython can't compile runs on the Interpreter """
+        yaplox = Yaplox(backend="python")
+        yaplox.run("print 0" + " + 1" * 150 + ";")
+
+        assert capsys.readouterr().out == "150\n"
@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import pytest
+
+from yaplox.regex_scanner import RegexScanner
+from yaplox.scanner import Scanner
+from yaplox.token_type import TokenType
+from yaplox.yaplox import Yaplox
+
+EXAMPLES = sorted(Path(__file__).parent.parent.glob("examples/*.lox"))
+
+
+def as_tuples(tokens):
+    return [
+        (token.token_type, token.lexeme, token.literal, token.line) for token in tokens
+    ]
+
+
+class TestRegexScanner:
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "",
+            "+-\n*",
+            "!= ! == = === > >= < <= /",
+            "*// This is a comment\n=",
+            "(( )){} // grouping stuff",
+            '+"This is a String"',
+            '"This is an \nMulti-\nline-string" + a',
+            "123 12.23 3+5 13.",
+            "appelflap or nil if while _foo_bar_1_2",
+            "123foo_bar bar-stool spam_egg_1.3_chickens",
+            "class Foo < Bar { init() { this.a = super.b(1, 2); } }",
+            "\r\n\t var a = 1;\n\n// comment at the end",
+        ],
+    )
+    def test_same_tokens(self, source, mocker):
+        on_error_mock = mocker.MagicMock()
+
+        expected = Scanner(source, on_error=on_error_mock).scan_tokens()
+        tokens = RegexScanner(source, on_error=on_error_mock).scan_tokens()
+
+        assert as_tuples(tokens) == as_tuples(expected)
+        assert not on_error_mock.called
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda path: path.name)
+    def test_same_tokens_examples(self, path):
+        source = path.read_text()
+
+        expected = Scanner(source).scan_tokens()
+        tokens = RegexScanner(source).scan_tokens()
+
+        assert as_tuples(tokens) == as_tuples(expected)
+
+    def test_line_counter(self):
+        scanner = RegexScanner('"a\nb"\n+')
+        scanner.scan_tokens()
+
+        assert scanner.line == 3
+
+    def test_bad_char(self, mocker):
+        on_error_mock = mocker.MagicMock()
+
+        tokens = RegexScanner("+\n@-", on_error=on_error_mock).scan_tokens()
+
+        on_error_mock.assert_called_once_with(2, "Unexpected character: @")
+        assert [token.token_type for token in tokens] == [
+            TokenType.PLUS,
+            TokenType.MINUS,
+            TokenType.EOF,
+        ]
+
+    def test_bad_char_without_callback(self):
+        with pytest.raises(KeyError):
+            RegexScanner("@").scan_tokens()
+
+    def test_unterminated_string(self, mocker):
+        on_error_mock = mocker.MagicMock()
+
+        tokens = RegexScanner('+"This is\na Unterminated', on_error_mock).scan_tokens()
+
+        on_error_mock.assert_called_once_with(2, "Unterminated string.")
+        assert [token.token_type for token in tokens] == [
+            TokenType.PLUS,
+            TokenType.EOF,
+        ]
+        assert tokens[-1].line == 2
+
+    def test_select_scanner(self, monkeypatch, capsys):
+        assert Yaplox().scanner_class is Scanner
+        assert Yaplox(scanner="regex").scanner_class is RegexScanner
+
+        monkeypatch.setenv("YAPLOX_SCANNER", "regex")
+        yaplox = Yaplox()
+        assert yaplox.scanner_class is RegexScanner
+
+        yaplox.run('print "Hello" + " world";')
+        assert capsys.readouterr().out == "Hello world\n"
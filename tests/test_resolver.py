@@ -1,5 +1,12 @@
+import pytest
+
+from yaplox.frame_type import FrameType
+from yaplox.interpreter import Interpreter
+from yaplox.parser import Parser
 from yaplox.resolver import Resolver
+from yaplox.scanner import Scanner
 from yaplox.token_type import TokenType
+from yaplox.variable_access import VariableAccess
 
 
 class TestResolver:
@@ -109,3 +116,173 @@ class TestResolver:
         code = 'return "at top level";'
 
         assert "Can't return from top-level code." in run_code_block(code).err
+
+    def test_slots(self):
+        source = """
+        var global = 1;
+        fun f(a, b) {
+            var c = a;
+            {
+                var d = b;
+                fun g() { return c + d; }
+            }
+            return c;
+        }
+        """
+        interpreter = Interpreter()
+        statements = Parser(Scanner(source).scan_tokens()).parse()
+        Resolver(interpreter).resolve(statements)
+
+        _, function = statements
+        var_c, block, _ = function.body
+        var_d, function_g = block.statements
+
+        # Globals don't have a slot, a function has its parameters as first slots
+        assert statements[0].slot is None
+        assert function.slot is None
+        assert function.slot_count == 3
+        assert var_c.slot == 2
+        assert block.slot_count == 2
+        assert (var_d.slot, function_g.slot) == (0, 1)
+
+        # The depth and slot of `a`
+        assert interpreter.locals[var_c.initializer] == (0, 0)
+        assert var_c.initializer.access == VariableAccess.LOCAL
+
+        # `c` and `d` are captured by g, which finds them in its upvalues
+        assert var_c.captured and var_d.captured
+        assert function_g.upvalues == ((True, 1, 2), (True, 0, 0))
+        binary = function_g.body[0].value
+        assert binary.left not in interpreter.locals
+        assert (binary.left.access, binary.left.slot) == (VariableAccess.UPVALUE, 0)
+        assert (binary.right.access, binary.right.slot) == (VariableAccess.UPVALUE, 1)
+
+        # f itself reads `c` from its Cell
+        return_c = function.body[2].value
+        assert return_c.access == VariableAccess.CELL
+        assert interpreter.locals[return_c] == (0, 2)
+
+    def test_upvalues(self):
+        source = """
+        fun outer(a) {
+            fun middle() {
+                fun inner() { return a; }
+            }
+        }
+        class A { m() { fun f() { return this; } } }
+        """
+        statements = Parser(Scanner(source).scan_tokens()).parse()
+        Resolver(Interpreter()).resolve(statements)
+
+        outer, klass = statements
+        middle = outer.body[0]
+        inner = middle.body[0]
+
+        # middle captures `a` from outer, so inner can capture it from middle
+        assert outer.captured_params == (0,)
+        assert middle.upvalues == ((True, 0, 0),)
+        assert inner.upvalues == ((False, 0, 0),)
+
+        # `this` is the first slot of a method
+        method = klass.methods[0]
+        assert method.captured_params == (0,)
+        assert method.body[0].upvalues == ((True, 0, 0),)
+
+    def test_initializer_fields(self):
+        source = """
+        class A {
+            init(x) {
+                this.x = x;
+                if (x) this.y = this.z = 1;
+                this.x = 2;
+                fun f() { this.inner = 1; }
+                class B { init() { this.b = 1; } }
+                this.last = B();
+            }
+            m() { this.m = 1; }
+        }
+        """
+        statements = Parser(Scanner(source).scan_tokens()).parse()
+        Resolver(Interpreter()).resolve(statements)
+
+        init, method = statements[0].methods
+        nested_init = init.body[4].methods[0]
+
+        # The fields in the order they are assigned, not those of nested functions
+        assert init.fields == ("x", "z", "y", "last")
+        assert nested_init.fields == ("b",)
+        assert method.fields == ()
+
+    def test_assign_local(self, run_code_block):
+        code = """
+        {
+            var a = 1;
+            a = a + 1;
+            print a;
+        }
+        """
+        assert run_code_block(code).out == "2\n"
+
+    def test_annotations(self):
+        source = "var a; fun f(b) { print a + b; }"
+        interpreter = Interpreter()
+        statements = Parser(Scanner(source).scan_tokens()).parse()
+        Resolver(interpreter).resolve(statements)
+
+        binary = statements[1].body[0].expression
+        # A global is not resolved, and has no depth
+        assert binary.left.depth is None
+        assert (binary.right.depth, binary.right.slot) == (0, 0)
+
+        # Interpreter.locals reads the annotations
+        assert binary.right in interpreter.locals
+        assert interpreter.locals.get(binary.right) == (0, 0)
+        assert binary.left not in interpreter.locals
+        assert interpreter.locals.get(binary.left) is None
+        with pytest.raises(KeyError):
+            interpreter.locals[binary.left]
+
+    @pytest.mark.parametrize(
+        ("source", "frame_type"),
+        [
+            ("{ print 1; { print 2; } }", FrameType.NONE),
+            ("{ var a = 1; print a; }", FrameType.REUSABLE),
+            ("{ var a = 1; fun f() { print 1; } }", FrameType.REUSABLE),
+            ("{ var a = 1; fun f() { print a; } }", FrameType.REUSABLE),
+            ("{ var a = 1; { fun f() { { print a; } } } }", FrameType.REUSABLE),
+            ("{ class A { m() { return A; } } }", FrameType.REUSABLE),
+        ],
+    )
+    def test_frame_type(self, source, frame_type):
+        statements = Parser(Scanner(source).scan_tokens()).parse()
+        Resolver(Interpreter()).resolve(statements)
+
+        assert statements[0].frame_type == frame_type
+
+    def test_frames(self, run_code_block):
+        code = """
+        fun make() {
+            var first;
+            var second;
+            for (var i = 0; i < 2; i = i + 1) {
+                var captured = i;
+                fun get() { return captured; }
+                if (first == nil) first = get; else second = get;
+            }
+            print first();
+            print second();
+        }
+        make();
+
+        fun count(n) {
+            var i = 0;
+            while (i < 2) {
+                var inner = n * 10 + i;
+                if (n > 0) count(n - 1);
+                print inner;
+                i = i + 1;
+            }
+        }
+        count(1);
+        """
+        assert run_code_block(code).out == "0\n1\n0\n1\n10\n0\n1\n11\n"
@@ -108,6 +108,25 @@ class TestScanner:
         with pytest.raises(KeyError):
             scanner.scan_tokens()
 
+    def test_iter_tokens(self, mocker):
+        on_error_mock = mocker.MagicMock()
+
+        scanner = Scanner("var a = 1;\n@", on_error=on_error_mock)
+        tokens = scanner.iter_tokens()
+
+        assert next(tokens).token_type == TokenType.VAR
+        # Tokens are scanned lazily, the error at the end is not found yet
+        assert not on_error_mock.called
+
+        assert [token.token_type for token in tokens] == [
+            TokenType.IDENTIFIER,
+            TokenType.EQUAL,
+            TokenType.NUMBER,
+            TokenType.SEMICOLON,
+            TokenType.EOF,
+        ]
+        on_error_mock.assert_called_once_with(2, "Unexpected character: @")
+
     def test_scanner_with_string(self, mocker):
         source = '+"This is a String"'
         on_error_mock = mocker.MagicMock()
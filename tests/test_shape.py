@@ -0,0 +1,97 @@
+from yaplox.shape import MAX_FIELDS, MAX_TRANSITIONS, Shape
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.yaplox_class import YaploxClass
+from yaplox.yaplox_instance import YaploxInstance
+
+
+def name(lexeme: str) -> Token:
+    return Token(TokenType.IDENTIFIER, lexeme, None, 1)
+
+
+def create(klass: YaploxClass, *names: str) -> YaploxInstance:
+    instance = YaploxInstance(klass)
+    for index, lexeme in enumerate(names):
+        instance.set(name(lexeme), index)
+    return instance
+
+
+class TestShape:
+    def test_shared_shape(self):
+        klass = YaploxClass("Point", None, {})
+        first = create(klass, "x", "y")
+        second = create(klass, "x", "y")
+        other = create(klass, "y", "x")
+
+        assert first.shape is second.shape
+        assert first.shape.slots == {"x": 0, "y": 1}
+        assert other.shape is not first.shape
+        assert other.shape.slots == {"y": 0, "x": 1}
+        assert first.values == [0, 1]
+
+    def test_root_shape_per_class(self):
+        first = create(YaploxClass("A", None, {}), "x")
+        second = create(YaploxClass("A", None, {}), "x")
+
+        assert first.shape is not second.shape
+
+    def test_set_existing_field(self):
+        instance = create(YaploxClass("Point", None, {}), "x", "y")
+        shape = instance.shape
+
+        instance.set(name("x"), "new")
+
+        assert instance.shape is shape
+        assert instance.fields == {"x": "new", "y": 1}
+
+    def test_megamorphic_transitions(self):
+        klass = YaploxClass("Map", None, {})
+        instances = [create(klass, f"key{index}") for index in range(10)]
+
+        shapes = [instance.shape for instance in instances]
+        assert not any(shape.is_dictionary for shape in shapes[:MAX_TRANSITIONS])
+        assert all(shape.is_dictionary for shape in shapes[MAX_TRANSITIONS:])
+        assert shapes[-1] is not shapes[-2]
+        assert len(klass.shape.transitions) == MAX_TRANSITIONS
+
+    def test_dictionary_shape_grows_with_instance(self):
+        names = [f"field{index}" for index in range(MAX_FIELDS + 10)]
+        instance = create(YaploxClass("Big", None, {}), *names)
+        shape = instance.shape
+
+        assert shape.is_dictionary
+        instance.set(name("extra"), "extra")
+        assert instance.shape is shape
+        assert instance.fields == {
+            **{lexeme: index for index, lexeme in enumerate(names)},
+            "extra": "extra",
+        }
+
+    def test_with_field(self):
+        shape = Shape.root()
+
+        assert shape.with_field("x") is shape.with_field("x")
+        assert shape.with_field("x").with_field("y").slots == {"x": 0, "y": 1}
+
+    def test_fields_in_lox(self, run_code_block):
+        code = """
+        class Point {
+          init(x, y) { this.x = x; this.y = y; }
+        }
+        var points = nil;
+        for (var i = 0; i < 20; i = i + 1) {
+          var point = Point(i, i * 2);
+          point.z = i;
+          if (i > 10) { point.w = point.x + point.y + point.z; }
+          points = point;
+        }
+        print points.w;
+        class Map {}
+        var map = Map();
+        map.a = 1; map.b = 2; map.a = 3;
+        print map.a + map.b;
+        """
+        captured = run_code_block(code)
+
+        assert captured.err == ""
+        assert captured.out == "76\n5\n"
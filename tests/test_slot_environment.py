@@ -0,0 +1,25 @@
+from yaplox.slot_environment import SlotEnvironment
+
+
+class TestSlotEnvironment:
+    def test_size(self):
+        env = SlotEnvironment(3)
+
+        assert env.values == [None, None, None]
+        assert env.enclosing is None
+
+    def test_slot_environment_distance(self):
+        outer = SlotEnvironment(2)
+        middle = SlotEnvironment(1, enclosing=outer)
+        inner = SlotEnvironment(2, enclosing=middle)
+
+        outer.values[1] = "outer"
+        inner.values[0] = 0.0
+
+        assert inner.get_at(0, 0) == 0.0
+        assert inner.get_at(2, 1) == "outer"
+        assert middle.get_at(1, 1) == "outer"
+
+        inner.assign_at(2, 0, "assigned")
+        assert outer.values == ["assigned", "outer"]
+        assert middle.get_at(0, 0) is None
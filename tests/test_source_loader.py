@@ -0,0 +1,72 @@
+import io
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from yaplox.source_loader import load_file, load_source, load_stream
+from yaplox.yaplox import Yaplox
+
+SOURCE = 'var a = "café";\nprint a;\n\nprint b;\n'
+
+
+class TestSourceLoader:
+    def test_load_file(self, tmp_path):
+        path = tmp_path / "source.lox"
+        path.write_bytes(SOURCE.encode("utf-8"))
+
+        # Newlines are not doubled, and multi-byte characters are decoded
+        assert load_file(str(path)) == SOURCE
+        assert load_source(str(path)) == SOURCE
+
+    def test_load_empty_file(self, tmp_path):
+        path = tmp_path / "empty.lox"
+        path.write_bytes(b"")
+
+        assert load_file(str(path)) == ""
+
+    def test_load_invalid_utf8(self, tmp_path):
+        path = tmp_path / "invalid.lox"
+        path.write_bytes(b'print "caf\xe9";\n')
+
+        # A script that can't be decoded is an error, not an empty program
+        with pytest.raises(UnicodeDecodeError):
+            load_file(str(path))
+
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="Needs named pipes")
+    def test_load_pipe(self, tmp_path):
+        path = tmp_path / "pipe.lox"
+        os.mkfifo(path)
+
+        # A pipe reports a size of 0, but it is not an empty program
+        writer = threading.Thread(target=path.write_bytes, args=(SOURCE.encode(),))
+        writer.start()
+        try:
+            assert load_file(str(path)) == SOURCE
+        finally:
+            writer.join()
+
+    def test_load_stream(self):
+        stream = io.BytesIO(SOURCE.encode("utf-8"))
+
+        # With a chunk size of 3 bytes, the é will be split over two chunks
+        assert load_stream(stream, chunk_size=3) == SOURCE
+
+    def test_load_stdin(self, monkeypatch):
+        stdin = SimpleNamespace(buffer=io.BytesIO(SOURCE.encode("utf-8")))
+        monkeypatch.setattr(sys, "stdin", stdin)
+
+        assert load_source("-") == SOURCE
+
+    def test_line_numbers(self, tmp_path, capsys):
+        path = tmp_path / "source.lox"
+        path.write_bytes(SOURCE.encode("utf-8"))
+
+        yaplox = Yaplox()
+        yaplox.run(yaplox._load_file(str(path)))
+        captured = capsys.readouterr()
+
+        assert captured.out == "café\n"
+        assert "Undefined variable 'b'. in line [line4]" in captured.err
@@ -0,0 +1,81 @@
+import pytest
+
+from yaplox.parser import Parser
+from yaplox.regex_scanner import RegexScanner
+from yaplox.scanner import Scanner
+from yaplox.stmt import Print
+from yaplox.token_buffer import TokenBuffer
+from yaplox.token_type import TokenType
+from yaplox.yaplox import Yaplox
+
+
+def as_tuples(tokens):
+    return [
+        (token.token_type, token.lexeme, token.literal, token.line) for token in tokens
+    ]
+
+
+class TestTokenBuffer:
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "",
+            "\n\n",
+            "var a = 12.5;\n// comment\nprint a + 3;",
+            'print "multi\nline\nstring";\nprint "next";',
+            "class Foo < Bar {\n  init() {\n    this.a = super.b(1, 2);\n  }\n}\n",
+        ],
+    )
+    def test_same_as_tokens(self, source):
+        buffer = RegexScanner(source).scan_buffer()
+
+        assert as_tuples(buffer) == as_tuples(Scanner(source).scan_tokens())
+
+    def test_columns(self):
+        buffer = RegexScanner("print 1;").scan_buffer()
+
+        assert len(buffer) == 4
+        assert list(buffer.starts) == [0, 6, 7, 8]
+        assert list(buffer.lengths) == [5, 1, 1, 0]
+        assert buffer.token_types[0] == TokenType.PRINT.value
+
+    def test_lines(self):
+        buffer = TokenBuffer("a\nb\n\nc")
+
+        assert buffer.line_at(0) == 1
+        assert buffer.line_at(1) == 1
+        assert buffer.line_at(2) == 2
+        assert buffer.line_at(5) == 4
+        assert list(buffer.newlines) == [1, 3, 4]
+
+    def test_index(self):
+        buffer = RegexScanner("a b").scan_buffer()
+
+        assert buffer[-1].token_type == TokenType.EOF
+        assert buffer[1].lexeme == "b"
+        assert repr(buffer[0]) == "TokenType.IDENTIFIER a None"
+
+        with pytest.raises(IndexError):
+            buffer[3]
+
+    def test_parse_buffer(self, mocker):
+        on_token_error_mock = mocker.MagicMock()
+        buffer = RegexScanner('print "a";\nprint 1 + 2;').scan_buffer()
+
+        statements = Parser(buffer, on_token_error=on_token_error_mock).parse()
+
+        assert len(statements) == 2
+        assert isinstance(statements[1], Print)
+        assert statements[1].expression.operator.line == 2
+        assert not on_token_error_mock.called
+
+    def test_token_error(self, capsys):
+        yaplox = Yaplox()
+        buffer = RegexScanner("print 1;\nvar 1 = 2;").scan_buffer()
+
+        Parser(buffer, on_token_error=yaplox.token_error).parse()
+
+        assert yaplox.had_error
+        assert (
+            "[line 2] Error  at '1' : Expect variable name." in capsys.readouterr().err
+        )
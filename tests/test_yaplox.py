@@ -45,3 +45,18 @@ class TestMain:
                 yaplox.main()
             assert pytest_wrapped_e.value.code == 64
             assert pytest_wrapped_e.type == SystemExit
+
+    @pytest.mark.parametrize("backend", ["interpreter", "closure"])
+    def test_main_backend_arg(self, monkeypatch, capsys, backend):
+        monkeypatch.setattr(Yaplox, "_load_file", staticmethod(lambda file: "print 7;"))
+
+        with patch.object(sys, "argv", ["yaplox.py", f"--backend={backend}", "a.lox"]):
+            Yaplox.main()
+
+        assert capsys.readouterr().out == "7\n"
+
+    def test_main_unknown_backend_arg(self):
+        with patch.object(sys, "argv", ["yaplox.py", "--backend=none", "a.lox"]):
+            with pytest.raises(SystemExit) as pytest_wrapped_e:
+                Yaplox.main()
+            assert pytest_wrapped_e.value.code == 64
@@ -0,0 +1,81 @@
+"""
+Measure the memory used per AST node, for the slotted nodes in yaplox.expr and
+yaplox.stmt and for the same nodes without slots, as they were generated before.
+
+Every file in examples/ is parsed, and every node of the tree is copied a number of
+times as a slotted node and as a node with a `__dict__`. The memory is measured with
+tracemalloc, so the size of the instance dicts is included. The values of the fields
+are shared, only the nodes themselves are counted.
+
+Usage: python tools/benchmark_ast_memory.py [copies]
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Type
+
+from yaplox.parser import Parser
+from yaplox.scanner import Scanner
+
+EXAMPLES = sorted(Path(__file__).parent.parent.glob("examples/*.lox"))
+
+
+def walk(node: Any) -> List[Any]:
+    """ Return all nodes in the tree """
+    if isinstance(node, list):
+        return [child for item in node for child in walk(item)]
+    if hasattr(node, "__match_args__"):
+        nodes = [node]
+        for name in node.__match_args__:
+            nodes.extend(walk(getattr(node, name)))
+        return nodes
+    return []
+
+
+def without_slots(node_class: Type) -> Type:
+    """ Create a class with the same fields as `node_class`, but without slots """
+    return type(node_class.__name__, (), {"fields": node_class.__match_args__})
+
+
+def measure(create: Callable[[], List[Any]]) -> int:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    nodes = create()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    del nodes
+    return used
+
+
+def copy_nodes(nodes: List[Any], copies: int, classes: Dict[Type, Type]) -> List[Any]:
+    result = []
+    for _ in range(copies):
+        for node in nodes:
+            node_class = classes[type(node)]
+            copy = object.__new__(node_class)
+            for name in node.__match_args__:
+                setattr(copy, name, getattr(node, name))
+            result.append(copy)
+    return result
+
+
+def main(copies: int):
+    print(f"{'file':>24} {'nodes':>6} {'dict':>10} {'slots':>10}")
+    for path in EXAMPLES:
+        statements = Parser(Scanner(path.read_text()).scan_tokens()).parse()
+        nodes = walk(statements)
+        slotted = {type(node): type(node) for node in nodes}
+        plain = {node_class: without_slots(node_class) for node_class in slotted}
+
+        count = len(nodes) * copies
+        dict_size = measure(lambda: copy_nodes(nodes, copies, plain)) / count
+        slots_size = measure(lambda: copy_nodes(nodes, copies, slotted)) / count
+        print(
+            f"{path.name:>24} {len(nodes):6} {dict_size:10.1f} {slots_size:10.1f}  "
+            f"bytes per node ({dict_size / slots_size:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
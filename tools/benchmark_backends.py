@@ -0,0 +1,62 @@
+"""
+Compare the execution backends of Yaplox on the examples, or on the scripts given
+on the command line.
+
+Every script is compiled once per backend, then the best time of a number of runs
+is reported. The output of every backend is compared with the output of the
+Interpreter before the timings are printed.
+
+Usage: python tools/benchmark_backends.py [repeats] [script ...]
+"""
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from yaplox.yaplox import BACKENDS, Yaplox
+
+EXAMPLES = sorted(Path(__file__).parent.parent.glob("examples/*.lox"))
+
+
+def run(backend: str, source: str, repeats: int) -> Tuple[str, float]:
+    best = float("inf")
+    output = ""
+    for _ in range(repeats):
+        yaplox = Yaplox(backend=backend)
+        stdout = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(stdout):
+            yaplox.run(source)
+        best = min(best, time.perf_counter() - start)
+        output = stdout.getvalue()
+    return output, best
+
+
+def main(repeats: int, scripts: List[Path]):
+    print(f"{'script':>24} " + " ".join(f"{name:>18}" for name in BACKENDS))
+    for path in scripts:
+        source = path.read_text()
+        reference = None
+        baseline = None
+        timings = []
+        for backend in BACKENDS:
+            output, elapsed = run(backend, source, repeats)
+            if reference is None:
+                reference = output
+            elif output != reference:
+                print(f"{path.name}: {backend} does not produce the same output")
+                sys.exit(1)
+
+            baseline = baseline or elapsed
+            timings.append(f"{elapsed * 1000:9.2f}ms ({baseline / elapsed:.1f}x)")
+        print(f"{path.name:>24} " + " ".join(f"{timing:>18}" for timing in timings))
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(
+        int(arguments.pop(0)) if arguments else 20,
+        [Path(argument) for argument in arguments] or EXAMPLES,
+    )
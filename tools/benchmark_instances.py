@@ -0,0 +1,116 @@
+"""
+Measure the memory per instance and the time of field accesses, for the
+YaploxInstance with a Shape and for an instance with a dict of fields, as it was
+before the shapes.
+
+Every instance gets the fields of a `Point` class. The memory is measured with
+tracemalloc, the values of the fields are shared so only the instances are counted.
+The instances with a dictionary shape are the instances that don't fit in the tree
+of shapes.
+
+Usage: python tools/benchmark_instances.py [instances] [fields]
+"""
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from yaplox.inline_cache import InlineCache
+from yaplox.shape import Shape
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.yaplox_class import YaploxClass
+from yaplox.yaplox_instance import YaploxInstance
+
+
+class DictInstance:
+    """ The previous YaploxInstance, with the fields in a dict """
+
+    def __init__(self, klass: YaploxClass):
+        self.klass = klass
+        self.fields: dict = {}
+
+    def set(self, name: Token, value: Any):
+        self.fields[name.lexeme] = value
+
+
+def dict_get(instance: DictInstance, name: Token) -> Any:
+    """ The field access of the previous InlineCache.get """
+    lexeme = name.lexeme
+    fields = instance.fields
+    if lexeme in fields:
+        return fields[lexeme]
+    raise AssertionError("Not a field")
+
+
+def measure(create: Callable[[], List[Any]], count: int) -> float:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    instances = create()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    del instances
+    return used / count
+
+
+def create(
+    instance_class: Callable[[YaploxClass], Any],
+    klass: YaploxClass,
+    names: List[Token],
+    count: int,
+    dictionary: bool = False,
+) -> List[Any]:
+    instances = []
+    for _ in range(count):
+        instance = instance_class(klass)
+        if dictionary:
+            instance.shape = Shape()
+        for name in names:
+            instance.set(name, 1.0)
+        instances.append(instance)
+    return instances
+
+
+def time_get(get: Callable[[Any, Token], Any], instances: List[Any], name: Token):
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for instance in instances:
+            get(instance, name)
+        best = min(best, time.perf_counter() - start)
+    return best / len(instances) * 1e9
+
+
+def main(count: int, field_count: int):
+    klass = YaploxClass("Point", None, {})
+    names = [
+        Token(TokenType.IDENTIFIER, f"field{index}", None, 1)
+        for index in range(field_count)
+    ]
+    get = InlineCache().get
+    layouts: List[Tuple[str, Callable[[], List[Any]], Callable[[Any, Token], Any]]]
+    layouts = [
+        ("dict", lambda: create(DictInstance, klass, names, count), dict_get),
+        ("shape", lambda: create(YaploxInstance, klass, names, count), get),
+        (
+            "dictionary shape",
+            lambda: create(YaploxInstance, klass, names, count, dictionary=True),
+            get,
+        ),
+    ]
+
+    print(f"{count} instances with {field_count} fields")
+    print(f"{'layout':>18} {'bytes':>10} {'get (ns)':>10}")
+    for layout, create_instances, get_field in layouts:
+        size = measure(create_instances, count)
+        instances = create_instances()
+        duration = time_get(get_field, instances, names[-1])
+        print(f"{layout:>18} {size:10.1f} {duration:10.1f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+    )
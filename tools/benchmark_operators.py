@@ -0,0 +1,111 @@
+"""
+Measure the evaluation of every binary operator, with the operator table of the
+Interpreter and with the dict of lambdas it used to build for every evaluation.
+
+Every operator is evaluated on two literal floats, and `+` also on two strings. The
+time per evaluation includes the evaluation of the two literals.
+
+Usage: python tools/benchmark_operators.py [evaluations]
+"""
+import sys
+import time
+from typing import Any
+
+from yaplox.binary_operators import is_equal
+from yaplox.expr import Binary, Literal
+from yaplox.interpreter import Interpreter
+from yaplox.token import Token
+from yaplox.token_type import TokenType
+from yaplox.yaplox_runtime_error import YaploxRuntimeError
+
+CASES = [
+    (TokenType.GREATER, ">", 2.0, 1.0),
+    (TokenType.GREATER_EQUAL, ">=", 2.0, 1.0),
+    (TokenType.LESS, "<", 1.0, 2.0),
+    (TokenType.LESS_EQUAL, "<=", 1.0, 2.0),
+    (TokenType.BANG_EQUAL, "!=", 1.0, 2.0),
+    (TokenType.EQUAL_EQUAL, "==", 1.0, 2.0),
+    (TokenType.MINUS, "-", 3.0, 1.0),
+    (TokenType.SLASH, "/", 3.0, 2.0),
+    (TokenType.STAR, "*", 3.0, 2.0),
+    (TokenType.PLUS, "+", 3.0, 2.0),
+    (TokenType.PLUS, "+", "foo", "bar"),
+]
+
+
+class LambdaInterpreter(Interpreter):
+    """ The Interpreter with the previous implementation of binary expressions """
+
+    def visit_binary_expr(self, expr: Binary):
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        token_type = expr.operator.token_type
+
+        if token_type in (
+            TokenType.GREATER,
+            TokenType.GREATER_EQUAL,
+            TokenType.LESS,
+            TokenType.LESS_EQUAL,
+            TokenType.MINUS,
+            TokenType.SLASH,
+            TokenType.STAR,
+        ):
+            if not (isinstance(left, (float, int)) and isinstance(right, (float, int))):
+                raise YaploxRuntimeError(expr.operator, "Operands must be numbers.")
+
+        choices = {
+            TokenType.GREATER: lambda: float(left) > float(right),
+            TokenType.GREATER_EQUAL: lambda: float(left) >= float(right),
+            TokenType.LESS: lambda: float(left) < float(right),
+            TokenType.LESS_EQUAL: lambda: float(left) <= float(right),
+            TokenType.BANG_EQUAL: lambda: not is_equal(left, right),
+            TokenType.EQUAL_EQUAL: lambda: is_equal(left, right),
+            TokenType.MINUS: lambda: float(left) - float(right),
+            TokenType.SLASH: lambda: float(left) / float(right),
+            TokenType.STAR: lambda: float(left) * float(right),
+            TokenType.PLUS: lambda: self._plus(expr, left, right),
+        }
+        return choices[token_type]()
+
+    @staticmethod
+    def _plus(expr: Binary, left: Any, right: Any):
+        if isinstance(left, (float, int)) and isinstance(right, (float, int)):
+            return left + right
+        if isinstance(left, str) and isinstance(right, str):
+            return str(left + right)
+        raise YaploxRuntimeError(
+            expr.operator, "Operands must be two numbers or two strings"
+        )
+
+
+def measure(interpreter: Interpreter, expr: Binary, evaluations: int) -> float:
+    visit = interpreter.visit_binary_expr
+    start = time.perf_counter()
+    for _ in range(evaluations):
+        visit(expr)
+    return time.perf_counter() - start
+
+
+def main(evaluations: int):
+    print(f"{'operator':>14} {'lambdas':>10} {'table':>10}")
+    for token_type, lexeme, left, right in CASES:
+        operator = Token(token_type, lexeme, None, 1)
+        expr = Binary(Literal(left), operator, Literal(right))
+
+        old = LambdaInterpreter()
+        new = Interpreter()
+        if old.visit_binary_expr(expr) != new.visit_binary_expr(expr):
+            print(f"{lexeme} does not produce the same result")
+            sys.exit(1)
+
+        old_time = measure(old, expr, evaluations) / evaluations * 1e9
+        new_time = measure(new, expr, evaluations) / evaluations * 1e9
+        name = f"{type(left).__name__} {lexeme} {type(right).__name__}"
+        print(
+            f"{name:>14} {old_time:8.0f}ns {new_time:8.0f}ns  "
+            f"({old_time / new_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
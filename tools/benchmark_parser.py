@@ -0,0 +1,73 @@
+"""
+Compare the recursive descent Parser with the PrattParser on expression heavy code.
+
+The generated source contains long arithmetic, comparison and logical expressions,
+function calls and property access. Both parsers parse the same list of tokens, and
+the resulting trees are compared before the timings are printed.
+
+Usage: python tools/benchmark_parser.py [statements]
+"""
+import random
+import sys
+import time
+from typing import Any, List
+
+from yaplox.parser import Parser
+from yaplox.pratt_parser import PrattParser
+from yaplox.regex_scanner import RegexScanner
+from yaplox.token import Token
+
+OPERATORS = ["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!=", "and", "or"]
+OPERANDS = ["a", "b.c", "f(x, 2)", "12.5", '"str"', "nil", "(a + 1)", "-b", "!c"]
+
+
+def generate_source(statements: int) -> str:
+    rnd = random.Random(42)
+    lines = []
+    for _ in range(statements):
+        parts = [rnd.choice(OPERANDS)]
+        for _ in range(rnd.randint(3, 12)):
+            parts.append(rnd.choice(OPERATORS))
+            parts.append(rnd.choice(OPERANDS))
+        lines.append(f"x = {' '.join(parts)};")
+    return "\n".join(lines)
+
+
+def dump(node: Any) -> Any:
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    if isinstance(node, Token):
+        return node.token_type, node.lexeme, node.literal, node.line
+    if hasattr(node, "accept"):
+        fields = [(name, dump(getattr(node, name))) for name in node.__match_args__]
+        return type(node).__name__, fields
+    return node
+
+
+def main(statements: int):
+    tokens: List[Token] = RegexScanner(generate_source(statements)).scan_tokens()
+    print(f"Parsing {len(tokens)} tokens")
+
+    reference = None
+    baseline = None
+    for parser_class in (Parser, PrattParser):
+        start = time.perf_counter()
+        ast = parser_class(tokens).parse()
+        elapsed = time.perf_counter() - start
+
+        tree = dump(ast)
+        if reference is None:
+            reference = tree
+        elif tree != reference:
+            print(f"{parser_class.__name__} does not produce the same tree")
+            sys.exit(1)
+
+        baseline = baseline or elapsed
+        print(
+            f"{parser_class.__name__:>12}: {len(tokens) / elapsed:10.0f} tokens/second "
+            f"({elapsed:.3f}s, {baseline / elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,59 @@
+"""
+Compare the throughput of the scanner implementations.
+
+The Lox files in `examples/` are concatenated and repeated until the source is large
+enough to get a stable measurement. Before timing, the token streams of all scanners
+are compared to make sure they are equivalent.
+
+Usage: python tools/benchmark_scanner.py [repeat]
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from yaplox.regex_scanner import RegexScanner
+from yaplox.scanner import Scanner
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def load_source(repeat: int) -> str:
+    sources = [path.read_text() for path in sorted(EXAMPLES.glob("*.lox"))]
+    return "\n".join(sources * repeat)
+
+
+def time_scanner(scanner_class: Callable, source: str) -> Tuple[float, int]:
+    start = time.perf_counter()
+    tokens = scanner_class(source).scan_tokens()
+    return time.perf_counter() - start, len(tokens)
+
+
+def main(repeat: int):
+    source = load_source(repeat)
+    print(f"Source: {len(source)} characters")
+
+    reference: List = []
+    for scanner_class in (Scanner, RegexScanner):
+        tokens = [
+            (token.token_type, token.lexeme, token.literal, token.line)
+            for token in scanner_class(source).scan_tokens()
+        ]
+        if not reference:
+            reference = tokens
+        elif tokens != reference:
+            print(f"{scanner_class.__name__} does not produce the same tokens")
+            sys.exit(1)
+
+    baseline = None
+    for scanner_class in (Scanner, RegexScanner):
+        elapsed, count = time_scanner(scanner_class, source)
+        baseline = baseline or elapsed
+        print(
+            f"{scanner_class.__name__:>14}: {count / elapsed:12.0f} tokens/second "
+            f"({elapsed:.3f}s, {baseline / elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -7,11 +7,21 @@ are tested. The /tools/ folder *is* linted with black, mypy, isport and isort.
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import black
 import isort
 
+# Annotations of the expressions that read or write a variable
+VARIABLE_ANNOTATIONS = [
+    "Optional[int] depth = None",
+    "int slot = 0",
+    "VariableAccess access = VariableAccess.GLOBAL",
+]
+
+# Annotations of the statements that declare a variable
+DECLARATION_ANNOTATIONS = ["Optional[int] slot = None", "bool captured = False"]
+
 
 class GenerateAst:
     def __init__(self, outputdir):
@@ -35,7 +45,23 @@ class GenerateAst:
                 "Unary    : Token operator, Expr right",
                 "Variable : Token name",
             ],
-            imports={"typing": ["Any", "List"], "yaplox.token": ["Token"]},
+            imports={
+                "typing": ["Any", "List", "Optional"],
+                "yaplox.inline_cache": ["InlineCache"],
+                "yaplox.token": ["Token"],
+                "yaplox.variable_access": ["VariableAccess"],
+            },
+            annotations={
+                "Assign": VARIABLE_ANNOTATIONS,
+                "Get": ["InlineCache cache = InlineCache()"],
+                "Super": [
+                    *VARIABLE_ANNOTATIONS,
+                    "Optional[This] this = None",
+                    "InlineCache cache = InlineCache()",
+                ],
+                "This": VARIABLE_ANNOTATIONS,
+                "Variable": VARIABLE_ANNOTATIONS,
+            },
         )
 
         self._define_ast(
@@ -53,10 +79,26 @@ class GenerateAst:
                 "While      : Expr condition, Stmt body",
             ],
             imports={
-                "typing": ["List", "Optional"],
+                "typing": ["List", "Optional", "Tuple"],
                 "yaplox.expr": ["Expr", "Variable"],
+                "yaplox.frame_type": ["FrameType"],
                 "yaplox.token": ["Token"],
             },
+            annotations={
+                "Block": [
+                    "int slot_count = 0",
+                    "FrameType frame_type = FrameType.FRESH",
+                ],
+                "Class": DECLARATION_ANNOTATIONS,
+                "Function": [
+                    *DECLARATION_ANNOTATIONS,
+                    "int slot_count = 0",
+                    "Tuple[int, ...] captured_params = ()",
+                    "Tuple[Tuple[bool, int, int], ...] upvalues = ()",
+                    "Tuple[str, ...] fields = ()",
+                ],
+                "Var": DECLARATION_ANNOTATIONS,
+            },
         )
 
     def _create_output_directory(self):
@@ -66,7 +108,13 @@ class GenerateAst:
 
         Path.mkdir(self.outputdir, parents=True)
 
-    def _define_ast(self, base_name: str, types: List, imports: Dict[str, List] = None):
+    def _define_ast(
+        self,
+        base_name: str,
+        types: List,
+        imports: Optional[Dict[str, List]] = None,
+        annotations: Optional[Dict[str, List[str]]] = None,
+    ):
         """
         Create a new ast class
 
@@ -75,6 +123,8 @@ class GenerateAst:
         :param imports: A list of imports that will be created in the top of the file.
             This is a list of dicts, where the key of the dict is the module
             (eg: from x), and the values the imports themself, eg (import foo, bar)
+        :param annotations: Extra fields per class, that are not passed to the
+            constructor but set later by the Resolver, eg `int slot_count = 0`
         """
 
         lines = [
@@ -93,6 +143,8 @@ class GenerateAst:
         lines.extend(
             [
                 f"class {base_name}(ABC):",
+                "    __slots__ = ()",
+                "",
                 "    @abstractmethod",
                 f"    def accept(self, visitor: {base_name}Visitor):",
                 "        raise NotImplementedError",
@@ -106,7 +158,10 @@ class GenerateAst:
             fields = (
                 class_type.split(":")[1].strip().replace("<", "[").replace(">", "]")
             )
-            lines.extend(self._define_type(base_name, class_name, fields))
+            class_annotations = (annotations or {}).get(class_name, [])
+            lines.extend(
+                self._define_type(base_name, class_name, fields, class_annotations)
+            )
 
         self._write_file(base_name, lines)
 
@@ -138,7 +193,13 @@ class GenerateAst:
 
         return vistor_lines
 
-    def _define_type(self, base_name: str, class_name: str, fields_list: str) -> List:
+    def _define_type(
+        self,
+        base_name: str,
+        class_name: str,
+        fields_list: str,
+        annotations: List[str],
+    ) -> List:
         # __init__ method
         fields = [field.strip().split() for field in fields_list.split(", ")]
 
@@ -149,15 +210,34 @@ class GenerateAst:
             field[1] = re.sub(r"(?<!^)(?=[A-Z])", "_", field[1]).lower()
 
         init_fields = ", ".join(f"{field[1]}: {field[0]}" for field in fields)
+        # Slots remove the __dict__ of every node, match args allow
+        # `case Binary(left, operator, right)` in a match statement
+        # Annotations have the form `type name = default`
+        extra_fields = []
+        for annotation in annotations:
+            declaration, default = annotation.split(" = ")
+            field_type, name = declaration.rsplit(" ", 1)
+            extra_fields.append((field_type, name, default))
+
+        field_names = [field[1] for field in fields]
+        slot_names = field_names + [field[1] for field in extra_fields]
 
         lines = [
             f"class {class_name}({base_name}):",
+            f"    __slots__ = {tuple(slot_names)!r}",
+            f"    __match_args__ = {tuple(field_names)!r}",
+            "",
             f"    def __init__(self, {init_fields}):",
         ]
 
         for field in fields:
             lines.append(f"        self.{field[1]} = {field[1]}")
 
+        if extra_fields:
+            lines.append("        # Annotations, set by the Resolver")
+        for field_type, name, default in extra_fields:
+            lines.append(f"        self.{name}: {field_type} = {default}")
+
         # add the visit method
         visitor_method = [
             "",
@@ -0,0 +1,60 @@
+"""
+Report how well the inline caches of the property and super expressions work on the
+examples, or on the scripts given on the command line.
+
+Every script runs once on the backend of YAPLOX_BACKEND. Then the hits and misses
+of all caches are added up. A site is an expression that looked up a method, it is
+polymorphic when it has seen more than one class.
+
+Usage: python tools/inline_cache_stats.py [script ...]
+"""
+import contextlib
+import io
+import sys
+from pathlib import Path
+from typing import Any, Iterator, List, Tuple
+
+from yaplox.expr import Expr
+from yaplox.inline_cache import InlineCache
+from yaplox.stmt import Stmt
+from yaplox.yaplox import Yaplox
+
+EXAMPLES = sorted(Path(__file__).parent.parent.glob("examples/*.lox"))
+
+
+def find_caches(node: Any) -> Iterator[InlineCache]:
+    if isinstance(node, InlineCache):
+        yield node
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            yield from find_caches(item)
+    elif isinstance(node, (Expr, Stmt)):
+        slots: Tuple[str, ...] = node.__slots__
+        for slot in slots:
+            yield from find_caches(getattr(node, slot))
+
+
+def main(scripts: List[Path]):
+    print(f"{'script':>24} {'sites':>6} {'polymorphic':>12} {'hits':>10} {'misses':>8}")
+    for path in scripts:
+        yaplox = Yaplox()
+        statements = yaplox._compile(path.read_text())
+        if statements is None:
+            print(f"{path.name}: does not compile")
+            sys.exit(1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            yaplox.interpreter.interpret(statements, on_error=yaplox.runtime_error)
+
+        caches = [cache for cache in find_caches(statements) if cache.misses]
+        polymorphic = sum(1 for cache in caches if len(cache.entries) > 1)
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        rate = hits / (hits + misses) if caches else 0.0
+        print(
+            f"{path.name:>24} {len(caches):>6} {polymorphic:>12} {hits:>10} "
+            f"{misses:>8} ({rate:.1%} hits)"
+        )
+
+
+if __name__ == "__main__":
+    main([Path(argument) for argument in sys.argv[1:]] or EXAMPLES)